@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+_audioring.py — Allokationsfreier Übergabepuffer zwischen Audio-Callback und Worker.
+
+Der PortAudio-Callback läuft in einem Echtzeit-Thread. Jede Allokation
+(`indata[:, 0].copy()`), jedes `queue.Queue.put` (Lock + Condition) und jede
+Python-Rechnung dort verlängert den Callback und erzeugt Jitter — unter Last
+meldet PortAudio dann `input overflow`.
+
+BlockRing ist ein Single-Producer/Single-Consumer-Ring aus vorab allozierten
+float32-Blöcken. Der Callback kopiert nur die Samples in den nächsten freien
+Slot (memcpy) und schiebt den Schreibindex weiter. Der Worker holt alle
+vorhandenen Blöcke auf einmal ab (ein Bulk-Copy, Downmix, int16 → float32);
+Pegel rechnet erst _capture auf den 16-kHz-Blöcken. Ohne Lock: jeder Index wird nur von einer Seite
+geschrieben, und unter dem GIL ist die Zuweisung eines int atomar.
+
+Ist der Ring voll (Worker hängt weit hinterher), wird der neue Block verworfen
+und gezählt statt den Callback zu blockieren.
+
+Verwendung:
+    import _audioring
+    ring = _audioring.BlockRing(BLOCKSIZE)
+    def callback(indata, frames, time_info, status):
+        ring.write(indata, status)
+    blocks = ring.get(timeout=0.1)        # Liste von 1-D-float32-Arrays
+
+    preroll = _audioring.PreRollRing(2.0, 48000)   # letzte 2 s, int16
+    preroll.write(indata)                           # im Callback, solange idle
+    audio = preroll.snapshot(preroll.total)
+"""
+
+import os
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kapazität in Sekunden Audio (bei 16 kHz float32: 60 s ≈ 3,8 MB, einmalig).
+RING_SECONDS = float(os.environ.get('AUDIO_RING_SEC', '60'))
+POLL_INTERVAL = 0.01  # s, Wartetakt des Consumers (Blöcke kommen alle ~100 ms)
+
+
+class BlockRing:
+    """Lock-free SPSC ring of preallocated blocks (float32 or int16).
+
+    With channels > 1 all channels are stored and downmixed to mono by the
+    consumer (NumPy mean), so the callback still does a single copy.
+    """
+
+    def __init__(self, blocksize, samplerate=16000, seconds=RING_SECONDS, channels=1,
+                 dtype=np.float32):
+        self.blocksize = blocksize
+        self.channels = channels
+        self.capacity = max(8, int(seconds * samplerate / blocksize))
+        shape = (self.capacity, blocksize) + ((channels,) if channels > 1 else ())
+        self._buf = np.zeros(shape, dtype=dtype)   # int16 slots are converted by get()
+        self._len = np.zeros(self.capacity, dtype=np.int64)
+        self._w = 0           # next slot to write — producer only
+        self._r = 0           # next slot to read  — consumer only
+        self.dropped = 0      # blocks lost because the ring was full — producer only
+        self._dropped_seen = 0
+        self.status = None    # last PortAudio status flag, logged by the consumer
+
+    # ── producer (audio callback) ─────────────────────────────────────────
+    def write(self, indata, status=None):
+        """Copy `indata` (channel 0 if mono) into the next slot. No allocation."""
+        if status:
+            self.status = status
+        w = self._w
+        if w - self._r >= self.capacity:
+            self.dropped += 1
+            return
+        slot = w % self.capacity
+        n = min(len(indata), self.blocksize)
+        if self.channels > 1:
+            self._buf[slot, :n] = indata[:n, :self.channels]
+        else:
+            self._buf[slot, :n] = indata[:n, 0]
+        if n < self.blocksize:
+            self._buf[slot, n:] = 0.0
+        self._len[slot] = n
+        self._w = w + 1
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+    # ── consumer (worker thread) ──────────────────────────────────────────
+    def qsize(self):
+        return self._w - self._r
+
+    def empty(self):
+        return self._w == self._r
+
+    def clear(self):
+        """Drop everything buffered (stale audio before a new stream)."""
+        self._r = self._w
+        self.status = None
+
+    def get(self, timeout=0.1):
+        """Wait up to `timeout` s; return all available blocks.
+
+        A list of 1-D float32 mono arrays (owned copies), empty when nothing
+        arrived in time. Levels are computed by the consumer on the blocks it
+        hands out (_capture.Capture.read), not here.
+        """
+        deadline = time.monotonic() + timeout
+        while self._w == self._r and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+        self._check_status()
+        r, w = self._r, self._w
+        if w == r:
+            return []
+        idx = np.arange(r, w) % self.capacity
+        chunk = self._buf[idx]          # fancy indexing → one bulk copy
+        lengths = self._len[idx]
+        self._r = w                     # slots are free again only after the copy
+        if chunk.ndim == 3:
+            chunk = chunk.mean(axis=2, dtype=np.float32)   # downmix to mono
+        if self._buf.dtype == np.int16:
+            chunk = chunk.astype(np.float32, copy=False) * (1.0 / 32768)
+        if (lengths == self.blocksize).all():
+            return list(chunk)
+        return [row[:n] for row, n in zip(chunk, lengths)]
+
+    def _check_status(self):
+        status = self.status
+        if status:
+            self.status = None
+            logger.warning(f"Audio status: {status}")
+        dropped = self.dropped
+        if dropped != self._dropped_seen:
+            logger.warning(f"Audio ring full — {dropped - self._dropped_seen} block(s) dropped")
+            self._dropped_seen = dropped
+
+
+class PreRollRing:
+    """Fixed-size circular buffer of the most recent raw int16 input.
+
+    Written by the audio callback while no recording is running, so the last
+    few seconds before Alt+Alt can be prepended to the next recording. Each
+    write is one or two slice copies into preallocated memory.
+    """
+
+    def __init__(self, seconds, samplerate, channels=1):
+        self.size = max(1, int(seconds * samplerate))
+        self._buf = np.zeros((self.size, channels), dtype=np.int16)
+        self.total = 0        # samples ever written — producer only
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+    def write(self, indata):
+        n = min(len(indata), self.size)
+        pos = self.total % self.size
+        first = min(n, self.size - pos)
+        self._buf[pos:pos + first] = indata[:first]
+        if first < n:
+            self._buf[:n - first] = indata[first:n]
+        self.total += len(indata)
+
+    def snapshot(self, end):
+        """Copy of the newest samples written before sample index `end` (oldest first)."""
+        n = min(end, self.size, self.total)
+        if n <= 0:
+            return self._buf[:0].copy()
+        idx = np.arange(end - n, end) % self.size
+        return self._buf[idx]
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+_capture.py — Gemeinsame Aufnahme-Schicht: native Geräterate → 16 kHz float32 mono.
+
+Bisher hat jeder Modus selbst aufgenommen: der Offline-Modus in der nativen
+Rate des Geräts (int16, bis zu 2 Kanäle), und Whisper hat die WAV beim Lesen
+über einen ffmpeg-Subprozess resampelt. Die Streaming-Modi haben 16 kHz
+erzwungen und sich auf das Resampling von PipeWire/PulseAudio verlassen
+(Qualität je nach Konfiguration, bei ALSA-Direktzugriff gar nicht verfügbar).
+
+Capture öffnet das Gerät in seiner nativen Rate und Kanalzahl. Der Callback
+kopiert nur in einen vorab allozierten Ring (_audioring). Auf der Worker-Seite
+wird mit NumPy auf Mono gemischt und blockweise mit einem Polyphasen-FIR
+(Kaiser-gefensterter Sinc) auf 16 kHz gebracht — ohne externen Prozess und
+ohne scipy. Was beim Modell ankommt, ist immer 16 kHz float32 mono.
+
+Zwei Betriebsarten:
+  - read():  Der Streaming-Worker holt selbst ab und bekommt 16-kHz-Blöcke
+             fester Größe samt RMS (wie bisher aus dem Callback). Nach stop()
+             liefert read() noch den Rest: Filter-Nachlauf des Resamplers und
+             den letzten, mit Nullen aufgefüllten Block; erst dann ist empty().
+  - collect: start(collect=True) startet einen eigenen Worker-Thread, der
+             während der Aufnahme resampelt; stop() liefert das ganze Array.
+             Optional bekommt on_audio(chunk) jedes Stück schon unterwegs
+             (Claude-Modus: Live-Transkript während der Aufnahme).
+
+Verwendung:
+    import _capture
+    cap = _capture.Capture(device_index, blocksize=1600)
+    cap.start()
+    blocks, rms = cap.read(timeout=0.1)     # Listen von 1600er-Blöcken @ 16 kHz
+    cap.stop()
+
+    cap.start(collect=True)                 # Offline-Modus
+    audio = cap.stop()                      # np.float32, 16 kHz mono
+
+Pre-roll (AUDIO_PREROLL=1.5): Der Eingang bleibt zwischen den Aufnahmen offen
+und der Callback schreibt die letzten Sekunden in einen int16-Ring. start()
+schaltet nur noch um — die Aufnahme beginnt sofort und enthält die 1,5 s vor
+Alt+Alt. Idle-CPU und Pufferspeicher stehen bei jedem Start im Log.
+
+    cap = _capture.Capture(device_index, 1600)
+    cap.open()                              # beim Programmstart, falls keep_open
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+
+import numpy as np
+import sounddevice as sd
+
+import _audioring
+import _vad  # block_rms: Pegel pro 16-kHz-Block, einzige Stelle dafür
+
+logger = logging.getLogger(__name__)
+
+TARGET_RATE = 16000
+BLOCK_SECONDS = 0.1   # Callback-Blockgröße in der nativen Rate
+QUALITY = 16          # halbe Filterlänge in Eingangs-Samples (bei Downsampling skaliert)
+ROLLOFF = 0.94        # Grenzfrequenz relativ zur neuen Nyquist-Frequenz
+KAISER_BETA = 8.6     # ≈ 80 dB Sperrdämpfung
+# Pre-roll: so viele Sekunden vor Alt+Alt werden mitgenommen (0 = aus). Hält den
+# Eingang dauerhaft offen — Kosten stehen beim nächsten Start im Log.
+PREROLL_SEC = float(os.environ.get('AUDIO_PREROLL', '0'))
+
+
+class Resampler:
+    """Streaming polyphase resampler (rational factor L/M, windowed sinc).
+
+    Output sample n is the filtered upsampled signal at time n·M, computed
+    directly from the K input samples that the polyphase branch touches — the
+    zero-stuffed signal is never built. State carries over between process()
+    calls, so block boundaries are seamless.
+    """
+
+    def __init__(self, in_rate, out_rate=TARGET_RATE):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g     # L
+        self.down = int(in_rate) // g    # M
+        self.identity = self.up == self.down
+        half = int(math.ceil(QUALITY * max(1.0, self.down / self.up)))
+        self.taps = 2 * half + 1         # K, taps per polyphase branch
+        self._center = half * self.up    # filter centre in upsampled samples
+        n = np.arange(self.taps * self.up, dtype=np.float64)
+        fc = ROLLOFF * 0.5 / max(self.up, self.down)   # cycles per upsampled sample
+        proto = 2 * fc * np.sinc(2 * fc * (n - self._center))
+        window = np.zeros_like(proto)
+        window[:2 * self._center + 1] = np.kaiser(2 * self._center + 1, KAISER_BETA)
+        proto *= window * self.up
+        # bank[p, k] = proto[p + k·L] — one row per output phase
+        self._bank = proto.reshape(self.taps, self.up).T.astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        # History starts with `taps` zeros at negative input indices.
+        self._x = np.zeros(self.taps, dtype=np.float32)
+        self._x0 = -self.taps    # absolute input index of self._x[0]
+        self._n_in = 0           # input samples received
+        self._n_out = 0          # next output index
+
+    def process(self, x, final=False):
+        """Feed input samples; return every output sample that is complete."""
+        x = np.asarray(x, dtype=np.float32)
+        if self.identity:
+            return x
+        if len(x):
+            self._x = np.concatenate((self._x, x))
+            self._n_in += len(x)
+        L, M = self.up, self.down
+        if final:
+            # Zero tail so the last outputs see the full filter support.
+            self._x = np.concatenate((self._x, np.zeros(self.taps, dtype=np.float32)))
+            n_end = -(-self._n_in * L // M)          # ceil: total output length
+        else:
+            n_end = (self._n_in * L - 1 - self._center) // M + 1
+        if n_end <= self._n_out:
+            return np.zeros(0, dtype=np.float32)
+        s = np.arange(self._n_out, n_end, dtype=np.int64) * M + self._center
+        phase = s % L
+        base = s // L - self._x0
+        idx = base[:, None] - np.arange(self.taps)[None, :]
+        y = np.einsum('nk,nk->n', self._bank[phase], self._x[idx])
+        self._n_out = n_end
+        # Keep only the history the next output still needs.
+        keep_from = (self._n_out * M + self._center) // L - (self.taps - 1) - self._x0
+        if keep_from > 0:
+            self._x = self._x[keep_from:]
+            self._x0 += keep_from
+        return y.astype(np.float32, copy=False)
+
+
+def native_format(device):
+    """(samplerate, channels) the device records in without conversion."""
+    info = sd.query_devices(device, 'input')
+    return int(info['default_samplerate']), max(1, min(int(info['max_input_channels']), 2))
+
+
+class Capture:
+    """Records at the device's native rate; hands out 16 kHz float32 mono.
+
+    With PREROLL_SEC > 0 the input stream stays open between recordings and
+    the callback keeps the last seconds in an int16 PreRollRing. start() then
+    only arms the callback — the first recorded block is preceded by that
+    pre-roll, so no syllable is lost to device start-up or the start beep.
+    """
+
+    def __init__(self, device=None, blocksize=1600, preroll=None):
+        self.device = device
+        self.blocksize = blocksize           # output block size (16 kHz domain)
+        self.rate, self.channels = native_format(device)
+        self.resampler = Resampler(self.rate, TARGET_RATE)
+        self.ring = _audioring.BlockRing(int(self.rate * BLOCK_SECONDS), self.rate,
+                                         channels=self.channels, dtype=np.int16)
+        preroll = PREROLL_SEC if preroll is None else preroll
+        self.preroll = (_audioring.PreRollRing(preroll, self.rate, self.channels)
+                        if preroll > 0 else None)
+        self.stream = None
+        self.recording = False   # callback → ring (set by the callback itself)
+        self._arm = False        # start() requested; next callback switches over
+        self._mark = None        # preroll.total at the switch
+        self._preroll_due = False
+        self._rest = np.zeros(0, dtype=np.float32)   # < blocksize leftover for read()
+        self._draining = False   # read mode after stop(): flush, then pad the last block
+        self._flushed = False    # resampler tail already handed out
+        self._collected = []
+        self._collector = None
+        self._collecting = False
+        self._on_audio = None
+        self._resample_time = 0.0
+        self._cb_time = 0.0      # s spent in the callback while idle
+        self._cb_count = 0
+        self._idle_since = None  # (wall, process cpu) when idling began
+
+    @property
+    def keep_open(self):
+        return self.preroll is not None
+
+    def describe(self):
+        return f"{self.rate} Hz, {self.channels}ch → {TARGET_RATE} Hz mono"
+
+    def memory_bytes(self):
+        return self.ring.nbytes + (self.preroll.nbytes if self.preroll is not None else 0)
+
+    def _callback(self, indata, frames, time_info, status):
+        if self.recording:
+            self.ring.write(indata, status)
+        elif self._arm:
+            # Switch over inside the callback: everything in the pre-roll up
+            # to here is complete, everything from here on goes to the ring.
+            self._mark = self.preroll.total if self.preroll is not None else None
+            self._arm = False
+            self.recording = True
+            self.ring.write(indata, status)
+        elif self.preroll is not None:
+            t0 = time.perf_counter()
+            self.preroll.write(indata)
+            self._cb_time += time.perf_counter() - t0
+            self._cb_count += 1
+
+    def open(self):
+        """Open and start the input stream (idle: feeds only the pre-roll)."""
+        if self.stream is not None:
+            return
+        self.stream = sd.InputStream(
+            device=self.device,
+            channels=self.channels,
+            samplerate=self.rate,
+            dtype='int16',
+            blocksize=self.ring.blocksize,
+            callback=self._callback,
+        )
+        self.stream.start()
+        self._idle_since = (time.monotonic(), time.process_time())
+        if self.preroll is not None:
+            logger.info(f"Capture open with {self.preroll.size / self.rate:.1f}s pre-roll "
+                        f"({self.describe()}, {self.memory_bytes() / 1024:.0f} KiB buffers)")
+
+    def close(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except Exception as e:
+                logger.warning(f"Error closing stream: {e}")
+            self.stream = None
+        self.recording = False
+
+    def idle_report(self):
+        """CPU/memory spent keeping the pre-roll alive since the last recording."""
+        if self._idle_since is None:
+            return "no idle period"
+        wall = time.monotonic() - self._idle_since[0]
+        cpu = time.process_time() - self._idle_since[1]
+        per_cb = self._cb_time / self._cb_count * 1e6 if self._cb_count else 0.0
+        return (f"idle {wall:.0f}s: process CPU {cpu / max(wall, 1e-6) * 100:.2f}% of one core, "
+                f"pre-roll callback {per_cb:.1f} µs avg over {self._cb_count} blocks, "
+                f"pre-roll {self.preroll.nbytes / 1024:.0f} KiB + ring {self.ring.nbytes / 1024:.0f} KiB")
+
+    def start(self, collect=False, on_audio=None):
+        if self.keep_open and self.stream is not None:
+            logger.info(f"Pre-roll {self.idle_report()}")
+        self._cb_time, self._cb_count = 0.0, 0
+        self.ring.clear()
+        self.resampler.reset()
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._draining = self._flushed = False
+        self._collected = []
+        self._resample_time = 0.0
+        self._mark = None
+        self._preroll_due = self.preroll is not None
+        self._arm = True
+        self.open()
+        logger.info(f"Capture started: {self.describe()}")
+        if collect:
+            self._on_audio = on_audio
+            self._collecting = True
+            self._collector = threading.Thread(target=self._collect, daemon=True)
+            self._collector.start()
+
+    def stop(self):
+        """Stop recording; in collect mode return the whole 16 kHz recording."""
+        self._arm = False
+        if self.keep_open:
+            self.recording = False     # back to feeding the pre-roll
+            self._idle_since = (time.monotonic(), time.process_time())
+        else:
+            self.close()
+        if self._collector is not None:
+            self._collecting = False
+            self._collector.join(timeout=10)
+            self._collector = None
+            tail = self.resampler.process([], final=True)
+            self._collected.append(tail)
+            if self._on_audio is not None and len(tail):
+                self._on_audio(tail)
+            audio = np.concatenate(self._collected)
+            self._collected = []
+            return audio
+        self._draining = True
+        return None
+
+    def empty(self):
+        """read() has nothing left — after stop() only once the tail is out.
+
+        The workers loop `while active or not capture.empty()`, so this is
+        asked only after the stop; until stop() has run, more audio may come.
+        """
+        return self._flushed and not len(self._rest)
+
+    def backlog_seconds(self):
+        return self.ring.qsize() * BLOCK_SECONDS
+
+    def _next_audio(self, timeout):
+        """Resampled 16 kHz audio that arrived since the last call (pre-roll first)."""
+        blocks = self.ring.get(timeout=timeout)
+        parts = []
+        if self._preroll_due and self._mark is not None:
+            self._preroll_due = False
+            raw = self.preroll.snapshot(self._mark)
+            if len(raw):
+                pre = raw.mean(axis=1, dtype=np.float32) * (1.0 / 32768)
+                logger.info(f"Pre-roll: {len(pre) / self.rate:.2f}s prepended")
+                parts.append(self.resampler.process(pre))
+        if blocks:
+            t0 = time.perf_counter()
+            parts.append(self.resampler.process(np.concatenate(blocks)))
+            self._resample_time += time.perf_counter() - t0
+        return np.concatenate(parts) if len(parts) > 1 else (parts[0] if parts else None)
+
+    def read(self, timeout=0.1):
+        """Return (blocks, rms): 16 kHz blocks of `blocksize` samples and their RMS.
+
+        After stop(), once the ring is empty, the resampler is flushed and the
+        last partial block comes out zero-padded to `blocksize`.
+        """
+        y = None if self._flushed else self._next_audio(timeout)
+        if y is not None and len(y):
+            self._rest = np.concatenate((self._rest, y)) if len(self._rest) else y
+        if self._draining and not self._flushed and self.ring.empty():
+            tail = self.resampler.process([], final=True)
+            pad = np.zeros(-(len(self._rest) + len(tail)) % self.blocksize, dtype=np.float32)
+            self._rest = np.concatenate((self._rest, tail, pad))
+            self._flushed = True
+        n = len(self._rest) // self.blocksize
+        if n == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        chunk = self._rest[:n * self.blocksize].reshape(n, self.blocksize)
+        self._rest = self._rest[n * self.blocksize:]
+        return list(chunk), _vad.block_rms(chunk)
+
+    def _collect(self):
+        while self._collecting or not self.ring.empty():
+            y = self._next_audio(0.1)
+            if y is not None:
+                self._collected.append(y)
+                if self._on_audio is not None:
+                    self._on_audio(y)
+        logger.info(f"Capture resampling: {self._resample_time * 1000:.0f} ms total "
+                    f"({self.describe()})")
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+_claude.py — Claude-CLI-Prozess, Latenz pro Turn und Gesprächsverlauf (Claude-Modus).
+
+Ohne Tk, Mikrofon oder Whisper: was transcription_claude.py mit der Claude-CLI
+und der Platte austauscht, liegt hier — dadurch lässt es sich gegen ein
+Fake-CLI testen (CLAUDE_BIN, tests/fake_claude.py).
+
+  • ClaudeSession    EIN dauerhafter `claude -p`-Prozess (stream-json), Turns über stdin
+  • TurnLatency      Zeitpunkte pro Turn → Statuszeile + JSONL (_metrics)
+  • latency_summary  Perzentile über die letzten N Turns (`--latency`)
+  • TranscriptStore  Verlauf als JSONL mit Offset-Index, liest Seiten nach
+
+Verwendung:
+    import _claude
+    session = _claude.ClaudeSession(session_id, cwd, binary="claude")
+    timing = _claude.TurnLatency()
+    answer = session.ask(prompt, on_text=print, timing=timing)
+    timing.save(LATENCY_LOG, len(prompt), len(answer), True, session=session_id)
+
+    store = _claude.TranscriptStore(session_id, directory)   # vorhandene Datei: fortsetzen
+    idx = store.append(["Hallo\\n", "user"])
+    store.read(0, len(store))
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import subprocess
+from array import array
+from collections import deque
+
+import _metrics  # JSONL-Historie und Perzentile
+
+logger = logging.getLogger(__name__)
+
+
+# ── Latenz pro Turn ─────────────────────────────────────────────────────────
+#
+# Ob eine langsame Antwort an Whisper, am CLI-Start oder am Modell liegt, war
+# bisher nicht zu sehen. Jeder Turn bekommt eine TurnLatency: Zeitpunkte
+# relativ zum Aufnahme-Stopp (bei Auto-Submit: geschätztes Sprechende), in die
+# Statuszeile und als JSONL-Zeile in die Latenz-Historie.
+LATENCY_STAGES = (        # (key, label) — each stage ends at this mark
+    ("transcribed", "Whisper"),
+    ("sent", "Senden/Prozess"),
+    ("first_byte", "erstes Byte"),
+    ("first_text", "erstes Token"),
+    ("last_byte", "letztes Byte"),
+)
+
+
+class TurnLatency:
+    """Monotonic marks for one turn, in seconds since the recording stopped."""
+
+    def __init__(self, trigger="stop", t0=None):
+        self.trigger = trigger
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+        self.respawned = False
+
+    def mark(self, name):
+        """Record `name` once (the first occurrence counts)."""
+        self.marks.setdefault(name, time.perf_counter() - self.t0)
+
+    def summary(self):
+        parts = [f"{label} {self.marks[key]:.2f}s"
+                 for key, label in LATENCY_STAGES if key in self.marks]
+        return "⏱ " + " · ".join(parts) + (" (neuer Prozess)" if self.respawned else "")
+
+    def save(self, path, prompt_chars, answer_chars, ok, **extra):
+        """Append this turn to the JSONL history at `path` (extra: session, persistent, …)."""
+        _metrics.append_jsonl(path, {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **extra,
+            "trigger": self.trigger,
+            "respawned": self.respawned,
+            "ok": ok,
+            "prompt_chars": prompt_chars,
+            "answer_chars": answer_chars,
+            **{key: round(v, 4) for key, v in self.marks.items()},
+        })
+        logger.info(f"Turn latency: {self.summary()}")
+
+
+def latency_summary(path, n=50):
+    """Print p50/p90/p99/max per stage over the last n turns."""
+    try:
+        records = _metrics.tail_jsonl(path, n)
+    except FileNotFoundError:
+        print(f"Noch keine Latenz-Historie ({path}).")
+        return
+    records = [r for r in records if r.get("ok")]
+    if not records:
+        print("Keine erfolgreichen Turns in der Historie.")
+        return
+    print(f"Latenz der letzten {len(records)} Turns (s seit Aufnahme-Stopp, {path}):")
+    print(f"  {'':<16}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}{'n':>6}")
+    for label, p50, p90, p99, top, count in _metrics.percentile_rows(records, LATENCY_STAGES):
+        print(f"  {label:<16}{p50:>8.2f}{p90:>8.2f}{p99:>8.2f}{top:>8.2f}{count:>6}")
+    respawns = sum(1 for r in records if r.get("respawned"))
+    pauses = sum(1 for r in records if r.get("trigger") == "pause")
+    print(f"  Prozess-Neustarts: {respawns} · Auto-Submit: {pauses}")
+
+
+# ── Dauerhafter Claude-Prozess (stream-json über stdin/stdout) ──────────────
+#
+# `claude -p … <prompt>` pro Turn kostet jedes Mal CLI-Start, Node-Init und das
+# Neuladen der Session von der Platte — Sekunden, bevor das erste Token kommt.
+# Stattdessen läuft EIN Prozess mit `--input-format stream-json` für die ganze
+# Sitzung: jeder Turn ist eine JSON-Zeile auf stdin, die Antwort kommt als
+# JSON-Events auf stdout (Text-Deltas dank --include-partial-messages), das
+# `result`-Event beendet den Turn. Der Prozess wird schon beim Start
+# vorgewärmt. Stirbt er, wird er beim nächsten Turn mit --resume neu gestartet.
+#
+# Protokoll (auch für ein Fake-CLI via CLAUDE_BIN):
+#   stdin:  {"type": "user", "message": {"role": "user", "content": [{"type": "text", "text": …}]}}
+#   stdout: {"type": "stream_event", "event": {"type": "content_block_delta",
+#                                              "delta": {"type": "text_delta", "text": …}}}
+#           {"type": "assistant", "message": {"content": [{"type": "text", "text": …}]}}
+#           {"type": "result", "is_error": false, "result": …}
+
+class TurnCancelled(Exception):
+    """The running turn was cancelled (auto-submit: speech resumed)."""
+
+
+class ClaudeSession:
+    """One long-lived Claude CLI process; turns are fed over stdin."""
+
+    def __init__(self, session_id, cwd, binary="claude", model="", permission_mode="",
+                 resume=False):
+        self.session_id = session_id
+        self.cwd = cwd
+        self.binary = binary
+        self.model = model
+        self.permission_mode = permission_mode
+        self.proc = None
+        self.turns = 0                     # completed turns
+        self._sent = resume                # session exists → (re)spawn with --resume
+        self._in_turn = False
+        self._cancel = False
+        self._stderr = deque(maxlen=20)    # tail for error messages
+        self._lock = threading.Lock()
+
+    def _command(self):
+        cmd = [self.binary, "-p",
+               "--input-format", "stream-json", "--output-format", "stream-json",
+               "--verbose", "--include-partial-messages",
+               "--resume" if self._sent else "--session-id", self.session_id]
+        if self.model:
+            cmd += ["--model", self.model]
+        if self.permission_mode:
+            cmd += ["--permission-mode", self.permission_mode]
+        return cmd
+
+    def _drain_stderr(self, proc):
+        with proc.stderr:
+            for line in proc.stderr:
+                self._stderr.append(line.rstrip())
+
+    def _drop(self):
+        """Forget the exited process and close its pipes (stderr: drain thread)."""
+        proc, self.proc = self.proc, None
+        for pipe in (proc.stdin, proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass                           # stdin: unflushed data to a dead process
+
+    def start(self):
+        """Spawn the CLI if it is not running (called at startup to pre-warm).
+
+        Returns True if a new process was spawned.
+        """
+        if self.proc is not None and self.proc.poll() is None:
+            return False
+        cmd = self._command()
+        t0 = time.perf_counter()
+        self._stderr.clear()
+        self.proc = subprocess.Popen(
+            cmd, cwd=self.cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, text=True, bufsize=1,
+        )
+        threading.Thread(target=self._drain_stderr, args=(self.proc,), daemon=True).start()
+        logger.info(f"claude session process: {' '.join(cmd)} "
+                    f"(pid {self.proc.pid}, spawn {(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return True
+
+    def _send(self, prompt):
+        line = json.dumps({"type": "user", "message": {
+            "role": "user", "content": [{"type": "text", "text": prompt}]}}, ensure_ascii=False)
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+        self._sent = True
+
+    def ask(self, prompt, on_text, timing=None):
+        """Send one turn; on_text(chunk) gets the answer as it streams in.
+
+        Returns the complete answer text. Raises RuntimeError if the process
+        dies mid-turn (the next call starts a new one with --resume).
+        """
+        timing = timing or TurnLatency()
+        with self._lock:
+            self._cancel = False
+            self._in_turn = True
+            try:
+                timing.respawned = self.start()
+                try:
+                    self._send(prompt)
+                except (BrokenPipeError, OSError):
+                    if self._cancel:
+                        raise TurnCancelled()
+                    self.proc.wait()
+                    self._drop()              # died while idle → one fresh attempt
+                    timing.respawned = self.start()
+                    self._send(prompt)
+                timing.mark("sent")
+                return self._read_turn(on_text, timing)
+            finally:
+                self._in_turn = False
+
+    def cancel(self):
+        """Abort the running turn from another thread.
+
+        The CLI has no per-turn abort on stdin, so the process is killed; the
+        next turn respawns it with --resume (warm again after ~1 CLI start).
+        """
+        proc = self.proc
+        if proc is not None and self._in_turn:
+            self._cancel = True
+            proc.kill()
+
+    def _read_turn(self, on_text, timing):
+        parts = []
+        streamed = False
+        for line in self.proc.stdout:
+            timing.mark("first_byte")
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            kind = event.get("type")
+            if kind == "stream_event":
+                delta = event.get("event", {}).get("delta", {})
+                if delta.get("type") == "text_delta" and delta.get("text"):
+                    streamed = True
+                    parts.append(delta["text"])
+                    on_text(delta["text"])
+            elif kind == "assistant" and not streamed:
+                # CLI without partial messages: whole message at once.
+                for block in event.get("message", {}).get("content", []):
+                    if block.get("type") == "text" and block.get("text"):
+                        parts.append(block["text"])
+                        on_text(block["text"])
+            elif kind == "result":
+                timing.mark("last_byte")
+                self.turns += 1
+                if event.get("is_error"):
+                    raise RuntimeError(event.get("result") or "Claude meldet einen Fehler")
+                if not parts and event.get("result"):
+                    parts.append(event["result"])
+                    on_text(event["result"])
+                return "".join(parts)
+        # EOF before `result`: the CLI exited (or cancel() killed it).
+        self.proc.wait()
+        if self._cancel:
+            self._drop()
+            raise TurnCancelled()
+        err = f"exit {self.proc.returncode}" + "".join(f" | {l}" for l in list(self._stderr)[-3:])
+        self._drop()
+        raise RuntimeError(f"Claude-Prozess beendet ({err})")
+
+    def close(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=2)
+            except Exception:
+                self.proc.kill()
+                self.proc.wait()
+        self._drop()
+
+
+# ── Verlauf auf der Platte, im Fenster nur das Ende ─────────────────────────
+#
+# Nach einem Arbeitstag voller Turns hielt das ScrolledText Megabytes an
+# getaggtem Text; jedes insert/see('end') wurde merklich langsamer. Jetzt geht
+# jedes Widget-Update als eine JSONL-Zeile in einen Session-Store auf der
+# Platte; das Fenster zeigt nur das Ende und lädt beim Zurückscrollen nach.
+
+class TranscriptStore:
+    """Append-only JSONL of [text, tag, …] records with an offset index.
+
+    Only the byte offsets (8 bytes per record) stay in memory; records are
+    read back from disk on demand.
+    """
+
+    UNREADABLE = ["⚠ unlesbarer Eintrag\n", "sys"]
+
+    def __init__(self, session_id, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{session_id}.jsonl")
+        self._file = open(self.path, "a+b")
+        self._offsets = array("q")
+        self._file.seek(0)
+        pos = 0
+        for line in self._file:          # resumed session: index what is there
+            if not line.endswith(b"\n"):
+                # Torn last line (crash mid-write): cut it off, or the next
+                # append would continue it.
+                logger.warning(f"{self.path}: incomplete last record dropped ({len(line)} bytes)")
+                self._file.truncate(pos)
+                break
+            self._offsets.append(pos)
+            pos += len(line)
+        self._file.seek(0, os.SEEK_END)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def append(self, runs):
+        """Store one record, return its index."""
+        self._file.seek(0, os.SEEK_END)
+        self._offsets.append(self._file.tell())
+        self._file.write(json.dumps(runs, ensure_ascii=False).encode() + b"\n")
+        self._file.flush()
+        return len(self._offsets) - 1
+
+    def read(self, start, stop):
+        """Records start..stop-1 (an unreadable line comes back as UNREADABLE)."""
+        if start >= stop:
+            return []
+        self._file.seek(self._offsets[start])
+        records = []
+        for _ in range(stop - start):
+            line = self._file.readline()
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"{self.path}: unreadable record {start + len(records)}: {line[:80]!r}")
+                records.append(self.UNREADABLE)
+        self._file.seek(0, os.SEEK_END)
+        return records
+
+    def close(self):
+        self._file.close()
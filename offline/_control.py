@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+_control.py — Laufende Instanz umkonfigurieren, ohne Neustart.
+
+Bisher hieß jede Änderung an WHISPER_MODEL, AUDIO_DEVICE oder den
+Streaming-Parametern: Unit aus setup-service.sh anpassen, Service neu starten,
+torch neu importieren, Modell neu laden. Jetzt lauscht jede Instanz auf einem
+lokalen Unix-Socket (nur für den eigenen Benutzer), und `transcription ctl`
+ändert Einstellungen im laufenden Prozess:
+
+    transcription ctl                       Status + aktuelle Werte
+    transcription ctl list                  Was sich ändern lässt
+    transcription ctl model=medium          Modell im Hintergrund laden, dann umschalten
+    transcription ctl device=7 beam=3       Mehrere Werte auf einmal
+    transcription ctl STREAM_MIN_CHUNK=1.5  Umgebungsvariablen-Namen gehen auch
+
+Ein neues Modell wird in einem Hintergrund-Thread geladen und aufgewärmt,
+während das alte weiterarbeitet. Erst wenn es bereit ist, wird die Referenz
+in einem Schritt umgesetzt. Eine laufende Aufnahme ist davon nicht betroffen.
+Geräte- und Streaming-Parameter gelten ab der nächsten Aufnahme.
+
+Protokoll: eine JSON-Zeile pro Verbindung hin, eine zurück.
+    {"cmd": "get"} | {"cmd": "list"} | {"cmd": "set", "values": {"model": "medium"}}
+
+Verwendung (im Modus):
+    import _control
+    ctl = _control.ControlServer("vad")
+    ctl.register("min_silence", *_control.module_value(mod, "MIN_SILENCE", float, 0.1, 5),
+                 "Pausenlänge in s", aliases=("STREAM_MIN_SILENCE",))
+    ctl.start()
+"""
+
+import os
+import sys
+import time
+import json
+import socket
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.environ.get('TRANSCRIPTION_CTL_SOCKET') or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR", "/tmp"),
+    f"desktop_transcription.{os.getuid()}.sock",
+)
+
+
+TYPERS = ('ydotool', 'wtype', 'clipboard')
+
+
+def module_value(module, attr, kind=float, lo=None, hi=None):
+    """(getter, setter) for a module-level constant such as MIN_SILENCE.
+
+    The modes read these globals at the start of each recording/stream, so a
+    new value takes effect with the next Alt+Alt.
+    """
+    def getter():
+        return getattr(module, attr)
+
+    def setter(raw):
+        value = kind(raw)
+        if (lo is not None and value < lo) or (hi is not None and value > hi):
+            raise ValueError(f"{value} außerhalb von [{lo}, {hi}]")
+        setattr(module, attr, value)
+        return value
+    return getter, setter
+
+
+def typer_setting(module):
+    """(getter, setter) for the typing backend of a module with TYPER,
+    detect_typer(), ensure_ydotoold() and _wtype_works() (_typer or a mode)."""
+    def getter():
+        return module.TYPER
+
+    def setter(raw):
+        name = raw.strip().lower()
+        if name == 'auto':
+            return module.detect_typer()
+        if name not in TYPERS:
+            raise ValueError(f"erwartet {'/'.join(TYPERS)}/auto")
+        if name == 'ydotool' and not module.ensure_ydotoold():
+            raise ValueError("ydotoold nicht erreichbar")
+        if name == 'wtype' and not module._wtype_works():
+            raise ValueError("wtype nicht nutzbar (nur wlroots-Compositoren)")
+        module.TYPER = name
+        return name
+    return getter, setter
+
+
+class BackgroundSwap:
+    """Loads a replacement model off-thread, then hands it over in one step.
+
+    `load(name)` does the slow part (and warms the model up); `install(name,
+    model)` swaps the reference the transcription code reads; `current()`
+    names the active model. Only one load runs at a time; a newer request
+    while loading becomes the next one.
+    """
+
+    def __init__(self, current, load, install):
+        self._current = current
+        self._load = load
+        self._install = install
+        self._lock = threading.Lock()
+        self.loading = None
+        self._next = None
+
+    def describe(self):
+        loading = self.loading
+        return f"{self._current()} (lade {loading})" if loading else self._current()
+
+    def request(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("Modellname fehlt")
+        with self._lock:
+            if self.loading is not None:
+                self._next = name
+                return f"{name} (wird nach {self.loading} geladen)"
+            if name == self._current():
+                return f"{name} (bereits aktiv)"
+            self.loading = name
+        threading.Thread(target=self._run, args=(name,), daemon=True).start()
+        return f"{name} (lädt im Hintergrund, bisheriges Modell arbeitet weiter)"
+
+    def _run(self, name):
+        while name is not None:
+            if name != self._current():
+                try:
+                    t0 = time.monotonic()
+                    model = self._load(name)
+                    self._install(name, model)
+                    logger.info(f"Control: model switched to {name} "
+                                f"(loaded + warmed in {time.monotonic() - t0:.1f}s)")
+                    print(f"🔁 Modell gewechselt: {name}")
+                except Exception as e:
+                    logger.error(f"Control: loading model {name} failed: {e}")
+                    print(f"✗ Modell {name} konnte nicht geladen werden: {e}")
+            with self._lock:
+                name, self._next = self._next, None
+                self.loading = name
+
+
+class ControlServer:
+    """Unix-socket server for `transcription ctl` (one JSON line per request)."""
+
+    def __init__(self, mode, path=SOCKET_PATH):
+        self.mode = mode
+        self.path = path
+        self.settings = {}    # key -> (getter, setter, help)
+        self.aliases = {}     # alias (lower-case) -> key
+        self.sock = None
+
+    def register(self, key, getter, setter, help="", aliases=()):
+        self.settings[key] = (getter, setter, help)
+        self.aliases[key.lower()] = key
+        for alias in aliases:
+            self.aliases[alias.lower()] = key
+
+    def start(self):
+        # We hold the single-instance lock, so a leftover socket file is stale.
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        try:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            self.sock.listen(4)
+        except OSError as e:
+            logger.warning(f"Control socket unavailable ({self.path}): {e}")
+            self.sock = None
+            return False
+        threading.Thread(target=self._serve, daemon=True).start()
+        logger.info(f"Control socket: {self.path}")
+        return True
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _addr = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    conn.settimeout(5)
+                    data = b""
+                    while not data.endswith(b"\n"):
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                    reply = self.handle(json.loads(data.decode() or "{}"))
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e)}
+                try:
+                    conn.sendall((json.dumps(reply, ensure_ascii=False) + "\n").encode())
+                except OSError:
+                    pass
+
+    def snapshot(self):
+        values = {}
+        for key, (getter, _setter, _help) in self.settings.items():
+            try:
+                values[key] = getter()
+            except Exception as e:
+                values[key] = f"? ({e})"
+        return values
+
+    def handle(self, request):
+        cmd = request.get("cmd", "get")
+        if cmd == "get":
+            return {"ok": True, "mode": self.mode, "pid": os.getpid(), "settings": self.snapshot()}
+        if cmd == "list":
+            return {"ok": True, "mode": self.mode,
+                    "settings": {k: h for k, (_g, _s, h) in self.settings.items()}}
+        if cmd == "set":
+            messages, errors = [], []
+            for raw_key, raw in request.get("values", {}).items():
+                key = self.aliases.get(raw_key.lower())
+                if key is None:
+                    errors.append(f"{raw_key}: unbekannt im Modus {self.mode}")
+                    continue
+                try:
+                    result = self.settings[key][1](str(raw))
+                    messages.append(f"{key} = {result}")
+                    logger.info(f"Control: {key} = {result}")
+                except Exception as e:
+                    errors.append(f"{key}: {e}")
+            return {"ok": not errors, "messages": messages, "errors": errors}
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+
+# ── Client: `transcription ctl …` ───────────────────────────────────────────
+
+def request(payload, path=SOCKET_PATH, timeout=5):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        s.sendall((json.dumps(payload) + "\n").encode())
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode())
+
+
+def main(argv):
+    if argv and argv[0] in ("-h", "--help"):
+        print(__doc__.split("Protokoll:")[0].strip())
+        return 0
+    if not argv or argv == ["status"] or argv == ["get"]:
+        payload = {"cmd": "get"}
+    elif argv == ["list"]:
+        payload = {"cmd": "list"}
+    else:
+        args = argv[1:] if argv[0] == "set" else argv
+        values = {}
+        for arg in args:
+            if "=" not in arg:
+                print(f"✗ Erwartet key=value, nicht {arg!r}", file=sys.stderr)
+                return 2
+            key, value = arg.split("=", 1)
+            values[key.strip()] = value.strip()
+        payload = {"cmd": "set", "values": values}
+    try:
+        reply = request(payload)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("✗ Keine laufende Transcription-Instanz (kein Control-Socket unter "
+              f"{SOCKET_PATH}).", file=sys.stderr)
+        return 1
+    if payload["cmd"] == "get" and reply.get("ok"):
+        print(f"Modus: {reply['mode']}  (PID {reply['pid']})")
+        for key, value in reply["settings"].items():
+            print(f"  {key:<16} {value}")
+    elif payload["cmd"] == "list" and reply.get("ok"):
+        print(f"Modus: {reply['mode']} — änderbar:")
+        for key, help_text in reply["settings"].items():
+            print(f"  {key:<16} {help_text}")
+    else:
+        for msg in reply.get("messages", []):
+            print(f"✓ {msg}")
+        for err in reply.get("errors", []) + ([reply["error"]] if "error" in reply else []):
+            print(f"✗ {err}", file=sys.stderr)
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
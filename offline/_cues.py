@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+_cues.py — Start-/Stopp-Beeps ohne Subprozess und ohne Blockieren.
+
+Bisher lief jeder Beep über `subprocess.run(['paplay', wav])`: Prozessstart,
+WAV lesen, Stream öffnen — 100–300 ms, in denen die Aufnahme noch nicht lief
+bzw. der Worker stand. Der CuePlayer hält die Beeps als PCM im Speicher und
+spielt sie über einen dauerhaft offenen Output-Stream. play() tauscht nur eine
+Referenz aus (Mikrosekunden); den Rest erledigt der Audio-Callback, der sonst
+Stille liefert.
+
+Kann kein Output-Stream geöffnet werden (kein Gerät, exklusiv belegt), wird
+paplay im Hintergrund gestartet — ebenfalls ohne zu warten.
+
+Die Beeps selbst entstehen ebenfalls hier (write_beeps), für alle Modi gleich:
+Start ein kurzer Ton, Stopp ein fallender Zweiklang — mit weichem Ein-/Ausblenden
+gegen Knacksen. Vorher erzeugte jeder Modus eigene WAVs unter demselben Namen.
+
+Verwendung:
+    import _cues
+    START_BEEP_PATH, STOP_BEEP_PATH = _cues.write_beeps(TRANSCRIPTION_DIR)
+    _cues.preload([START_BEEP_PATH, STOP_BEEP_PATH], output_device_index)
+    _cues.play(START_BEEP_PATH, output_device_index)    # kehrt sofort zurück
+"""
+
+import os
+import time
+import logging
+import subprocess
+
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+CUE_RATE = 48000      # Rate der erzeugten Beep-WAVs
+BLOCKSIZE = 256       # ~5 ms pro Callback → Beep startet praktisch sofort
+
+# (Frequenzen in Hz, Dauer in s) — Start: einzelner Ton, Stopp: 900 → 500 Hz.
+START_TONE = ((800,), 0.15)
+STOP_TONE = ((900, 500), 0.3)
+VOLUME = 0.5
+
+_player = None
+
+
+def tone(frequencies, duration=0.2, volume=VOLUME, rate=CUE_RATE):
+    """Render a sequence of tones as an int16 stereo array (short fade in/out)."""
+    seg = duration / len(frequencies)
+    parts = []
+    for freq in frequencies:
+        n = int(rate * seg)
+        t = np.linspace(0, seg, n, endpoint=False)
+        env = np.minimum(1.0, np.minimum(t, seg - t) * 60)
+        parts.append(np.sin(2 * np.pi * freq * t) * env * volume)
+    waveform = (np.concatenate(parts) * 32767).astype(np.int16)
+    return np.column_stack([waveform, waveform])
+
+
+def write_beeps(directory):
+    """Write start_beep.wav/stop_beep.wav into `directory`; return both paths."""
+    paths = []
+    for name, (frequencies, duration) in (("start_beep.wav", START_TONE),
+                                          ("stop_beep.wav", STOP_TONE)):
+        path = os.path.join(directory, name)
+        sf.write(path, tone(frequencies, duration), CUE_RATE, subtype='PCM_16')
+        paths.append(path)
+    return tuple(paths)
+
+
+class CuePlayer:
+    """Plays preloaded int16 cues on one persistent output stream."""
+
+    def __init__(self, device=None):
+        self.device = device
+        self.stream = None
+        self.rate = CUE_RATE
+        self.channels = 2
+        self._cues = {}            # path -> int16 array (frames, channels) at self.rate
+        self._req = (0, None)      # (sequence, cue) — replaced atomically by play()
+        self._seen = 0             # sequence the callback is playing — callback only
+        self._cue = None
+        self._pos = 0
+
+    def open(self):
+        """Open the output stream once; False if no stream can be used."""
+        if self.stream is not None:
+            return True
+        try:
+            info = sd.query_devices(self.device, 'output')
+            self.channels = max(1, min(int(info['max_output_channels']), 2))
+            for rate in (CUE_RATE, int(info['default_samplerate'])):
+                try:
+                    self.stream = sd.OutputStream(
+                        device=self.device, samplerate=rate, channels=self.channels,
+                        dtype='int16', blocksize=BLOCKSIZE, latency='low',
+                        callback=self._callback)
+                    self.rate = rate
+                    break
+                except Exception as e:
+                    logger.debug(f"Cue stream @ {rate} Hz not possible: {e}")
+            if self.stream is None:
+                return False
+            self.stream.start()
+            logger.info(f"Cue player: persistent output stream @ {self.rate} Hz, {self.channels}ch")
+            return True
+        except Exception as e:
+            logger.warning(f"Cue player unavailable, falling back to paplay: {e}")
+            self.stream = None
+            return False
+
+    def close(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except Exception as e:
+                logger.warning(f"Error closing cue stream: {e}")
+            self.stream = None
+
+    def load(self, path):
+        """Read a WAV once, converted to the stream's rate and channel count."""
+        cue = self._cues.get(path)
+        if cue is not None:
+            return cue
+        data, fs = sf.read(path, dtype='int16', always_2d=True)
+        if fs != self.rate:
+            import _capture   # same polyphase resampler as the capture path
+            chans = [_capture.Resampler(fs, self.rate).process(data[:, c] / 32768.0, final=True)
+                     for c in range(data.shape[1])]
+            data = np.clip(np.stack(chans, axis=1) * 32767, -32768, 32767).astype(np.int16)
+        if data.shape[1] >= self.channels:
+            data = data[:, :self.channels]
+        else:
+            data = np.repeat(data[:, :1], self.channels, axis=1)
+        cue = np.ascontiguousarray(data)
+        self._cues[path] = cue
+        return cue
+
+    def play(self, path):
+        """Start a cue and return immediately (replaces a cue still playing)."""
+        t0 = time.perf_counter()
+        if not self.open():
+            _paplay_async(path)
+            return
+        try:
+            cue = self.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load cue {path}: {e}")
+            return
+        self._req = (self._req[0] + 1, cue)
+        logger.debug(f"Cue dispatched in {(time.perf_counter() - t0) * 1e6:.0f} µs")
+
+    def _callback(self, outdata, frames, time_info, status):
+        seq, cue = self._req
+        if seq != self._seen:
+            self._seen = seq
+            self._cue, self._pos = cue, 0
+        cue = self._cue
+        if cue is None:
+            outdata.fill(0)
+            return
+        n = min(frames, len(cue) - self._pos)
+        outdata[:n] = cue[self._pos:self._pos + n]
+        outdata[n:] = 0
+        self._pos += n
+        if self._pos >= len(cue):
+            self._cue = None
+
+
+def _paplay_async(path):
+    try:
+        subprocess.Popen(['paplay', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        logger.warning(f"Could not play sound: {e}")
+
+
+def get_player(device=None):
+    """One player per process (the output device is chosen once at startup)."""
+    global _player
+    if _player is None:
+        _player = CuePlayer(device)
+    return _player
+
+
+def preload(paths, device=None):
+    """Open the stream and decode the cues up front, so the first play() is instant."""
+    player = get_player(device)
+    if player.open():
+        for path in paths:
+            try:
+                player.load(path)
+            except Exception as e:
+                logger.warning(f"Could not load cue {path}: {e}")
+
+
+def play(path, device=None):
+    get_player(device).play(path)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+_devices.py — Input-/Output-Gerät beim Start wählen (alle Modi).
+
+Bisher trug jeder Modus eine eigene Kopie von select_audio_device(),
+select_output_device() und select_auto_device() — mit leicht
+auseinandergelaufenen Ausgaben und Logs. Jetzt gibt es eine Auswahl-Logik:
+
+  • AUDIO_DEVICE / AUDIO_OUTPUT_DEVICE  — Index aus der Umgebung (Service)
+  • -d (nicht interaktiv)              — System-Default, kein Menü
+  • -a                                 — EIN Gerät für Input und Output
+  • sonst                              — Menü auf der Konsole
+
+select() liefert (input, output) und setzt sd.default.device, damit
+sounddevice keine unpassende I/O-Kombination wählt.
+
+Verwendung:
+    import _devices
+    device_index, output_device_index = _devices.select(auto=args.auto,
+                                                        interactive=not args.default)
+"""
+
+import os
+import sys
+import logging
+
+import sounddevice as sd
+
+logger = logging.getLogger(__name__)
+
+
+def input_from_env():
+    """AUDIO_DEVICE as an int, or None."""
+    env_device = os.environ.get('AUDIO_DEVICE')
+    if env_device:
+        try:
+            return int(env_device)
+        except ValueError:
+            return None
+    return None
+
+
+def _choose(devices_list, default_list_idx, prompt):
+    """Ask on the console until a valid entry of devices_list is picked."""
+    while True:
+        try:
+            choice = input(f"{prompt} [0-{len(devices_list)-1}], Enter=Default: ").strip()
+            choice_idx = default_list_idx if choice == "" else int(choice)
+            if choice_idx < 0 or choice_idx >= len(devices_list):
+                print("Invalid selection!")
+                continue
+            return devices_list[choice_idx]
+        except ValueError:
+            print("Invalid selection!")
+
+
+def select_output(interactive=False):
+    """Output device for the beeps: env, default or menu. None if there is none."""
+    env_device = os.environ.get('AUDIO_OUTPUT_DEVICE')
+    if env_device:
+        try:
+            index = int(env_device)
+            dev_info = sd.query_devices(index)
+            print(f"✓ Using output from environment: {dev_info['name']}\n")
+            return index
+        except Exception as e:
+            logger.warning(f"AUDIO_OUTPUT_DEVICE env var invalid: {e}")
+
+    if not interactive:
+        index = sd.default.device[1]
+        dev_info = sd.query_devices(index)
+        logger.info(f"Using default output device: {index} - {dev_info['name']}")
+        return index
+
+    print("\n=== AVAILABLE OUTPUT DEVICES (Lautsprecher/Kopfhörer) ===\n")
+    devices_list = []
+    all_devices = sd.query_devices()
+    for idx, device in enumerate(all_devices):
+        if device['max_output_channels'] > 0:
+            devices_list.append(idx)
+            is_default = " ← DEFAULT" if idx == sd.default.device[1] else ""
+            print(f"[{len(devices_list)-1}] Device #{idx}: {device['name']}{is_default}")
+            print(f"         Channels: {device['max_output_channels']}, Rate: {device['default_samplerate']} Hz")
+    print()
+    if len(devices_list) == 0:
+        logger.warning("No audio output devices found!")
+        return None
+
+    default_list_idx = next((i for i, d in enumerate(devices_list) if d == sd.default.device[1]), 0)
+    index = _choose(devices_list, default_list_idx, "Select OUTPUT device for beeps")
+    selected_name = all_devices[index]['name']
+    print(f"\n✓ Output: {selected_name}\n")
+    logger.info(f"Selected output device {index}: {selected_name}")
+    return index
+
+
+def select_auto():
+    """ONE device for input and output (e.g. a headset)."""
+    all_devices = sd.query_devices()
+    devices_list = [idx for idx, device in enumerate(all_devices)
+                    if device['max_input_channels'] > 0 and device['max_output_channels'] > 0]
+    if len(devices_list) == 0:
+        raise RuntimeError("No devices with both input and output found!")
+
+    default_list_idx = next((i for i, d in enumerate(devices_list) if d == sd.default.device[0]), 0)
+
+    # Non-interactive mode (e.g. systemd service): use default automatically
+    if not sys.stdin.isatty():
+        index = devices_list[default_list_idx]
+        selected_name = all_devices[index]['name']
+        print(f"✓ Auto-selected default device: {selected_name} (Input + Output)\n")
+        logger.info(f"Auto-selected device {index} for both input and output: {selected_name}")
+        return index
+
+    print("\n=== SELECT DEVICE FOR INPUT + OUTPUT ===\n")
+    for i, idx in enumerate(devices_list):
+        device = all_devices[idx]
+        is_default = " ← DEFAULT" if idx == sd.default.device[0] else ""
+        print(f"[{i}] Device #{idx}: {device['name']}{is_default}")
+        print(f"         Input: {device['max_input_channels']}ch, Output: {device['max_output_channels']}ch, Rate: {device['default_samplerate']} Hz")
+    print()
+
+    index = _choose(devices_list, default_list_idx, "Select device")
+    selected_name = all_devices[index]['name']
+    print(f"\n✓ Using: {selected_name} (Input + Output)\n")
+    logger.info(f"Selected device {index} for both input and output: {selected_name}")
+    return index
+
+
+def select_input(interactive=False):
+    """Microphone: AUDIO_DEVICE, default or menu."""
+    env_device = input_from_env()
+    if env_device is not None:
+        try:
+            dev_info = sd.query_devices(env_device)
+            if dev_info['max_input_channels'] > 0:
+                logger.info(f"Using device from AUDIO_DEVICE env var: {env_device} - {dev_info['name']}")
+                print(f"✓ Using device from environment: {dev_info['name']}\n")
+                return env_device
+        except Exception as e:
+            logger.warning(f"AUDIO_DEVICE env var invalid: {e}")
+
+    if not interactive:
+        index = sd.default.device[0]
+        dev_info = sd.query_devices(index)
+        if dev_info['max_input_channels'] > 0:
+            logger.info(f"Using default input device: {index} - {dev_info['name']}")
+            return index
+
+    print("\n=== AVAILABLE MICROPHONE DEVICES (Audio Input) ===\n")
+    devices_list = []
+    all_devices = sd.query_devices()
+    for idx, device in enumerate(all_devices):
+        if device['max_input_channels'] > 0:
+            devices_list.append(idx)
+            is_default = " ← DEFAULT" if idx == sd.default.device[0] else ""
+            print(f"[{len(devices_list)-1}] Device #{idx}: {device['name']}{is_default}")
+            print(f"         Channels: {device['max_input_channels']}, Rate: {device['default_samplerate']} Hz")
+    print()
+    if len(devices_list) == 0:
+        raise RuntimeError("No audio input devices found!")
+
+    if len(devices_list) == 1:
+        logger.info(f"Auto-selected device: {all_devices[devices_list[0]]['name']}")
+        return devices_list[0]
+
+    default_list_idx = next((i for i, d in enumerate(devices_list) if d == sd.default.device[0]), 0)
+    index = _choose(devices_list, default_list_idx, "Select device")
+    selected_name = all_devices[index]['name']
+    print(f"\n✓ Using: {selected_name}\n")
+    logger.info(f"Selected device {index}: {selected_name}")
+    return index
+
+
+def select(auto=False, interactive=True):
+    """(input, output) for this run; raises if no usable input exists.
+
+    A failing output selection is not fatal — the beeps then use the default.
+    """
+    if auto:
+        input_index = output_index = select_auto()
+    else:
+        input_index = select_input(interactive=interactive)
+        try:
+            output_index = select_output(interactive=interactive)
+        except Exception as e:
+            print(f"Error selecting output device: {e}")
+            output_index = None
+    # Explicit defaults for sounddevice (prevents I/O combination errors)
+    if input_index is not None and output_index is not None:
+        sd.default.device = [input_index, output_index]
+        logger.info(f"Default devices set: input={input_index}, output={output_index}")
+    return input_index, output_index
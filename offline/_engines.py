@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+_engines.py — Whisper-Modelle laden, vorwärmen und im Betrieb tauschen (alle Modi).
+
+Bisher hatte jeder Modus seinen eigenen get_whisper_model()/get_model(),
+_load_*_warm() und _install_*() — drei Kopien für openai-whisper, eine für
+faster-whisper. Eine Engine kapselt jetzt für eine Bibliothek:
+
+  • get()          Modell beim ersten Aufruf laden und behalten
+  • load_warm()    NEUE Instanz laden + einmal dekodieren (Modellwechsel über
+                   `transcription ctl`; nie die Instanz eines laufenden Streams)
+  • install()      gewärmtes Modell übernehmen (ab nächster Aufnahme)
+  • swap           BackgroundSwap für `ctl model=…`
+  • decode         RunningStat der Decode-Zeiten (_metrics)
+
+WhisperEngine (openai-whisper) nutzen Offline-, VAD- und Claude-Modus,
+FasterWhisperEngine (CTranslate2) das LocalAgreement-Streaming; sie hält mehrere
+Modelle (Kaskade: schnelles Vorschau- + genaues Bestätigungsmodell). Die
+Bibliotheken werden erst beim Laden importiert — ein Modus braucht nur seine.
+
+Verwendung:
+    import _engines
+    engine = _engines.WhisperEngine()          # WHISPER_MODEL, Standard: small
+    engine.get()                               # beim Start vorladen
+    text = engine.transcribe(audio)            # 16 kHz float32, Vokabular-Prompt
+
+    engine = _engines.FasterWhisperEngine(busy=lambda: stream.active)
+    model = engine.get()                       # bzw. engine.get("tiny") für die Kaskade
+"""
+
+import os
+import time
+import logging
+
+import numpy as np
+
+import _control  # BackgroundSwap für `transcription ctl model=…`
+import _metrics  # Decode-Zeiten
+import _vocabulary  # Fachbegriffe/Namen als Whisper-Prompt
+
+logger = logging.getLogger(__name__)
+
+SAMPLERATE = 16000   # Whisper-Eingang
+
+
+def _cuda():
+    import torch
+    return torch.cuda.is_available()
+
+
+class Engine:
+    """One model family: load once, warm replacements off-thread, swap live."""
+
+    label = "Whisper"
+
+    def __init__(self, name=None):
+        self.name = self.canonical(name or os.environ.get('WHISPER_MODEL', 'small'))
+        self.decode = _metrics.RunningStat()
+        self.swap = _control.BackgroundSwap(lambda: self.name, self.load_warm, self.install)
+
+    @staticmethod
+    def canonical(name):
+        return name
+
+    def load(self, name):
+        """Load a new model instance (never cached here)."""
+        print(f"📥 Loading {self.label} {name} model (one-time)...")
+        logger.info(f"Loading {self.label} {name} model...")
+        t0 = time.perf_counter()
+        model = self._load(name)
+        logger.info(f"{self.label} {name} model loaded in {time.perf_counter() - t0:.1f}s")
+        print(f"✓ {self.label} {name} ready")
+        return model
+
+    def load_warm(self, name):
+        """Load a fresh model and run one short decode so its first pass is not slow."""
+        model = self.load(self.canonical(name))
+        self._warm(model)
+        return model
+
+    def _load(self, name):
+        raise NotImplementedError
+
+    def _warm(self, model):
+        raise NotImplementedError
+
+
+class WhisperEngine(Engine):
+    """openai-whisper: one active model, replaced by `transcription ctl`."""
+
+    def __init__(self, name=None):
+        super().__init__(name)
+        self.model = None
+
+    def get(self):
+        if self.model is None:
+            self.model = self.load(self.name)
+        return self.model
+
+    def install(self, name, model):
+        self.name, self.model = name, model   # the next transcription uses it
+
+    def _load(self, name):
+        import whisper
+        return whisper.load_model(name)
+
+    def _warm(self, model):
+        model.transcribe(np.zeros(SAMPLERATE, dtype=np.float32), language="de",
+                         fp16=_cuda())
+
+    def transcribe(self, audio):
+        """Text of a 16 kHz float32 array (or, for compatibility, a file path)."""
+        model = self.get()
+        prompt = _vocabulary.get_prompt()
+        t0 = time.perf_counter()
+        result = model.transcribe(audio, language="de", task="transcribe",
+                                  fp16=_cuda(), initial_prompt=prompt)
+        dt = time.perf_counter() - t0
+        self.decode.add(dt)
+        logger.info(f"Whisper decode {dt * 1000:.0f} ms "
+                    f"(vocabulary prompt: {'on' if prompt else 'off'})")
+        logger.info(f"Transcription result: {result['text']}")
+        return result["text"]
+
+
+class FasterWhisperEngine(Engine):
+    """faster-whisper (CTranslate2): models cached per name.
+
+    `busy()` tells whether a stream is running — then a replaced model is not
+    dropped from the cache (the stream keeps decoding with its reference);
+    names in `keep` (the cascade's fast tier) are never dropped.
+    """
+
+    label = "faster-whisper"
+
+    def __init__(self, name=None, busy=lambda: False, keep=()):
+        super().__init__(name)
+        self.models = {}
+        self.busy = busy
+        self.keep = tuple(self.canonical(n) for n in keep if n)
+
+    @staticmethod
+    def canonical(name):
+        return {'large': 'large-v3'}.get(name, name)
+
+    def get(self, name=None):
+        """Cached model `name` (default: the active one), loaded on first use."""
+        name = self.canonical(name or self.name)
+        model = self.models.get(name)
+        if model is None:
+            model = self.models[name] = self.load(name)
+        return model
+
+    def install(self, name, model):
+        old, self.name = self.name, self.canonical(name)
+        self.models[self.name] = model   # the warm instance serves the next stream
+        if old not in (self.name, *self.keep) and not self.busy():
+            self.models.pop(old, None)   # free the old weights
+
+    def _load(self, name):
+        from faster_whisper import WhisperModel
+        device = "cuda" if _cuda() else "cpu"
+        compute = "float16" if device == "cuda" else "int8"
+        logger.info(f"faster-whisper {name} on {device}/{compute}")
+        return WhisperModel(name, device=device, compute_type=compute)
+
+    def _warm(self, model):
+        segments, _info = model.transcribe(np.zeros(SAMPLERATE, dtype=np.float32),
+                                           language="de", beam_size=1)
+        list(segments)   # the generator does the work
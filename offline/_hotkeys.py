@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+_hotkeys.py — Alt+Alt-Erkennung über alle Tastaturen in EINER Event-Schleife.
+
+Bisher lief pro Tastatur ein Thread in `device.read_loop()`, und der
+Hauptthread schaute alle 5 s nach, ob einer davon gestorben war. Ein
+abgezogenes Headset/Dock wurde so bis zu 5 s zu spät bemerkt und führte zu
+`os._exit(75)` plus Neustart durch den Wrapper — samt Modell-Neuladen.
+
+DoubleTapListener wartet mit `selectors` auf alle evdev-Dateideskriptoren und
+zusätzlich auf einen inotify-Watch auf /dev/input. Neue Tastaturen werden
+sofort angehängt (IN_CREATE/IN_ATTRIB — udev setzt die Rechte oft erst kurz
+nach dem Anlegen), entfernte sofort abgehängt (IN_DELETE bzw. ENODEV beim
+Lesen). Kein Neustart, keine Threads pro Gerät. Ohne inotify (ctypes/libc
+nicht verfügbar) wird /dev/input alle RESCAN_INTERVAL Sekunden neu gelesen.
+
+Der Doppel-Tipp-Handler läuft in einem eigenen Thread, damit eine lange
+Aktion (Offline-Modus: Transkription beim Stopp) die Schleife nicht aufhält.
+Die Tipp-Abstände kommen aus den Kernel-Zeitstempeln der Events — gepufferte
+Tastendrücke werden also nicht fälschlich als Doppel-Tipp gewertet.
+
+Verwendung:
+    import _hotkeys
+    devices = _hotkeys.find_keyboards()
+    _hotkeys.listen(on_double_tap, devices, lambda: _shutdown_requested,
+                    on_shutdown=stop_if_active)          # blockiert bis Shutdown
+
+    listener = _hotkeys.DoubleTapListener(on_double_tap, devices)   # low-level
+    listener.run(lambda: _shutdown_requested)
+    listener.close()
+"""
+
+import os
+import time
+import errno
+import queue
+import struct
+import ctypes
+import logging
+import selectors
+import threading
+
+from evdev import InputDevice, ecodes, list_devices
+
+logger = logging.getLogger(__name__)
+
+DOUBLE_TAP_TIMEOUT = 0.5    # s zwischen zwei Alt-Drücken
+RESCAN_INTERVAL = 2.0       # s, nur ohne inotify
+INPUT_DIR = "/dev/input"
+ALT_KEYS = (ecodes.KEY_LEFTALT, ecodes.KEY_RIGHTALT)
+
+# inotify (linux/inotify.h)
+_IN_ATTRIB = 0x00000004
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')   # wd, mask, cookie, len
+
+
+def is_keyboard(device):
+    """Same heuristic the modes always used: EV_KEY plus a keyboard-ish name."""
+    if ecodes.EV_KEY not in device.capabilities():
+        return False
+    name = device.name.lower()
+    return 'keyboard' in name or 'key' in name or 'at translated' in name
+
+
+def find_keyboards():
+    """All keyboards present at startup; RuntimeError if there is none."""
+    devices = []
+    for path in list_devices():
+        device = InputDevice(path)
+        if is_keyboard(device):
+            devices.append(device)
+            logger.info(f"Found keyboard device: {device.path} - {device.name}")
+            print(f"  ✓ {device.path} - {device.name}")
+        else:
+            device.close()
+    if not devices:
+        raise RuntimeError("No keyboard devices found!")
+    return devices
+
+
+def _inotify_open(path):
+    """Return a non-blocking inotify fd watching `path`, or None."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if libc.inotify_add_watch(fd, os.fsencode(path), _IN_CREATE | _IN_DELETE | _IN_ATTRIB) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch")
+        return fd
+    except Exception as e:
+        logger.warning(f"inotify unavailable ({e}) — rescanning {path} every {RESCAN_INTERVAL}s")
+        return None
+
+
+class DoubleTapListener:
+    """Watches all keyboards in one selector loop and reports Alt+Alt."""
+
+    def __init__(self, on_double_tap, devices=(), timeout=DOUBLE_TAP_TIMEOUT):
+        self.on_double_tap = on_double_tap
+        self.timeout = timeout
+        self.sel = selectors.DefaultSelector()
+        self.devices = {}           # path -> InputDevice
+        self._last_alt = None       # kernel timestamp of the last Alt press
+        self._actions = queue.Queue()
+        self._inotify = _inotify_open(INPUT_DIR)
+        if self._inotify is not None:
+            self.sel.register(self._inotify, selectors.EVENT_READ, None)
+        for device in devices:
+            self.attach(device)
+        threading.Thread(target=self._run_actions, daemon=True).start()
+
+    # ── devices ───────────────────────────────────────────────────────────
+    def attach(self, device):
+        if device.path in self.devices:
+            return
+        self.devices[device.path] = device
+        self.sel.register(device.fd, selectors.EVENT_READ, device)
+        logger.info(f"Monitoring device: {device.path} - {device.name}")
+        print(f"✓ Listening on: {device.path} ({device.name})")
+
+    def detach(self, path, reason=""):
+        device = self.devices.pop(path, None)
+        if device is None:
+            return
+        try:
+            self.sel.unregister(device.fd)
+        except (KeyError, ValueError, OSError):
+            pass
+        try:
+            device.close()
+        except Exception:
+            pass
+        logger.warning(f"Keyboard {path} ({device.name}) removed{f' ({reason})' if reason else ''}")
+        print(f"⏏️  Tastatur getrennt: {device.name}")
+        if not self.devices:
+            print("⌨️  Keine Tastatur mehr — warte auf Anschluss...")
+
+    def _try_attach(self, path):
+        if path in self.devices or not os.path.basename(path).startswith('event'):
+            return
+        try:
+            device = InputDevice(path)
+        except OSError:
+            return   # no permission yet — IN_ATTRIB follows once udev has set it
+        if is_keyboard(device):
+            self.attach(device)
+            print(f"🔌 Tastatur angeschlossen: {device.name}")
+        else:
+            device.close()
+
+    def _rescan(self):
+        present = set(list_devices())
+        for path in list(self.devices):
+            if path not in present:
+                self.detach(path, "gone")
+        for path in present:
+            self._try_attach(path)
+
+    def _on_inotify(self):
+        try:
+            data = os.read(self._inotify, 4096)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b'\0').decode(errors='replace')
+            pos += length
+            path = os.path.join(INPUT_DIR, name)
+            if mask & _IN_DELETE:
+                self.detach(path, "unplugged")
+            elif mask & (_IN_CREATE | _IN_ATTRIB):
+                self._try_attach(path)
+
+    # ── events ────────────────────────────────────────────────────────────
+    def _on_device(self, device):
+        try:
+            for event in device.read():
+                if (event.type == ecodes.EV_KEY and event.value == 1
+                        and event.code in ALT_KEYS):
+                    self._alt_pressed(event.timestamp())
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            if e.errno in (errno.ENODEV, errno.EIO, errno.EBADF):
+                self.detach(device.path, str(e))
+            else:
+                logger.error(f"Error reading {device.path}: {e}")
+
+    def _alt_pressed(self, ts):
+        if self._last_alt is not None and ts - self._last_alt < self.timeout:
+            logger.info("*** DOUBLE-TAP DETECTED ***")
+            self._last_alt = None
+            self._actions.put(True)
+        else:
+            self._last_alt = ts
+
+    def _run_actions(self):
+        while True:
+            self._actions.get()
+            try:
+                self.on_double_tap()
+            except Exception as e:
+                logger.error(f"Double-tap handler failed: {e}")
+
+    def run(self, should_stop):
+        """Dispatch events until should_stop() returns True."""
+        next_scan = time.monotonic() + RESCAN_INTERVAL
+        while not should_stop():
+            events = self.sel.select(timeout=0.5)
+            if self._inotify is None and time.monotonic() >= next_scan:
+                self._rescan()
+                next_scan = time.monotonic() + RESCAN_INTERVAL
+            for key, _mask in events:
+                if key.data is None:
+                    self._on_inotify()
+                else:
+                    self._on_device(key.data)
+
+    def close(self):
+        for path in list(self.devices):
+            device = self.devices.pop(path)
+            try:
+                device.close()
+            except Exception:
+                pass
+        if self._inotify is not None:
+            os.close(self._inotify)
+            self._inotify = None
+        self.sel.close()
+
+
+def listen(on_double_tap, devices, should_stop, on_shutdown=None):
+    """Run a DoubleTapListener until should_stop(); then on_shutdown() and close.
+
+    The shutdown sequence every mode used: log, stop a running recording or
+    stream (errors ignored), release the devices.
+    """
+    listener = DoubleTapListener(on_double_tap, devices)
+    try:
+        listener.run(should_stop)
+    except KeyboardInterrupt:
+        pass
+
+    logger.info("Exiting...")
+    print("\n⏹️  Shutting down...")
+    if on_shutdown is not None:
+        try:
+            on_shutdown()
+        except Exception:
+            pass
+    listener.close()
+    print("✓ Goodbye!")
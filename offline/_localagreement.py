@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""
+_localagreement.py — Kern des wortweisen Streamings (LocalAgreement, faster-whisper).
+
+Ein wachsender Audio-Puffer wird wiederholt transkribiert; festgeschrieben wird
+nur der Wort-Präfix, der über AGREEMENT aufeinanderfolgende Läufe stabil bleibt
+(Macháček et al., "whisper_streaming"). Hier liegt alles, was dafür nötig ist,
+ohne Audio-Gerät, Tastatur oder Tipp-Backend — der Modus
+transcription_faster_streaming.py verdrahtet es nur noch:
+
+  • HypothesisBuffer              LocalAgreement-n + Wahrscheinlichkeits-Abkürzung
+  • IncrementalFeatureExtractor   Log-Mel des bekannten Puffer-Präfixes cachen
+  • OnlineASRProcessor            Puffer, Prompt-Kontext, Schnitt an Satzenden
+  • CascadeConfirmer              fertige Sätze mit dem großen Modell bestätigen
+  • CadenceScheduler              Update-Takt an die Decode-Zeit anpassen
+
+Die Stellschrauben sind Modul-Konstanten (Umgebung, `transcription ctl` setzt
+sie im laufenden Betrieb). Das Modell ist ein faster-whisper-WhisperModel oder
+alles mit derselben transcribe()-Signatur.
+
+Verwendung:
+    import _localagreement
+    online = _localagreement.OnlineASRProcessor(model)
+    online.insert_audio_chunk(audio)          # 16 kHz float32
+    words = online.process_iter()             # neu festgeschriebene Wörter
+    words += online.finish()                  # beim Stopp: Rest übernehmen
+"""
+
+import os
+import time
+import logging
+from collections import deque
+
+import numpy as np
+
+import _metrics  # Commit-Lag, Decode-Zeit, Echtzeitfaktor
+import _vocabulary  # Fachbegriffe/Namen als Whisper-Prompt
+
+logger = logging.getLogger(__name__)
+
+samplerate = 16000   # Whisper-Eingang
+
+# ─── Stellschrauben (Umgebung; `transcription ctl` ändert sie live) ───
+# Trim the working buffer once it grows past this (keeps the model fast).
+MAX_BUFFER = float(os.environ.get('STREAM_MAX_BUFFER', '18.0'))  # s
+# Regular trimming as in whisper_streaming: once the buffer exceeds TRIM_SEC,
+# cut at the end of the last committed sentence ('sentence') or the last
+# completed Whisper segment ('segment'); 'off' = only the MAX_BUFFER cut.
+TRIM_MODE = os.environ.get('STREAM_TRIM', 'sentence').strip().lower()
+TRIM_SEC = float(os.environ.get('STREAM_TRIM_SEC', '5.0'))      # s
+# Committed text scrolled out of the buffer is fed back as prompt context.
+CONTEXT_CHARS = int(os.environ.get('STREAM_CONTEXT_CHARS', '200'))
+# Beam size — 1 keeps latency low; higher = a bit more accurate but slower.
+BEAM_SIZE = int(os.environ.get('STREAM_BEAM', '1'))
+# LocalAgreement-n: a word is committed once it leads the hypothesis in this
+# many consecutive runs (2 = classic LocalAgreement-2; 3+ = steadier, slower).
+AGREEMENT = max(2, int(os.environ.get('STREAM_AGREEMENT', '2')))
+# Fast path: commit a leading word right away if its probability is at least
+# this (0 = off). Trades stability for latency.
+COMMIT_PROB = float(os.environ.get('STREAM_COMMIT_PROB', '0'))
+# Cascade: confirm at the latest after this many seconds without a sentence end.
+CASCADE_SPAN = float(os.environ.get('STREAM_CASCADE_SPAN', '8.0'))  # s
+# Adaptive cadence: decoding should take ~TARGET_RTF of the time between passes.
+TARGET_RTF = float(os.environ.get('STREAM_TARGET_RTF', '0.6'))
+CADENCE_MIN = float(os.environ.get('STREAM_CADENCE_MIN', '0.6'))  # s
+CADENCE_MAX = float(os.environ.get('STREAM_CADENCE_MAX', '4.0'))  # s
+# Cache log-mel frames of the already-seen buffer prefix between passes.
+INCREMENTAL_MEL = os.environ.get('STREAM_INCREMENTAL_MEL', '1') != '0'
+
+
+# ─────────────────────── LocalAgreement streaming core ───────────────────────
+#
+# Port of the HypothesisBuffer / OnlineASRProcessor logic from
+# whisper_streaming (Macháček, Dabre, Bojar 2023), trimmed to what we need.
+# A word is only "committed" once it appears as the leading word in TWO
+# consecutive transcription runs — giving stable, non-flickering output.
+
+class HypothesisBuffer:
+    """LocalAgreement-n word buffers with bounded, O(1)-pop storage.
+
+    Words are held as (start, end, word_id, text, probability) in deques; word
+    ids are interned per stream so the n-gram overlap check and the agreement
+    compare small ints instead of re-joined strings. Only the last
+    COMMITTED_KEEP committed words are kept — the overlap check looks at five at
+    most — and the id table is rebuilt from the words still held whenever the
+    buffer is trimmed (or grows past IDS_KEEP), so memory stays flat however
+    long the session runs.
+
+    A word is committed when it leads the hypothesis in `agreement` consecutive
+    runs, or — with `commit_prob` > 0 — as soon as faster-whisper is at least
+    that sure of it. Each commit records its lag (stream time at commit minus
+    the word's end) for the latency stats.
+    """
+
+    COMMITTED_KEEP = 32
+    IDS_KEEP = 4096
+
+    def __init__(self, agreement=AGREEMENT, commit_prob=COMMIT_PROB):
+        self.committed_in_buffer = deque(maxlen=self.COMMITTED_KEEP)  # already emitted
+        self.history = deque(maxlen=agreement - 1)  # previous runs' unconfirmed tails
+        self.new = deque()              # current run's words
+        self.commit_prob = commit_prob
+        self.last_committed_time = 0.0
+        self.last_committed_word = None
+        self.lag = _metrics.RunningStat()   # s from a word's end to its commit
+        self._ids = {}                  # word text -> interned id (words still held)
+        self._next_id = 0
+
+    @property
+    def buffer(self):
+        """Most recent run's still-unconfirmed tail."""
+        return self.history[-1] if self.history else deque()
+
+    def _wid(self, text):
+        wid = self._ids.get(text)
+        if wid is None:
+            wid = self._ids[text] = self._next_id
+            self._next_id += 1
+        return wid
+
+    def _prune_ids(self):
+        """Keep only the ids of words still in the buffers (ids stay unique)."""
+        self._ids = {item[3]: item[2]
+                     for run in (self.committed_in_buffer, *self.history, self.new)
+                     for item in run}
+
+    def insert(self, words, offset):
+        # words: list of (start, end, text[, probability]) relative to the buffer start
+        if len(self._ids) > self.IDS_KEEP:
+            self._prune_ids()
+        threshold = self.last_committed_time - 0.1
+        self.new = deque((w[0] + offset, w[1] + offset, self._wid(w[2]), w[2],
+                          w[3] if len(w) > 3 else 0.0)
+                         for w in words if w[0] + offset > threshold)
+
+        if self.new:
+            a = self.new[0][0]
+            if abs(a - self.last_committed_time) < 1.0 and self.committed_in_buffer:
+                # Drop words whose n-gram was already committed (overlap from re-decoding).
+                cn = len(self.committed_in_buffer)
+                nn = len(self.new)
+                for i in range(1, min(cn, nn, 5) + 1):
+                    c = tuple(self.committed_in_buffer[-j][2] for j in range(i, 0, -1))
+                    tail = tuple(self.new[j][2] for j in range(i))
+                    if c == tail:
+                        for _ in range(i):
+                            self.new.popleft()
+                        break
+
+    def _commit(self, item, now=None):
+        self.committed_in_buffer.append(item)
+        self.last_committed_word = item[3]
+        self.last_committed_time = item[1]
+        if now is not None:
+            lag = max(0.0, now - item[1])
+            self.lag.add(lag)
+            logger.debug(f"commit {item[3]!r} lag {lag:.2f}s (p={item[4]:.2f})")
+        return item[0], item[1], item[3]
+
+    def flush(self, now=None):
+        """Commit the longest prefix shared by this run and the previous
+        agreement-1 runs, plus any confidently recognized words after it.
+
+        `now` is the stream time of the newest audio, for the lag stats.
+        """
+        commit = []
+        if len(self.history) == self.history.maxlen:
+            while self.new:
+                wid = self.new[0][2]
+                k = len(commit)
+                if all(len(run) > k and run[k][2] == wid for run in self.history):
+                    commit.append(self.new.popleft())
+                else:
+                    break
+        if self.commit_prob > 0:
+            while self.new and self.new[0][4] >= self.commit_prob:
+                commit.append(self.new.popleft())
+
+        # Drop the committed words from the older runs; a run that disagrees
+        # with what was committed (fast path) can no longer vote.
+        wids = [item[2] for item in commit]
+        for run in list(self.history):
+            if [item[2] for item in list(run)[:len(wids)]] == wids:
+                for _ in wids:
+                    run.popleft()
+            else:
+                self.history.remove(run)
+        self.history.append(self.new)
+        self.new = deque()
+        return [self._commit(item, now) for item in commit]
+
+    def commit_pending(self, now=None):
+        """Commit everything not yet emitted (final pass, nothing left to agree with)."""
+        pending = self.new or self.buffer
+        final = [self._commit(item, now) for item in pending]
+        self.history.clear()
+        self.new = deque()
+        return final
+
+    def complete(self):
+        """Return whatever is still un-committed (used on final stop)."""
+        return [(a, b, t) for a, b, _wid, t, _p in self.buffer]
+
+    def pop_committed(self, t):
+        """Forget committed words that end before `t` (buffer was cut there)."""
+        while self.committed_in_buffer and self.committed_in_buffer[0][1] <= t:
+            self.committed_in_buffer.popleft()
+        self._prune_ids()
+
+    def lag_summary(self):
+        if not self.lag.count:
+            return "no commits"
+        return (f"{self.lag.count} words, mean commit lag {self.lag.mean:.2f}s, "
+                f"max {self.lag.max:.2f}s (agreement {self.history.maxlen + 1}, "
+                f"commit_prob {self.commit_prob or 'off'})")
+
+
+class IncrementalFeatureExtractor:
+    """Drop-in wrapper for faster-whisper's FeatureExtractor that caches the
+    log-mel frames of the audio prefix it has already seen.
+
+    LocalAgreement re-transcribes the whole growing buffer every pass, so the
+    STFT/mel of all earlier audio used to be recomputed each time. A mel frame
+    only depends on the n_fft samples around it; once the buffer has grown past
+    a frame's window, that frame is final. Here only frames touching NEW samples
+    (plus the short tail into the padding) are computed; frames lying entirely
+    in the zero padding are the constant log10(1e-10). The global
+    "max - 8 dB" clamp is applied on the assembled frames, exactly as upstream.
+
+    The Whisper encoder itself attends over the full 30 s window in both
+    directions, so its state cannot be carried over between passes — only the
+    front-end is incremental.
+
+    Safety net: the first full and the first incremental result are compared to
+    the wrapped extractor's own output; on any mismatch (other faster-whisper
+    version, different STFT) the wrapper disables itself and just delegates.
+    """
+
+    def __init__(self, base):
+        import inspect
+        self.base = base
+        self.n_fft = base.n_fft
+        self.hop = base.hop_length
+        self.filters = np.asarray(base.mel_filters, dtype=np.float32)
+        self.window = np.hanning(self.n_fft + 1)[:-1].astype(np.float32)
+        try:
+            self._default_padding = inspect.signature(base.__call__).parameters['padding'].default
+        except (KeyError, TypeError, ValueError):
+            self._default_padding = True
+        self._audio = np.array([], dtype=np.float32)
+        self._frames = np.zeros((self.filters.shape[0], 0), dtype=np.float32)
+        self._checks = {'full': False, 'incremental': False}
+        self.enabled = True
+        self._dtype = None
+
+    def __getattr__(self, name):
+        # sampling_rate, nb_max_frames, time_per_frame, … come from the original.
+        return getattr(self.base, name)
+
+    def reset(self):
+        self._audio = np.array([], dtype=np.float32)
+        self._frames = self._frames[:, :0]
+
+    def __call__(self, waveform, padding=None, chunk_length=None, **kwargs):
+        if padding is None:
+            padding = self._default_padding
+        if not self.enabled or chunk_length is not None or kwargs:
+            return self.base(waveform, padding=padding, chunk_length=chunk_length, **kwargs)
+
+        audio = np.asarray(waveform, dtype=np.float32)
+        feats, reused = self._features(audio, padding)
+
+        kind = 'incremental' if reused else 'full'
+        if not self._checks[kind]:
+            ref = self.base(waveform, padding=padding)
+            if (not isinstance(ref, np.ndarray) or ref.shape != feats.shape
+                    or not np.allclose(ref, feats, atol=1e-3)):
+                logger.warning("Incremental mel front-end disagrees with faster-whisper's "
+                               "extractor — falling back to full recomputation")
+                self.enabled = False
+                return ref
+            self._checks[kind] = True
+            self._dtype = ref.dtype
+            logger.info(f"Incremental mel front-end verified ({kind} pass)")
+        if self._dtype is not None and feats.dtype != self._dtype:
+            feats = feats.astype(self._dtype)
+        return feats
+
+    def _pad_samples(self, padding):
+        if padding is True:
+            return int(self.base.n_samples)
+        return int(padding) if padding else 0
+
+    def _log_mel(self, xp, start, stop):
+        """Raw log10 mel for frames [start, stop) of the centre-padded signal xp."""
+        if stop <= start:
+            return np.zeros((self.filters.shape[0], 0), dtype=np.float32)
+        seg = xp[start * self.hop:(stop - 1) * self.hop + self.n_fft]
+        frames = np.lib.stride_tricks.sliding_window_view(seg, self.n_fft)[::self.hop]
+        spec = np.fft.rfft(frames * self.window, axis=-1)
+        power = (spec.real ** 2 + spec.imag ** 2).astype(np.float32)
+        return np.log10(np.maximum(self.filters @ power.T, 1e-10))
+
+    def _features(self, audio, padding):
+        n = len(audio)
+        pad = self._pad_samples(padding)
+        half = self.n_fft // 2
+        total = (n + pad) // self.hop          # frames after dropping the last one
+
+        # How many cached frames are still valid: common prefix with last call.
+        old = self._audio
+        m = min(n, len(old))
+        if m:
+            diff = np.flatnonzero(audio[:m] != old[:m])
+            m = int(diff[0]) if diff.size else m
+        k = 0
+        if m > half:
+            k = min(self._frames.shape[1], (m - half) // self.hop + 1, total)
+
+        x = np.concatenate([audio, np.zeros(pad, dtype=np.float32)]) if pad else audio
+        xp = np.pad(x, half, mode='reflect')
+        if pad > half:
+            # frames whose window lies entirely in the zero padding are constant
+            first_zero = min(total, -(-(n + half) // self.hop))
+        else:
+            first_zero = total
+        new = self._log_mel(xp, k, first_zero)
+        zeros = np.full((self.filters.shape[0], total - max(k, first_zero)), -10.0, dtype=np.float32)
+        raw = np.concatenate([self._frames[:, :k], new, zeros], axis=1)
+
+        # Cache only frames whose window is fully inside real audio.
+        stable = min(total, (n - half) // self.hop + 1) if n > half else 0
+        self._frames = raw[:, :stable]
+        self._audio = audio.copy()
+        logger.debug(f"mel: reused {k}/{total} frames, computed {new.shape[1]}")
+
+        log_spec = np.maximum(raw, raw.max() - 8.0)
+        return (log_spec + 4.0) / 4.0, k > 0
+
+
+class OnlineASRProcessor:
+    def __init__(self, model):
+        self.model = model
+        if INCREMENTAL_MEL and hasattr(model, 'feature_extractor'):
+            if not isinstance(model.feature_extractor, IncrementalFeatureExtractor):
+                model.feature_extractor = IncrementalFeatureExtractor(model.feature_extractor)
+            model.feature_extractor.reset()
+        self.audio_buffer = np.array([], dtype=np.float32)
+        self.buffer_time_offset = 0.0
+        self.hyp = HypothesisBuffer()
+        self.committed_tail = deque(maxlen=64)  # recent committed words for the prompt
+        self.segment_ends = []                  # last pass's segment ends (buffer-relative)
+        self._context_tokens = []               # cached: only changes when the buffer is cut
+        self.beam_size = BEAM_SIZE              # may be lowered by CadenceScheduler
+        self.last_committed = []                # (start, end, text) of the last pass
+        self.decode = _metrics.RunningStat()    # s per pass
+
+    def insert_audio_chunk(self, audio):
+        self.audio_buffer = np.append(self.audio_buffer, audio)
+
+    def stream_time(self):
+        """Stream time (s) of the newest buffered sample."""
+        return self.buffer_time_offset + len(self.audio_buffer) / samplerate
+
+    def _prompt_tokens(self):
+        """Vocabulary tokens + context of committed text no longer in the buffer.
+
+        Whisper keeps only the last 223 prompt tokens, so the context goes last
+        and the vocabulary part is shortened if both don't fit.
+        """
+        vocab = _vocabulary.get_prompt_tokens(self.model) or []
+        ctx = self._context_tokens
+        room = _vocabulary.MAX_PROMPT_TOKENS - len(ctx)
+        tokens = vocab[:max(0, room)] + ctx
+        return tokens or None
+
+    def _update_context(self):
+        """Re-tokenize the context prompt after a cut (not on every pass)."""
+        words = [t for _a, b, t in self.committed_tail if b <= self.buffer_time_offset]
+        text, n = [], 0
+        while words and n < CONTEXT_CHARS:
+            w = words.pop()
+            text.append(w)
+            n += len(w)
+        text = "".join(reversed(text)).strip()
+        self._context_tokens = []
+        if text and hasattr(self.model, 'hf_tokenizer'):
+            self._context_tokens = self.model.hf_tokenizer.encode(
+                " " + text, add_special_tokens=False).ids
+
+    def _transcribe(self):
+        # Prompt as cached token ids — not re-tokenized per pass.
+        prompt = self._prompt_tokens()
+        t0 = time.perf_counter()
+        segments, _info = self.model.transcribe(
+            self.audio_buffer,
+            language="de",
+            task="transcribe",
+            beam_size=self.beam_size,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            vad_filter=True,
+            initial_prompt=prompt,
+        )
+        words = []
+        self.segment_ends = []
+        for seg in segments:
+            self.segment_ends.append(seg.end)
+            if seg.words:
+                for w in seg.words:
+                    words.append((w.start, w.end, w.word, w.probability))
+        dt = time.perf_counter() - t0
+        self.decode.add(dt)
+        logger.debug(f"decode {dt * 1000:.0f} ms for "
+                     f"{len(self.audio_buffer) / samplerate:.1f}s audio "
+                     f"(prompt: {len(prompt) if prompt else 0} tokens)")
+        return words
+
+    def process_iter(self):
+        """Run one transcription pass; return newly committed words (list of text)."""
+        words = self._transcribe()
+        self.hyp.insert(words, self.buffer_time_offset)
+        committed = self.hyp.flush(now=self.stream_time())
+        self.committed_tail.extend(committed)
+        self.last_committed = committed
+
+        buf_len = len(self.audio_buffer) / samplerate
+        if TRIM_MODE != 'off' and buf_len > TRIM_SEC:
+            cut = self._completed_sentence_end() if TRIM_MODE == 'sentence' else None
+            if cut is None:
+                cut = self._completed_segment_end()
+            if cut is not None:
+                self.chunk_at(cut)
+                buf_len = len(self.audio_buffer) / samplerate
+
+        # Hard cap: once it is long, drop everything up to the last committed
+        # word so the model stays fast.
+        if buf_len > MAX_BUFFER and self.hyp.last_committed_time > self.buffer_time_offset:
+            self.chunk_at(self.hyp.last_committed_time)
+
+        return [t for _a, _b, t in committed]
+
+    def _completed_sentence_end(self):
+        """End time of the last committed word that closes a sentence."""
+        for a, b, t in reversed(self.committed_tail):
+            if b <= self.buffer_time_offset:
+                break
+            if t.rstrip().endswith(('.', '?', '!', '…')):
+                return b
+        return None
+
+    def _completed_segment_end(self):
+        """End of the last Whisper segment that is fully committed — the
+        second-to-last segment at most, the last one may still change."""
+        ends = [e + self.buffer_time_offset for e in self.segment_ends[:-1]]
+        for e in reversed(ends):
+            if e <= self.hyp.last_committed_time:
+                return e if e > self.buffer_time_offset else None
+        return None
+
+    def chunk_at(self, t):
+        """Drop buffered audio before `t` (absolute seconds)."""
+        cut_samples = int((t - self.buffer_time_offset) * samplerate)
+        if cut_samples <= 0:
+            return
+        self.audio_buffer = self.audio_buffer[cut_samples:]
+        self.buffer_time_offset = t
+        self.hyp.pop_committed(t)
+        self._update_context()
+        logger.debug(f"buffer cut at {t:.2f}s → {len(self.audio_buffer) / samplerate:.1f}s left")
+
+    def finish(self):
+        """Final pass on stop: transcribe whatever audio is still buffered and
+        commit ALL words not yet emitted, so the tail of speech is never cut off.
+
+        During streaming LocalAgreement only commits words stable across two runs,
+        which leaves the last ~chunk of speech un-emitted. Here there is no "next
+        run" to agree with, so the final transcription is taken as authoritative.
+        """
+        if len(self.audio_buffer) == 0:
+            return [t for _a, _b, t in self.hyp.complete()]
+
+        words = self._transcribe()
+        # insert() drops words already committed (time + n-gram overlap dedup),
+        # leaving self.hyp.new = exactly the still-uncommitted tail.
+        self.hyp.insert(words, self.buffer_time_offset)
+        final = self.hyp.commit_pending(now=self.stream_time())
+        self.committed_tail.extend(final)
+        return [t for _a, _b, t in final]
+
+    def settled_time(self, margin=1.0):
+        """Stream time before which no further word will be committed.
+
+        That is the start of the oldest unconfirmed hypothesis word or, if the
+        last pass heard nothing new, the end of the buffer — minus `margin`
+        for a word just starting at the edge.
+        """
+        pending = self.hyp.buffer
+        if pending:
+            return pending[0][0] - margin
+        return max(self.hyp.last_committed_time, self.stream_time() - margin)
+
+
+# ─────────────────────── Two-tier cascade ───────────────────────
+
+class CascadeConfirmer:
+    """Re-decodes finished spans with the large model (cascade mode).
+
+    The fast model's LocalAgreement commits are only provisional here. Once
+    they contain a sentence end — or CASCADE_SPAN seconds have piled up — the
+    audio from the last confirmed point to the end of that word is transcribed
+    once by the accurate model, and that text is what gets typed. While nothing
+    is pending (pauses), the audio the fast model has settled is dropped, so
+    the buffer does not grow with silence.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.audio = np.array([], dtype=np.float32)
+        self.offset = 0.0        # stream time of self.audio[0] = confirmed up to here
+        self.pending = []        # provisional (start, end, text) after self.offset
+        self.context = ""        # tail of confirmed text, used as prompt
+
+    def insert_audio_chunk(self, audio):
+        self.audio = np.append(self.audio, audio)
+
+    def add(self, words):
+        """Add provisional words; return (confirmed_text, n_words) or None."""
+        self.pending.extend(words)
+        if not self.pending:
+            return None
+        cut_idx = None
+        for i in range(len(self.pending) - 1, -1, -1):
+            if self.pending[i][2].rstrip().endswith(('.', '?', '!', '…')):
+                cut_idx = i
+                break
+        if cut_idx is None and self.pending[-1][1] - self.offset >= CASCADE_SPAN:
+            cut_idx = len(self.pending) - 1
+        if cut_idx is None:
+            return None
+        cut = self.pending[cut_idx][1]
+        text = self._decode(int((cut - self.offset) * samplerate))
+        self.audio = self.audio[int((cut - self.offset) * samplerate):]
+        self.offset = cut
+        self.pending = self.pending[cut_idx + 1:]
+        return text, cut_idx + 1
+
+    def skip_to(self, t):
+        """Nothing pending: drop the audio before `t` (settled by the fast model)."""
+        if self.pending or t <= self.offset:
+            return
+        n = int((t - self.offset) * samplerate)
+        self.audio = self.audio[n:]
+        self.offset += n / samplerate
+
+    def finish(self):
+        """Decode everything not yet confirmed (on stop)."""
+        text = self._decode(len(self.audio)) if len(self.audio) else ""
+        self.audio = self.audio[:0]
+        self.pending = []
+        return text
+
+    def _decode(self, n_samples):
+        t0 = time.perf_counter()
+        prompt = _vocabulary.get_prompt_tokens(self.model) or []
+        if self.context and hasattr(self.model, 'hf_tokenizer'):
+            ctx = self.model.hf_tokenizer.encode(" " + self.context, add_special_tokens=False).ids
+            prompt = prompt[:max(0, _vocabulary.MAX_PROMPT_TOKENS - len(ctx))] + ctx
+        segments, _info = self.model.transcribe(
+            self.audio[:n_samples],
+            language="de",
+            task="transcribe",
+            beam_size=max(BEAM_SIZE, 1),
+            condition_on_previous_text=False,
+            vad_filter=True,
+            initial_prompt=prompt or None,
+        )
+        text = "".join(seg.text for seg in segments)
+        if text.strip():
+            self.context = (self.context + text)[-CONTEXT_CHARS:]
+        logger.debug(f"cascade confirm {n_samples / samplerate:.1f}s in "
+                     f"{(time.perf_counter() - t0) * 1000:.0f} ms: {text!r}")
+        return text
+
+
+# ─────────────────────── Adaptive cadence ───────────────────────
+
+class CadenceScheduler:
+    """Adjusts the update cadence (and, as a last resort, the beam size) so the
+    worker keeps up in real time.
+
+    After every pass it sees how long the pass took and how much audio is
+    waiting in the audio ring. Real-time factor = pass time / cadence. Above
+    TARGET_RTF — or with a backlog — the cadence grows (fewer, longer passes);
+    with plenty of headroom it shrinks again for lower latency. If even
+    CADENCE_MAX can't keep up, the beam is reduced; a model tier change is only
+    recommended in the log (`transcription ctl model=…` swaps it live).
+    """
+
+    def __init__(self, cadence, beam_size=None):
+        self.cadence = min(max(cadence, CADENCE_MIN), CADENCE_MAX)
+        self.max_beam = self.beam_size = BEAM_SIZE if beam_size is None else beam_size
+        self.avg_pass = None      # EMA of the pass time (s)
+        self.rtf = _metrics.RunningStat()
+        self.changes = 0
+        self._overload_warned = False
+
+    def update(self, pass_s, backlog_s):
+        """Feed one measurement; returns the cadence for the next pass."""
+        self.avg_pass = pass_s if self.avg_pass is None else 0.7 * self.avg_pass + 0.3 * pass_s
+        rtf = self.avg_pass / self.cadence
+        self.rtf.add(rtf)
+        old_cadence, old_beam = self.cadence, self.beam_size
+
+        if rtf > TARGET_RTF or backlog_s > self.cadence:
+            wanted = max(self.cadence * 1.25, self.avg_pass / TARGET_RTF)
+            self.cadence = min(CADENCE_MAX, wanted)
+            if old_cadence >= CADENCE_MAX and self.beam_size > 1:
+                self.beam_size -= 1
+            elif old_cadence >= CADENCE_MAX and not self._overload_warned:
+                self._overload_warned = True
+                logger.warning(f"Streaming can't keep up (pass {self.avg_pass:.2f}s at "
+                               f"cadence {self.cadence:.1f}s) — a smaller WHISPER_MODEL is recommended")
+        elif rtf < TARGET_RTF * 0.5 and backlog_s < 0.3:
+            if self.beam_size < self.max_beam and rtf < TARGET_RTF * 0.3:
+                self.beam_size += 1
+            else:
+                self.cadence = max(CADENCE_MIN, self.cadence * 0.85)
+
+        if (abs(self.cadence - old_cadence) > 0.05) or self.beam_size != old_beam:
+            self.changes += 1
+            logger.info(f"cadence {old_cadence:.2f}→{self.cadence:.2f}s, beam {old_beam}→{self.beam_size} "
+                        f"(pass {pass_s:.2f}s, avg {self.avg_pass:.2f}s, rtf {rtf:.2f}, "
+                        f"backlog {backlog_s:.1f}s)")
+        return self.cadence
+
+    def summary(self):
+        if not self.rtf.count:
+            return "no passes"
+        return (f"{self.rtf.count} passes, mean rtf {self.rtf.mean:.2f}, max {self.rtf.max:.2f}, "
+                f"final cadence {self.cadence:.2f}s, beam {self.beam_size}, {self.changes} adjustments")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+_metrics.py — Laufzeit-Kennzahlen der Modi: laufende Statistik, Perzentile, JSONL.
+
+Jeder Modus hat eigene Messpunkte (Commit-Lag von LocalAgreement, Decode-Zeit
+und Echtzeitfaktor des Streaming-Takts, Latenz pro Claude-Turn), aber dieselben
+drei Bausteine: eine Statistik mit konstantem Speicher für die Zusammenfassung
+im Log, eine JSONL-Datei für die Historie und Perzentile darüber.
+
+Verwendung:
+    import _metrics
+    lag = _metrics.RunningStat()
+    lag.add(0.42)
+    logger.info(f"commit lag {lag.describe()}")          # "1× mean 0.42s, max 0.42s"
+
+    _metrics.append_jsonl(path, {"ok": True, "sent": 0.31})
+    for label, p50, p90, p99, top, n in _metrics.percentile_rows(
+            _metrics.tail_jsonl(path, 50), [("sent", "Senden")]):
+        ...
+"""
+
+import json
+import logging
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+class RunningStat:
+    """Count, mean and max of a stream of values (constant memory)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value) if self.count > 1 else value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def describe(self, unit="s", scale=1.0, digits=2):
+        if not self.count:
+            return "none"
+        return (f"{self.count}× mean {self.mean * scale:.{digits}f}{unit}, "
+                f"max {self.max * scale:.{digits}f}{unit}")
+
+
+def append_jsonl(path, record):
+    """Append one record as a JSON line; False (and a warning) if that fails."""
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write {path}: {e}")
+        return False
+
+
+def tail_jsonl(path, n):
+    """The last n records of a JSONL file (raises FileNotFoundError)."""
+    with open(path) as f:
+        lines = deque(f, maxlen=n)
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue     # blank or torn line (crash while writing)
+    return records
+
+
+def percentile_rows(records, stages, percentiles=PERCENTILES):
+    """(label, *percentiles, max, n) per stage over the records that have it."""
+    rows = []
+    for key, label in stages:
+        values = np.array([r[key] for r in records if key in r], dtype=np.float64)
+        if len(values):
+            rows.append((label, *np.percentile(values, percentiles), values.max(), len(values)))
+    return rows
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+_pipeline.py — Gemeinsamer Rahmen aller Modi: Start, Aufnahme, Alt+Alt, `ctl`.
+
+Tippen, Geräteauswahl, Beeps, Tastatur und VAD lagen schon in eigenen Modulen,
+aber jeder Modus trug weiter seine Kopie von play_beep(), _set_input_device(),
+setup_control(), der Start-/Stopp-Logik um _capture und des Startablaufs
+(Single-Instance, Signale, Modell vorladen, Geräte, Pre-roll, Banner,
+Tastatur). Das ist jetzt EINE Klasse; ein Modus ist eine Unterklasse, die nur
+festlegt, was er anders macht:
+
+  • engine       Modell (_engines.WhisperEngine / FasterWhisperEngine)
+  • collect      True: ganze Aufnahme beim Stopp (Offline, Claude)
+  • worker()     sonst: Blöcke aus capture.read() verarbeiten (Streaming)
+  • begin()      vor dem Start-Beep (Zustand pro Aufnahme zurücksetzen)
+  • finish()     nach dem Stopp, bekommt die Aufnahme (collect) oder None
+  • settings()   eigene `transcription ctl`-Werte
+  • describe()   eigene Zeilen im Start-Banner
+
+Verwendung:
+    import _pipeline
+    logger = _pipeline.prepare("transcription_streaming.log")
+
+    class VadStreaming(_pipeline.Pipeline):
+        name = "vad"
+        def worker(self, capture):
+            while self.active or not capture.empty():
+                blocks, levels = capture.read(timeout=0.1)
+                ...
+
+    VadStreaming(_engines.WhisperEngine()).run(auto=args.auto,
+                                               interactive=not args.default)
+"""
+
+import os
+import sys
+import signal
+import logging
+import threading
+
+import sounddevice as sd
+
+import _typer  # gemeinsames Tipp-Backend (ydotool/wtype/Clipboard)
+import _devices  # Input-/Output-Gerät wählen (Umgebung, Default, Menü)
+import _cues  # Beeps aus dem Speicher, nicht blockierend
+import _hotkeys  # Alt+Alt über alle Tastaturen, Hot-Plug ohne Neustart
+import _capture  # native Geräterate → 16 kHz float32 mono
+import _control  # `transcription ctl`: Modell/Gerät/Parameter im laufenden Prozess
+import _singleinstance  # nur EINE Instanz tippt am Cursor
+
+logger = logging.getLogger(__name__)
+
+SAMPLERATE = _capture.TARGET_RATE   # was die Modelle bekommen
+TRANSCRIPTION_DIR = os.path.expanduser("~/.transcription")
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def prepare(log_name, quiet_console=False):
+    """Locale, ~/.transcription and the root logger (file: DEBUG) for one mode.
+
+    quiet_console: only warnings on the console — the streamed text stays readable.
+    """
+    os.environ["LC_ALL"] = "de_DE.UTF-8"
+    os.environ["LANG"] = "de_DE.UTF-8"
+    os.makedirs(TRANSCRIPTION_DIR, exist_ok=True)
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    file_handler = logging.FileHandler(os.path.join(TRANSCRIPTION_DIR, log_name))
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(file_handler)
+    console_handler = logging.StreamHandler()
+    if quiet_console:
+        console_handler.setLevel(logging.WARNING)
+        console_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+    else:
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(console_handler)
+    return root
+
+
+class Pipeline:
+    """Capture → (worker | finish) for one mode, toggled by Alt+Alt."""
+
+    name = "offline"         # ControlServer mode name
+    label = "Whisper"        # shown in the banner ("… Hz nativ → 16000 Hz (label)")
+    blocksize = 1600         # 0.1 s blocks @ 16 kHz for capture.read()
+    collect = False          # True: capture collects, finish() gets the audio
+    join_timeout = 30        # s to wait for the worker to drain after stop
+    require_model = True     # exit if the model cannot be preloaded
+    types = True             # types at the cursor (detects the typing backend)
+    start_banner = ("\n>>> 🔴 RECORDING STARTED <<<",
+                    "🎤 Sprechen Sie jetzt! Drücken Sie Alt zweimal zum Stoppen.\n")
+    stop_banner = "\n>>> ⏹️  RECORDING STOPPED <<<\n"
+    clipboard_warning = ("⚠️  Kein Live-Tippen verfügbar (ydotool/wtype nicht nutzbar).",
+                         "    Text landet in der Zwischenablage — manuell mit Ctrl+V einfügen.",
+                         "    Fix: sudo apt install ydotool  +  ydotoold-Daemon starten.\n")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.device_index = None          # input, selected at startup
+        self.output_device_index = None   # beeps, selected at startup
+        self.capture = None               # _capture.Capture, kept open with pre-roll
+        self.active = False
+        self.thread = None                # worker of the running stream
+        self.on_audio = None              # collect: callback(chunk) while recording
+        self.shutdown_requested = False
+        self.start_beep, self.stop_beep = _cues.write_beeps(TRANSCRIPTION_DIR)
+
+    # ── Hooks ───────────────────────────────────────────────────────────────
+
+    def begin(self):
+        """Before the start beep: reset per-recording state."""
+
+    def worker(self, capture):
+        """Streaming modes: consume capture.read() while self.active, then drain."""
+        raise NotImplementedError
+
+    def finish(self, audio):
+        """After the stop (worker drained); audio is the recording if collect."""
+        self.play_stop()
+
+    def settings(self, ctl):
+        """Register mode-specific `transcription ctl` values."""
+
+    def describe(self):
+        """Extra banner lines."""
+        return []
+
+    def preload(self):
+        self.engine.get()
+
+    # ── Recording ───────────────────────────────────────────────────────────
+
+    def play_start(self):
+        _cues.play(self.start_beep, self.output_device_index)
+
+    def play_stop(self):
+        _cues.play(self.stop_beep, self.output_device_index)
+
+    def _start_capture(self):
+        """Start the (pre-roll: already open) input; fall back to the default device."""
+        if self.capture is not None and self.capture.device != self.device_index:
+            self.capture.close()     # input switched via `transcription ctl`
+            self.capture = None
+        try:
+            if self.capture is None or not self.capture.keep_open:
+                self.capture = _capture.Capture(self.device_index, self.blocksize)
+            self.capture.start(collect=self.collect, on_audio=self.on_audio)
+            logger.info(f"Recording from device {self.device_index} @ {self.capture.describe()}")
+            return True
+        except Exception as e:
+            logger.error(f"Error starting input stream: {e}")
+        try:
+            logger.info("Trying fallback to default input device...")
+            self.capture = _capture.Capture(None, self.blocksize)
+            self.capture.start(collect=self.collect, on_audio=self.on_audio)
+            logger.info("Fallback InputStream started")
+            return True
+        except Exception as e:
+            logger.error(f"Fallback also failed: {e}")
+            self.capture = None
+            return False
+
+    def start(self):
+        if self.active:
+            return
+        # Set the flag FIRST: a second Alt+Alt during the beep must not re-enter.
+        self.active = True
+        for line in self.start_banner:
+            print(line)
+        logger.info(f"{self.name}: recording started")
+        self.begin()
+        self.play_start()
+        if not self._start_capture():
+            self.active = False
+            return
+        if not self.collect:
+            self.thread = threading.Thread(target=self.worker, args=(self.capture,), daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if not self.active:
+            return
+        print(self.stop_banner)
+        logger.info(f"{self.name}: recording stopped")
+        self.active = False          # tells the worker to drain & finish
+        audio = None
+        if self.capture is not None:
+            audio = self.capture.stop()
+            if not self.capture.keep_open:   # pre-roll: stream stays open while idle
+                self.capture = None
+        if self.thread is not None:
+            self.thread.join(timeout=self.join_timeout)
+            self.thread = None
+        self.finish(audio)
+
+    def toggle(self):
+        """Alt+Alt: start or stop."""
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    # ── Live control (transcription ctl) ────────────────────────────────────
+
+    def set_input_device(self, raw):
+        idx = int(raw)
+        name = sd.query_devices(idx, 'input')['name']   # ValueError without input channels
+        self.device_index = idx
+        capture = self.capture
+        if capture is not None and not self.active:
+            capture.close()
+            self.capture = None
+            if capture.keep_open:
+                self.capture = _capture.Capture(idx, self.blocksize)
+                self.capture.open()
+        return f"{idx} ({name})"
+
+    def control(self):
+        """Start the control socket: model, device, typing backend + settings()."""
+        ctl = _control.ControlServer(self.name)
+        swap = self.engine.swap
+        ctl.register("model", swap.describe, swap.request,
+                     f"{self.engine.label}-Modell, wird im Hintergrund geladen",
+                     aliases=("WHISPER_MODEL",))
+        ctl.register("device", lambda: self.device_index, self.set_input_device,
+                     "Input-Device Index (ab nächster Aufnahme)", aliases=("AUDIO_DEVICE",))
+        ctl.register("typer", *_control.typer_setting(_typer),
+                     "Tipp-Backend ydotool/wtype/clipboard/auto")
+        self.settings(ctl)
+        ctl.start()
+        return ctl
+
+    # ── Startup and keyboard loop ───────────────────────────────────────────
+
+    def _on_signal(self, signum, frame):
+        print(f"\n⏹️  Received signal {signum}, shutting down...")
+        self.shutdown_requested = True
+
+    def startup(self, auto=False, interactive=True):
+        """Everything before the first Alt+Alt; exits on fatal errors."""
+        # Nur EINE Transcription-Instanz darf laufen (sonst doppeltes Tippen).
+        _singleinstance.acquire_or_exit()
+        signal.signal(signal.SIGINT, self._on_signal)
+        signal.signal(signal.SIGTERM, self._on_signal)
+
+        # Pre-load the model(s): the first recording is not slowed down.
+        try:
+            self.preload()
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            logger.error(f"Error loading model: {e}")
+            if self.require_model:
+                sys.exit(1)
+
+        # -a = ONE device for input + output, else separately; sets sd.default.device.
+        try:
+            self.device_index, self.output_device_index = _devices.select(auto, interactive)
+        except Exception as e:
+            print(f"Error selecting audio device: {e}")
+            sys.exit(1)
+
+        if self.types:
+            # Pick the 'type at cursor' backend (starts ydotoold if needed).
+            print(f"⌨️  Tipp-Backend: {_typer.detect_typer()} (Layout: {_typer.KB_LAYOUT})")
+            if _typer.TYPER == 'clipboard':
+                print("\n".join(self.clipboard_warning))
+        # Beeps: decode once, keep the output stream open → play() never blocks.
+        _cues.preload([self.start_beep, self.stop_beep], self.output_device_index)
+
+        device_info = sd.query_devices(self.device_index)
+        print("\n" + "=" * 60)
+        print(f"🎤 AUDIO DEVICE: #{self.device_index} - {device_info['name']}")
+        print(f"   Channels: {device_info['max_input_channels']}")
+        print(f"   Sample Rate: {int(device_info['default_samplerate'])} Hz nativ "
+              f"→ {SAMPLERATE} Hz ({self.label})")
+        if _capture.PREROLL_SEC > 0:
+            try:
+                self.capture = _capture.Capture(self.device_index, self.blocksize)
+                self.capture.open()
+                print(f"   Pre-roll: {_capture.PREROLL_SEC:.1f}s "
+                      f"({self.capture.memory_bytes() / 1024:.0f} KiB, Eingang bleibt offen)")
+            except Exception as e:
+                logger.error(f"Pre-roll disabled, cannot open input: {e}")
+                self.capture = None
+        if self.types:
+            print(f"   Tippen am Cursor: {_typer.TYPER}")
+        for line in self.describe():
+            print(f"   {line}")
+        if self.control().sock is not None:
+            print("   Live-Einstellungen: transcription ctl")
+        print("=" * 60)
+
+    def listen(self, keyboards):
+        """Alt+Alt loop until a signal; stops a running recording, then exits."""
+        # One selector loop over all keyboards; hot-plugged keyboards are attached
+        # and unplugged ones detached live (inotify on /dev/input) — no restart.
+        _hotkeys.listen(self.toggle, keyboards, lambda: self.shutdown_requested,
+                        on_shutdown=self.stop)
+        os._exit(0)  # Force exit (ASR/audio daemon threads may still be busy)
+
+    def run(self, auto=False, interactive=True):
+        """startup(), then the keyboard loop on this thread."""
+        self.startup(auto, interactive)
+        try:
+            print("\nDetecting keyboard devices...")
+            keyboards = _hotkeys.find_keyboards()
+            print(f"\nFound {len(keyboards)} keyboard device(s):")
+            for dev in keyboards:
+                print(f"  → {dev.path} ({dev.name})")
+            print("\nAlt+Alt zum Starten/Stoppen. Ctrl+C zum Beenden.\n")
+            self.listen(keyboards)
+        except PermissionError:
+            print("ERROR: Need permission to access /dev/input devices!")
+            print("Add user to 'input' group: sudo usermod -aG input $USER")
+            logger.error("PermissionError: Cannot access /dev/input devices")
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            logger.error(f"RuntimeError: {e}")
+        except Exception as e:
+            print(f"ERROR: {e}")
+            logger.error(f"Unexpected error: {e}")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+_postprocess.py — Lokale Nachbearbeitung zwischen Whisper und Tipp-Backend.
+
+Gemeinsam für alle Modi. Setzt gesprochene Befehle um ("neue Zeile", "Komma",
+"Punkt", …), entfernt Füllwörter ("äh", "ähm") und wendet eigene Ersetzungen
+an — ohne Umweg über ein LLM. Grundlage ist ein einmal kompilierter Wort-Trie;
+pro Fragment fallen nur ein paar Dict-Lookups an (Mikrosekunden, nicht ms).
+
+Inkrementell: Der Streaming-Modus liefert LocalAgreement-bestätigte Wörter in
+kleinen Schüben. Ein Wort, das Anfang eines Mehrwort-Befehls sein kann
+("neue" → "neue Zeile"), wird zurückgehalten, bis das nächste Wort entscheidet.
+flush() gibt am Ende alles Zurückgehaltene aus.
+
+Eigene Ersetzungen (eine pro Zeile, `#` = Kommentar):
+    ~/.transcription/replacements.txt
+        jay son   => JSON
+        cube ctl  => kubectl
+        Absatz    => \\n\\n
+
+Verwendung:
+    import _postprocess
+    pp = _postprocess.PostProcessor()   # pro Aufnahme/Stream
+    _typer.type_at_cursor(pp.process(" neue Zeile Hallo"))
+    _typer.type_at_cursor(pp.flush())
+    pp.preview(" neue")                 # Vorschau, Zustand bleibt unverändert
+    _postprocess.postprocess("Hallo Komma Welt Punkt")  # ganzer Text auf einmal
+"""
+
+import os
+import sys
+import copy
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('POSTPROCESS', '1') != '0'
+RULES_PATH = os.environ.get('POSTPROCESS_RULES') or os.path.expanduser(
+    "~/.transcription/replacements.txt")
+
+# Ersetzungsarten:
+#   punct — hängt direkt am vorigen Wort ("Hallo,"), danach Leerzeichen
+#   open  — Leerzeichen davor, nichts danach ("(")
+#   join  — verbindet ohne Leerzeichen ("E Bindestrich Mail" → "E-Mail")
+#   break — Zeilenumbruch, keine Leerzeichen drumherum
+#   drop  — Füllwort, wird entfernt
+#   text  — normales Wort/Phrase (eigenes Vokabular)
+_COMMANDS = {
+    'komma': ('punct', ','),
+    'punkt': ('punct', '.'),
+    'fragezeichen': ('punct', '?'),
+    'ausrufezeichen': ('punct', '!'),
+    'doppelpunkt': ('punct', ':'),
+    'semikolon': ('punct', ';'),
+    'strichpunkt': ('punct', ';'),
+    'klammer zu': ('punct', ')'),
+    'klammer auf': ('open', '('),
+    'bindestrich': ('join', '-'),
+    'neue zeile': ('break', '\n'),
+    'nächste zeile': ('break', '\n'),
+    'neuer absatz': ('break', '\n\n'),
+    'äh': ('drop', ''),
+    'ähm': ('drop', ''),
+    'öh': ('drop', ''),
+    'öhm': ('drop', ''),
+    'hm': ('drop', ''),
+    'hmm': ('drop', ''),
+    'mhm': ('drop', ''),
+}
+
+# Zeichen, die Whisper an ein Befehlswort hängt ("Punkt." / "Komma,") — beim
+# Abgleich ignorieren.
+_STRIP = '.,;:!?"\'„“”()…-'
+_SENTENCE_END = ('.', '?', '!', '\n')
+# Nach einem Artikel ist "Punkt"/"Komma" ein Substantiv ("der Punkt ist …"),
+# kein Befehl.
+_ARTICLES = frozenset((
+    'der', 'die', 'das', 'den', 'dem', 'des', 'ein', 'eine', 'einen', 'einem',
+    'einer', 'eines', 'kein', 'keinen', 'diesen', 'dieser', 'diesem', 'jeden',
+    'welcher', 'welchen', 'am', 'im', 'zum', 'beim', 'vom',
+))
+# Davon betroffen sind nur Satzzeichen-/Umbruch-Befehle; Füllwörter und eigene
+# Ersetzungen greifen auch nach einem Artikel ("der äh Punkt").
+_COMMAND_KINDS = frozenset(('punct', 'open', 'join', 'break'))
+_LEAF = None  # Trie-Schlüssel für "hier endet ein Befehl"
+
+_trie = None
+
+
+def _norm(token):
+    return token.strip(_STRIP).lower()
+
+
+def _unescape(value):
+    return value.replace('\\n', '\n').replace('\\t', '\t')
+
+
+def load_rules(path=RULES_PATH):
+    """Built-in commands plus user replacements from `path` (if it exists)."""
+    rules = dict(_COMMANDS)
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if '=>' not in line:
+                    continue
+                spoken, written = (p.strip() for p in line.split('=>', 1))
+                if not spoken:
+                    continue
+                written = _unescape(written)
+                if not written:
+                    kind = 'drop'
+                elif written.strip('\n') == '':
+                    kind = 'break'
+                else:
+                    kind = 'text'
+                rules[' '.join(_norm(w) for w in spoken.split())] = (kind, written)
+        logger.info(f"Post-processing rules loaded from {path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not read post-processing rules {path}: {e}")
+    return rules
+
+
+def compile_rules(rules):
+    """Compile {'neue zeile': (kind, value)} into a nested word trie."""
+    trie = {}
+    for spoken, action in rules.items():
+        node = trie
+        for word in spoken.split():
+            node = node.setdefault(word, {})
+        node[_LEAF] = action
+    return trie
+
+
+def prune_rules(trie, kinds):
+    """Copy of `trie` without the rules whose kind is in `kinds`."""
+    pruned = {}
+    for key, child in trie.items():
+        if key is _LEAF:
+            if child[0] not in kinds:
+                pruned[_LEAF] = child
+        else:
+            child = prune_rules(child, kinds)
+            if child:
+                pruned[key] = child
+    return pruned
+
+
+def get_trie():
+    """Compile the rule table once per process."""
+    global _trie
+    if _trie is None:
+        _trie = compile_rules(load_rules())
+    return _trie
+
+
+class PostProcessor:
+    """Incremental command/filler/vocabulary rewriter for one recording."""
+
+    def __init__(self, trie=None):
+        self.trie = trie if trie is not None else get_trie()
+        self._noun_trie = prune_rules(self.trie, _COMMAND_KINDS)  # after an article
+        self._root = self.trie     # trie the held prefix is matched in
+        self._held = []            # raw tokens forming a prefix of a multi-word rule
+        self._last = ''            # last character emitted (spacing decisions)
+        self._capitalize = False   # next word starts a new sentence
+        self._last_word = ''       # normalized last plain word (article check)
+
+    def process(self, fragment):
+        """Rewrite `fragment`; return the text that is safe to emit now."""
+        out = []
+        for token in fragment.split():
+            self._feed(token, out)
+        return ''.join(out)
+
+    def flush(self):
+        """Emit everything still held back (end of recording)."""
+        out = []
+        self._resolve(out, final=True)
+        return ''.join(out)
+
+    def preview(self, fragment):
+        """What process(fragment) + flush() would emit — without changing state.
+
+        Used for text that is shown before it is final (speculative tail), so
+        it is formatted exactly like the committed text that replaces it.
+        """
+        clone = copy.copy(self)
+        clone._held = list(self._held)
+        return clone.process(fragment) + clone.flush()
+
+    # ── internals ─────────────────────────────────────────────────────────
+    def _feed(self, token, out):
+        if not self._held:
+            # "der Punkt" — Substantiv, nicht Satzzeichen; "der äh" bleibt Füllwort
+            self._root = self._noun_trie if self._last_word in _ARTICLES else self.trie
+        node = self._walk(self._held + [token])
+        if node is not None:
+            self._held.append(token)
+            if len(node) == 1 and _LEAF in node:   # complete rule, cannot grow
+                self._apply(node[_LEAF], out)
+                self._held = []
+            return
+        # token does not extend the held prefix → resolve what we hold, retry.
+        if self._held:
+            self._resolve(out)
+            self._feed(token, out)
+            return
+        self._word(token, out)
+
+    def _walk(self, tokens):
+        node = self._root
+        for t in tokens:
+            node = node.get(_norm(t))
+            if node is None:
+                return None
+        return node
+
+    def _resolve(self, out, final=False):
+        """Apply the longest complete rule at the start of the held tokens;
+        tokens that match nothing are emitted as plain words."""
+        while self._held:
+            best = 0
+            node = self._root
+            for i, t in enumerate(self._held):
+                node = node.get(_norm(t))
+                if node is None:
+                    break
+                if _LEAF in node:
+                    best = i + 1
+                    action = node[_LEAF]
+            if best:
+                self._apply(action, out)
+                rest = self._held[best:]
+            else:
+                self._word(self._held[0], out)
+                rest = self._held[1:]
+            self._held = []
+            for t in rest:
+                self._feed(t, out)
+            if not final:
+                return
+
+    def _apply(self, action, out):
+        kind, value = action
+        if kind == 'drop':
+            return
+        self._last_word = ''
+        if kind == 'text':
+            self._word(value, out)
+        elif kind == 'punct':
+            if self._last == value:
+                return  # Whisper hat das Zeichen schon selbst gesetzt
+            out.append(value)
+            self._last = value[-1]
+        elif kind == 'open':
+            out.append((' ' if self._last and self._last not in '\n(-' else '') + value)
+            self._last = value[-1]
+            return
+        elif kind == 'join':
+            out.append(value)
+            self._last = value[-1]
+            return
+        elif kind == 'break':
+            out.append(value)
+            self._last = '\n'
+        if self._last in _SENTENCE_END:
+            self._capitalize = True
+
+    def _word(self, word, out):
+        if self._capitalize and word[:1].islower():
+            word = word[0].upper() + word[1:]
+        self._capitalize = False
+        sep = ' ' if self._last and self._last not in '\n(-' else ''
+        out.append(sep + word)
+        self._last = word[-1]
+        self._last_word = _norm(word)
+
+
+def postprocess(text):
+    """One-shot rewrite of a complete transcription (offline/VAD modes)."""
+    if not ENABLED or not text:
+        return text
+    pp = PostProcessor()
+    return pp.process(text) + pp.flush()
+
+
+if __name__ == "__main__":
+    # Schnelltest: Zeilen von stdin wie LocalAgreement-Schübe verarbeiten und
+    # die Kosten pro Fragment ausgeben.
+    pp = PostProcessor()
+    costs = []
+    for line in sys.stdin:
+        t0 = time.perf_counter()
+        piece = pp.process(line)
+        costs.append(time.perf_counter() - t0)
+        sys.stdout.write(piece)
+    sys.stdout.write(pp.flush() + "\n")
+    if costs:
+        costs.sort()
+        print(f"{len(costs)} fragments, median {costs[len(costs) // 2] * 1e6:.1f} µs, "
+              f"max {costs[-1] * 1e6:.1f} µs", file=sys.stderr)
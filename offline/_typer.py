@@ -12,10 +12,14 @@ Mechanismus je nach Compositor:
   • wtype    — virtual-keyboard-Protokoll, nur wlroots (Sway/Hyprland).
   • wl-copy  — Fallback: nur Zwischenablage, manuelles Ctrl+V nötig.
 
+Die Streaming-Modi tippen in kleinen Wortgruppen und korrigieren vorläufigen
+Text mit typed_length()/erase_at_cursor().
+
 Verwendung:
     import _typer
     _typer.detect_typer()          # einmal beim Start
     _typer.type_at_cursor("Hallo") # pro Ausgabe
+    _typer.erase_at_cursor(_typer.typed_length("Hallo"))
 """
 
 import os
@@ -29,6 +33,7 @@ logger = logging.getLogger(__name__)
 YDOTOOL_SOCKET = os.environ.get('YDOTOOL_SOCKET') or f"/run/user/{os.getuid()}/.ydotool_socket"
 TYPER = None      # 'ydotool' | 'wtype' | 'clipboard'
 KB_LAYOUT = 'us'  # active keyboard layout, set by detect_typer()
+_clipboard_hint_shown = False
 
 # ── ydotool layout fix ──────────────────────────────────────────────────────
 # ydotool injects RAW Linux keycodes ("we're using raw keycodes now", its own
@@ -123,7 +128,11 @@ def detect_kb_layout():
 
 
 def _de_key_events(text):
-    """Build a ydotool 'key' press/release sequence for `text` on the de layout."""
+    """Build a ydotool 'key' press/release sequence for `text` on the de layout.
+
+    Returns a list like ['42:1', '21:1', '21:0', '42:0', ...]. Truly unmappable
+    characters are skipped (logged) so typing always makes forward progress.
+    """
     text = ''.join(_NORMALIZE.get(c, c) for c in text)
     seq = []
     for ch in text:
@@ -199,8 +208,13 @@ def detect_typer():
 
 
 def type_at_cursor(text):
-    """Type text at the current cursor position using the detected backend."""
-    if not text or not text.strip():
+    """Type text at the current cursor position using the detected backend.
+
+    Whitespace-only text is typed too: the streaming modes send separators and
+    "neue Zeile" as fragments of their own.
+    """
+    global _clipboard_hint_shown
+    if not text:
         return
     if TYPER is None:
         # detect_typer() was never called — do it now so a bare call still works.
@@ -218,7 +232,7 @@ def type_at_cursor(text):
                 except Exception as e:
                     logger.error(f"ydotool key error: {e}")
             else:
-                return
+                return  # nothing typeable (only skipped chars)
         else:
             try:
                 # --file - reads from stdin with escaping disabled → literal text,
@@ -235,13 +249,37 @@ def type_at_cursor(text):
             return
         except Exception as e:
             logger.error(f"wtype error: {e}")
-    # Fallback: clipboard (manual paste)
+    # Fallback: clipboard (manual paste) — only the latest fragment is pasteable.
     try:
         p = subprocess.Popen(["wl-copy"], stdin=subprocess.PIPE)
         p.communicate(text.encode('utf-8'))
         print(f"   📋 (kein Direkt-Tippen) in Zwischenablage: {text}")
-        print("   🖱️  Mit Ctrl+V einfügen.")
-        logger.warning("Used clipboard fallback (Ctrl+V to paste)")
+        if not _clipboard_hint_shown:
+            _clipboard_hint_shown = True
+            print("   🖱️  Mit Ctrl+V einfügen.")
+            logger.warning("Used clipboard fallback (Ctrl+V to paste)")
     except Exception as e:
         logger.error(f"Clipboard fallback failed: {e}")
         print(f"   Text: {text}")
+
+
+def typed_length(text):
+    """Number of characters type_at_cursor() actually produces for `text`
+    (the de keymap expands '…' and skips unmappable characters)."""
+    if TYPER == 'ydotool' and KB_LAYOUT.startswith('de'):
+        return sum(1 for c in ''.join(_NORMALIZE.get(c, c) for c in text) if c in _DE_KEYMAP)
+    return len(text)
+
+
+def erase_at_cursor(n):
+    """Delete the last `n` typed characters with BackSpace (not via clipboard)."""
+    if n <= 0:
+        return
+    try:
+        if TYPER == 'ydotool':
+            subprocess.run(['ydotool', 'key', '-d', '2'] + ['14:1', '14:0'] * n,
+                           env=_ydotool_env(), check=True, timeout=30)
+        elif TYPER == 'wtype':
+            subprocess.run(['wtype'] + ['-k', 'BackSpace'] * n, check=True, timeout=30)
+    except Exception as e:
+        logger.error(f"erase error: {e}")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+_vad.py — Phrasen an Sprechpausen schneiden (Signalenergie pro Block).
+
+Der VAD-Modus (transcription_streaming.py) und das Live-Transkript des
+Claude-Modus hatten dieselbe Schleife zweimal: Stille vor der ersten Silbe
+verwerfen, Pausen-Stille mitnehmen, nach MIN_SILENCE Stille oder MAX_PHRASE
+Sprache die Phrase abschließen. PhraseSegmenter ist diese Schleife einmal.
+
+Die Schwellen werden pro Aufnahme übergeben, damit `transcription ctl`
+(Modul-Konstanten der Modi) ab der nächsten Aufnahme wirkt.
+
+Verwendung:
+    import _vad
+    seg = _vad.PhraseSegmenter(SILENCE_RMS, MIN_SILENCE, MAX_PHRASE)
+    for block, rms in zip(blocks, levels):
+        phrase = seg.push(block, rms)       # Liste von Blöcken oder None
+        if phrase:
+            transcribe(np.concatenate(phrase))
+    phrase = seg.finish()                   # Rest beim Stopp
+"""
+
+import numpy as np
+
+
+def block_rms(blocks):
+    """RMS per row of a 2-D float32 array (one einsum, no temporaries)."""
+    return np.sqrt(np.einsum('ij,ij->i', blocks, blocks) / blocks.shape[1])
+
+
+class PhraseSegmenter:
+    """Cuts a stream of (block, rms) into phrases at speech pauses."""
+
+    def __init__(self, silence_rms, min_silence, max_phrase, samplerate=16000):
+        self.silence_rms = silence_rms
+        self.min_silence = min_silence
+        self.max_samples = max_phrase * samplerate
+        self.samplerate = samplerate
+        self.seg = []
+        self.samples = 0
+        self.silence_run = 0.0   # s of silence inside the current phrase
+        self.in_speech = False
+        self.voiced = False      # last block was above the threshold
+        self.quiet = 0.0         # s of silence since the last voiced block (across phrases)
+
+    def push(self, block, rms):
+        """Add one block; return the finished phrase (list of blocks) or None."""
+        duration = len(block) / self.samplerate
+        self.voiced = rms >= self.silence_rms
+        if self.voiced:
+            self.quiet = 0.0
+            self.in_speech = True
+            self.silence_run = 0.0
+        else:
+            self.quiet += duration
+            if not self.in_speech:
+                return None          # leading silence before any speech → drop
+            self.silence_run += duration   # trailing silence stays in the phrase
+        self.seg.append(block)
+        self.samples += len(block)
+        if self.silence_run >= self.min_silence or self.samples >= self.max_samples:
+            return self._take()
+        return None
+
+    def finish(self, tail=None):
+        """The unfinished phrase (plus `tail`, a last partial block) or None."""
+        if not self.in_speech:
+            return None
+        if tail is not None and len(tail):
+            self.seg.append(tail)
+        return self._take()
+
+    def _take(self):
+        seg = self.seg
+        self.seg, self.samples, self.silence_run, self.in_speech = [], 0, 0.0, False
+        return seg
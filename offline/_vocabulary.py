@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+_vocabulary.py — Eigenes Vokabular als Whisper-Prompt (Produktnamen, Kollegen …).
+
+Whisper schreibt Fachbegriffe und Namen, die es nicht kennt, konsequent falsch.
+Ein `initial_prompt`, in dem die Begriffe vorkommen, verschiebt die Dekodierung
+zu genau dieser Schreibweise. Die Begriffe stehen in einer Datei (ein Begriff
+pro Zeile, `#` = Kommentar):
+
+    ~/.transcription/vocabulary.txt      (oder WHISPER_VOCABULARY=/pfad)
+        Kubernetes
+        Jabra Evolve
+        Frau Wąsowska
+
+Die Datei wird einmal gelesen und der Prompt einmal gebaut. Für faster-whisper
+werden zusätzlich die Token-IDs einmal pro Modell-Instanz berechnet und gecacht —
+faster-whisper nimmt `initial_prompt` direkt als Token-Liste, es wird also pro
+Decode nichts neu tokenisiert. openai-whisper akzeptiert nur einen String und
+tokenisiert intern selbst (tiktoken, Mikrosekunden).
+
+Verwendung:
+    import _vocabulary
+    model.transcribe(audio, initial_prompt=_vocabulary.get_prompt())          # openai-whisper
+    model.transcribe(audio, initial_prompt=_vocabulary.get_prompt_tokens(m))  # faster-whisper
+"""
+
+import os
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+VOCAB_PATH = os.environ.get('WHISPER_VOCABULARY') or os.path.expanduser(
+    "~/.transcription/vocabulary.txt")
+
+# Whisper nutzt höchstens n_text_ctx // 2 - 1 = 223 Prompt-Tokens; mehr wird
+# vorne abgeschnitten. Wir kürzen selbst und behalten die ERSTEN Begriffe.
+MAX_PROMPT_TOKENS = 223
+
+_prompt = None
+_loaded = False
+_token_cache = weakref.WeakKeyDictionary()   # model -> list[int], dies with the model
+
+
+def load_terms(path=VOCAB_PATH):
+    """Read vocabulary terms (one per line); missing file → empty list."""
+    terms = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                term = line.split('#', 1)[0].strip()
+                if term and term not in terms:
+                    terms.append(term)
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        logger.warning(f"Could not read vocabulary {path}: {e}")
+    return terms
+
+
+def get_prompt():
+    """Build the initial prompt once; None if there is no vocabulary."""
+    global _prompt, _loaded
+    if not _loaded:
+        _loaded = True
+        terms = load_terms(VOCAB_PATH)
+        if terms:
+            # Ein natürlicher Satz mit den Begriffen biast stärker als eine
+            # nackte Liste — Whisper setzt den "Stil" des Prompts fort.
+            _prompt = "Begriffe: " + ", ".join(terms) + "."
+            logger.info(f"Vocabulary prompt: {len(terms)} terms from {VOCAB_PATH}")
+    return _prompt
+
+
+def get_prompt_tokens(model):
+    """Token ids of the prompt for a faster-whisper model, computed once.
+
+    Returns None without vocabulary, so the value can be passed straight
+    through as `initial_prompt`.
+    """
+    prompt = get_prompt()
+    if prompt is None:
+        return None
+    tokens = _token_cache.get(model)
+    if tokens is None:
+        # Gleiche Vorverarbeitung wie faster-whisper für String-Prompts.
+        tokens = model.hf_tokenizer.encode(" " + prompt.strip(),
+                                           add_special_tokens=False).ids
+        tokens = tokens[:MAX_PROMPT_TOKENS]
+        _token_cache[model] = tokens
+        logger.info(f"Vocabulary prompt tokenized once: {len(tokens)} tokens")
+    return tokens
@@ -0,0 +1,6 @@
+"""Die Hilfsmodule liegen flach in offline/ (die Modi starten mit cwd=offline)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+fake_claude.py — Fake-CLI für tests/test_claude.py (und CLAUDE_BIN).
+
+Spricht dasselbe stream-json wie `claude -p --input-format stream-json`:
+pro stdin-Zeile ein Turn, die Wörter des Prompts kommen als text_delta
+zurück, dann `assistant` und `result`. Bestimmte Prompts steuern das Verhalten:
+
+  • langsam   Deltas mit Pause (zum Abbrechen per cancel())
+  • stirb     ein Delta, dann Exit 3 mitten im Turn
+  • fehler    result mit is_error
+
+Verwendung:
+    FAKE_CLAUDE_LOG=/tmp/argv.jsonl CLAUDE_BIN=tests/fake_claude.py python transcription_claude.py
+    (jeder Start hängt seine argv als JSON-Zeile an FAKE_CLAUDE_LOG an)
+"""
+
+import os
+import sys
+import json
+import time
+
+
+def emit(event):
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+def main():
+    log = os.environ.get("FAKE_CLAUDE_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(sys.argv[1:]) + "\n")
+    print("fake claude bereit", file=sys.stderr, flush=True)
+
+    for line in sys.stdin:
+        text = json.loads(line)["message"]["content"][0]["text"]
+        for word in text.split():
+            emit({"type": "stream_event", "event": {"type": "content_block_delta",
+                  "delta": {"type": "text_delta", "text": word + " "}}})
+            if text == "stirb":
+                print("fake claude: stirbt", file=sys.stderr, flush=True)
+                sys.exit(3)
+            if text.startswith("langsam"):
+                time.sleep(0.5)
+        emit({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}})
+        emit({"type": "result", "is_error": text == "fehler", "result": text})
+
+
+if __name__ == "__main__":
+    main()
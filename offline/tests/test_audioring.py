@@ -0,0 +1,64 @@
+import numpy as np
+
+import _audioring
+
+
+def ring(blocksize=4, channels=1, dtype=np.float32):
+    # seconds=0 → the minimum of 8 slots, so a few blocks already wrap around.
+    return _audioring.BlockRing(blocksize, samplerate=16000, seconds=0,
+                                channels=channels, dtype=dtype)
+
+
+def block(value, n=4, channels=1, dtype=np.float32):
+    return np.full((n, channels), value, dtype=dtype)
+
+
+def test_blocks_come_out_in_order_across_wraparound():
+    r = ring()
+    assert r.capacity == 8
+    seen = []
+    for i in range(30):                  # ~4 laps, consumer takes 1-3 blocks at a time
+        r.write(block(i))
+        if i % 3 == 2:
+            blocks = r.get(timeout=0)
+            seen += [b[0] for b in blocks]
+    blocks = r.get(timeout=0)
+    seen += [b[0] for b in blocks]
+    assert seen == list(range(30))
+    assert r.empty() and r.dropped == 0
+
+
+def test_full_ring_drops_new_blocks(caplog):
+    r = ring()
+    for i in range(10):
+        r.write(block(i))
+    assert r.dropped == 2
+    blocks = r.get(timeout=0)
+    assert [b[0] for b in blocks] == list(range(8))    # the oldest are kept
+    assert "2 block(s) dropped" in caplog.text
+
+
+def test_int16_stereo_is_downmixed_and_scaled():
+    r = ring(channels=2, dtype=np.int16)
+    stereo = np.array([[16384, 0], [-16384, -16384], [8192, 8192], [0, 32767]], dtype=np.int16)
+    r.write(stereo)
+    blocks = r.get(timeout=0)
+    expected = stereo.mean(axis=1) / 32768
+    np.testing.assert_allclose(blocks[0], expected, atol=1e-6)
+    assert blocks[0].dtype == np.float32
+
+
+def test_short_block_is_trimmed():
+    r = ring()
+    r.write(block(0.5, n=2))
+    r.write(block(0.25))
+    blocks = r.get(timeout=0)
+    assert [len(b) for b in blocks] == [2, 4]
+    np.testing.assert_allclose(blocks[0], [0.5, 0.5])
+
+
+def test_clear_drops_stale_audio():
+    r = ring()
+    r.write(block(1.0))
+    r.clear()
+    assert r.get(timeout=0) == []
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+try:
+    import _capture
+except (ImportError, OSError) as e:     # sounddevice or its PortAudio library missing
+    pytest.skip(f"_capture needs sounddevice: {e}", allow_module_level=True)
+
+
+def signal(n, rate, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / rate
+    return (0.5 * np.sin(2 * np.pi * 440 * t) + 0.1 * rng.standard_normal(n)).astype(np.float32)
+
+
+def resample_in_blocks(x, in_rate, sizes):
+    rs = _capture.Resampler(in_rate)
+    out, pos = [], 0
+    for size in sizes:
+        out.append(rs.process(x[pos:pos + size]))
+        pos += size
+    out.append(rs.process(x[pos:]))
+    out.append(rs.process([], final=True))
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 22050, 8000])
+def test_output_does_not_depend_on_block_split(in_rate):
+    x = signal(in_rate, in_rate)          # 1 s
+    whole = resample_in_blocks(x, in_rate, [])
+    rng = np.random.default_rng(1)
+    for sizes in ([4800] * 9, [1] * 50 + [999, 7, 4410], list(rng.integers(0, 3000, 20))):
+        np.testing.assert_allclose(resample_in_blocks(x, in_rate, sizes), whole, atol=1e-6)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 8000])
+def test_output_length_matches_the_rate_ratio(in_rate):
+    n = in_rate // 3 + 17
+    y = resample_in_blocks(signal(n, in_rate), in_rate, [1000, 1000])
+    assert len(y) == -(-n * 16000 // in_rate)
+
+
+def test_passband_kept_and_alias_removed():
+    rate = 48000
+    t = np.arange(rate) / rate
+    low = _capture.Resampler(rate).process(np.sin(2 * np.pi * 1000 * t), final=True)
+    high = _capture.Resampler(rate).process(np.sin(2 * np.pi * 12000 * t), final=True)
+    mid = slice(1000, -1000)                # away from the edges
+    expected = np.sin(2 * np.pi * 1000 * np.arange(len(low)) / 16000)
+    np.testing.assert_allclose(low[mid], expected[mid], atol=1e-2)
+    assert np.sqrt(np.mean(high[mid] ** 2)) < 1e-3   # 12 kHz is above the new Nyquist
+
+
+def test_same_rate_passes_through():
+    x = signal(1600, 16000)
+    rs = _capture.Resampler(16000)
+    assert rs.identity
+    np.testing.assert_array_equal(rs.process(x), x)
+
+
+class FakeStream:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    stop = close = start
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    monkeypatch.setattr(_capture, "native_format", lambda device: (48000, 1))
+    monkeypatch.setattr(_capture.sd, "InputStream", FakeStream)
+    return _capture.Capture(None, blocksize=1600, preroll=0)
+
+
+def record(cap, x, on_block=lambda: None):
+    """Feed int16 mono `x` through the callback in 0.1 s device blocks."""
+    pcm = (x * 32767).astype(np.int16)[:, None]
+    for pos in range(0, len(pcm), 4800):
+        cap._callback(pcm[pos:pos + 4800], 4800, None, None)
+        on_block()
+
+
+def test_read_drains_filter_tail_and_last_partial_block(capture):
+    x = signal(10 * 4800 + 1234, 48000)
+    out = []
+
+    def worker_step():
+        out.extend(capture.read(timeout=0)[0])
+
+    capture.start()
+    record(capture, x, worker_step)
+    capture.stop()
+    assert not capture.empty()
+    while not capture.empty():          # the workers' drain loop
+        worker_step()
+    y = np.concatenate(out)
+    n = -(-len(x) * 16000 // 48000)     # everything the recording holds at 16 kHz
+    assert len(y) == -(-n // 1600) * 1600
+    expected = _capture.Resampler(48000).process((x * 32767).astype(np.int16) / np.float32(32768),
+                                                 final=True)
+    np.testing.assert_allclose(y[:n], expected, atol=1e-5)
+    assert not y[n:].any()              # zero padding only
+
+
+def test_collect_passes_the_filter_tail_to_on_audio(capture):
+    x = signal(3 * 4800 + 7, 48000)
+    live = []
+    capture.start(collect=True, on_audio=live.append)
+    record(capture, x)
+    audio = capture.stop()
+    assert len(audio) == -(-len(x) * 16000 // 48000)
+    np.testing.assert_array_equal(np.concatenate(live), audio)
+
+
+def test_read_levels_belong_to_the_16k_blocks(capture):
+    capture.start()
+    record(capture, signal(4 * 4800, 48000))
+    blocks, rms = capture.read(timeout=0)
+    assert len(blocks) == len(rms) == 3     # the 4th waits for the filter delay
+    np.testing.assert_allclose(rms, [np.sqrt(np.mean(b ** 2)) for b in blocks], rtol=1e-5)
+    capture.stop()
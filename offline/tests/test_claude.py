@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+
+import pytest
+
+import _claude
+from _claude import TranscriptStore
+
+
+def test_transcript_reads_back_ranges(tmp_path):
+    store = TranscriptStore("s1", tmp_path)
+    records = [[f"Zeile {i}\n", "user" if i % 2 else "claude"] for i in range(10)]
+    assert [store.append(r) for r in records] == list(range(10))
+    assert len(store) == 10
+    assert store.read(0, 10) == records
+    assert store.read(3, 6) == records[3:6]
+    assert store.read(9, 10) == records[9:]
+    assert store.read(5, 5) == [] and store.read(6, 2) == []
+    store.append(["danach\n", "user"])      # reads leave the file at its end
+    assert store.read(10, 11) == [["danach\n", "user"]]
+    store.close()
+
+
+def test_transcript_offsets_count_bytes_not_characters(tmp_path):
+    store = TranscriptStore("s2", tmp_path)
+    store.append(["Grüße, äöü ß — 😀\n", "user"])
+    store.append(["zweite\n", "claude"])
+    assert store.read(1, 2) == [["zweite\n", "claude"]]
+    assert store._offsets[1] == len((tmp_path / "s2.jsonl").read_bytes().split(b"\n")[0]) + 1
+    store.close()
+
+
+def test_resumed_transcript_indexes_existing_records(tmp_path):
+    store = TranscriptStore("s3", tmp_path)
+    for i in range(5):
+        store.append([f"ä{i}\n", "user", {"n": i}])
+    offsets = list(store._offsets)
+    store.close()
+
+    resumed = _claude.TranscriptStore("s3", tmp_path)
+    assert len(resumed) == 5
+    assert list(resumed._offsets) == offsets
+    assert resumed.read(2, 4) == [["ä2\n", "user", {"n": 2}], ["ä3\n", "user", {"n": 3}]]
+    assert resumed.append(["weiter\n", "user"]) == 5
+    assert resumed.read(4, 6)[1] == ["weiter\n", "user"]
+    resumed.close()
+
+
+
+def test_torn_tail_is_cut_before_the_next_append(tmp_path):
+    store = TranscriptStore("s4", tmp_path)
+    store.append(["ganz\n", "user"])
+    store.close()
+    with open(tmp_path / "s4.jsonl", "ab") as f:
+        f.write('["abgebroch'.encode())          # crash mid-write
+
+    resumed = TranscriptStore("s4", tmp_path)
+    assert len(resumed) == 1
+    assert resumed.append(["neu\n", "claude"]) == 1
+    assert resumed.read(0, 2) == [["ganz\n", "user"], ["neu\n", "claude"]]
+    resumed.close()
+    assert (tmp_path / "s4.jsonl").read_bytes().count(b"\n") == 2
+
+
+def test_unreadable_record_keeps_the_page_aligned(tmp_path):
+    (tmp_path / "s5.jsonl").write_bytes(b'["a\\n", "user"]\n{kaputt\n["c\\n", "user"]\n')
+    store = TranscriptStore("s5", tmp_path)
+    assert store.read(0, 3) == [["a\n", "user"], TranscriptStore.UNREADABLE, ["c\n", "user"]]
+    store.close()
+
+# ── ClaudeSession gegen tests/fake_claude.py ────────────────────────────────
+
+FAKE_CLI = os.path.join(os.path.dirname(__file__), "fake_claude.py")
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_CLAUDE_LOG", str(tmp_path / "argv.jsonl"))
+    s = _claude.ClaudeSession("abc-123", str(tmp_path), binary=FAKE_CLI, model="sonnet")
+    yield s
+    s.close()
+
+
+def spawns(tmp_path):
+    with open(tmp_path / "argv.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_turns_stream_text_over_one_process(session, tmp_path):
+    chunks = []
+    assert session.ask("hallo du da", chunks.append) == "hallo du da "
+    assert chunks == ["hallo ", "du ", "da "]             # deltas, not the assistant message
+    timing = _claude.TurnLatency()
+    assert session.ask("zweiter Turn", chunks.append, timing) == "zweiter Turn "
+    assert session.turns == 2
+    assert len(spawns(tmp_path)) == 1                     # warm process reused
+    argv = spawns(tmp_path)[0]
+    assert argv[argv.index("--session-id") + 1] == "abc-123"
+    assert argv[argv.index("--model") + 1] == "sonnet"
+    assert "--resume" not in argv
+    assert {"sent", "first_byte", "last_byte"} <= set(timing.marks)
+    assert not timing.respawned
+
+
+def test_error_result_raises_and_keeps_process(session, tmp_path):
+    with pytest.raises(RuntimeError, match="fehler"):
+        session.ask("fehler", lambda chunk: None)
+    assert session.ask("weiter", lambda chunk: None) == "weiter "
+    assert len(spawns(tmp_path)) == 1
+
+
+def test_exit_mid_turn_raises_then_respawns_with_resume(session, tmp_path):
+    session.ask("erst", lambda chunk: None)
+    with pytest.raises(RuntimeError, match="exit 3.*stirbt"):
+        session.ask("stirb", lambda chunk: None)
+    assert session.proc is None
+    timing = _claude.TurnLatency()
+    assert session.ask("wieder da", lambda chunk: None, timing) == "wieder da "
+    assert timing.respawned
+    first, second = spawns(tmp_path)
+    assert "--session-id" in first and "--resume" not in first
+    assert second[second.index("--resume") + 1] == "abc-123"
+    assert "--session-id" not in second
+
+
+def test_cancel_kills_the_process(session, tmp_path):
+    session.start()
+    proc = session.proc
+
+    def on_text(chunk):
+        threading.Thread(target=session.cancel).start()   # speech resumed
+
+    with pytest.raises(_claude.TurnCancelled):
+        session.ask("langsam und noch viel mehr Text", on_text)
+    assert proc.wait(timeout=2) != 0
+    assert session.proc is None
+    assert session.ask("danach", lambda chunk: None) == "danach "
+    assert "--resume" in spawns(tmp_path)[1]
+
+
+def test_cancel_between_turns_is_ignored(session):
+    session.ask("eins", lambda chunk: None)
+    session.cancel()
+    assert session.proc.poll() is None
+    assert session.ask("zwei", lambda chunk: None) == "zwei "
+
+
+
+def test_resumed_session_starts_with_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_CLAUDE_LOG", str(tmp_path / "argv.jsonl"))
+    s = _claude.ClaudeSession("abc-123", str(tmp_path), binary=FAKE_CLI, resume=True)
+    assert s.ask("wieder", lambda chunk: None) == "wieder "
+    s.close()
+    argv, = spawns(tmp_path)
+    assert argv[argv.index("--resume") + 1] == "abc-123"
+    assert "--session-id" not in argv
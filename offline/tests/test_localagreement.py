@@ -0,0 +1,198 @@
+import numpy as np
+import pytest
+
+import _localagreement
+from _localagreement import HypothesisBuffer
+
+
+def words(*texts, start=0.0, prob=0.5):
+    """(start, end, text, probability) with 0.5 s per word."""
+    return [(start + i * 0.5, start + i * 0.5 + 0.4, f" {t}", prob) for i, t in enumerate(texts)]
+
+
+def texts(committed):
+    return [t.strip() for _a, _b, t in committed]
+
+
+def test_la2_commits_prefix_of_two_runs():
+    hb = HypothesisBuffer(agreement=2)
+    hb.insert(words("heute", "ist"), 0.0)
+    assert hb.flush() == []
+    hb.insert(words("heute", "ist", "Montag"), 0.0)
+    assert texts(hb.flush()) == ["heute", "ist"]
+    assert texts(hb.complete()) == ["Montag"]
+
+
+def test_la2_stops_at_first_disagreement():
+    hb = HypothesisBuffer(agreement=2)
+    hb.insert(words("heute", "ist", "Montag"), 0.0)
+    hb.flush()
+    hb.insert(words("heute", "wird", "Montag"), 0.0)
+    assert texts(hb.flush()) == ["heute"]
+
+
+def test_la2_applies_offset_and_skips_committed_overlap():
+    hb = HypothesisBuffer(agreement=2)
+    for _ in range(2):
+        hb.insert(words("eins", "zwei"), 10.0)
+        committed = hb.flush()
+    assert committed[0][:2] == (10.0, 10.4)
+    # Re-decoding after a cut repeats the last committed word with a slightly
+    # earlier timestamp → the n-gram check drops it.
+    redecoded = [(0.85, 1.2, " zwei", 0.5), (1.3, 1.7, " drei", 0.5)]
+    hb.insert(redecoded, 10.0)
+    hb.flush()
+    assert texts(hb.complete()) == ["drei"]
+    hb.insert(redecoded, 10.0)
+    assert texts(hb.flush()) == ["drei"]
+
+
+def test_la3_needs_three_runs():
+    hb = HypothesisBuffer(agreement=3)
+    hb.insert(words("guten", "Morgen"), 0.0)
+    assert hb.flush() == []
+    hb.insert(words("guten", "Morgen"), 0.0)
+    assert hb.flush() == []
+    hb.insert(words("guten", "Morgen"), 0.0)
+    assert texts(hb.flush()) == ["guten", "Morgen"]
+
+
+def test_la3_older_run_can_veto():
+    hb = HypothesisBuffer(agreement=3)
+    hb.insert(words("guten", "Abend"), 0.0)
+    hb.flush()
+    hb.insert(words("guten", "Morgen"), 0.0)
+    hb.flush()
+    hb.insert(words("guten", "Morgen"), 0.0)
+    assert texts(hb.flush()) == ["guten"]     # "Morgen" agreed only twice
+
+
+def test_commit_prob_commits_confident_words_at_once():
+    hb = HypothesisBuffer(agreement=2, commit_prob=0.9)
+    hb.insert(words("sicher", prob=0.95) + words("unsicher", start=0.5), 0.0)
+    assert texts(hb.flush()) == ["sicher"]
+    assert texts(hb.complete()) == ["unsicher"]
+
+
+def test_commit_prob_off_waits_for_agreement():
+    hb = HypothesisBuffer(agreement=2, commit_prob=0)
+    hb.insert(words("sicher", prob=0.99), 0.0)
+    assert hb.flush() == []
+
+
+def test_commit_pending_takes_the_rest_and_records_lag():
+    hb = HypothesisBuffer(agreement=2)
+    hb.insert(words("noch", "offen"), 0.0)
+    hb.flush()
+    assert texts(hb.commit_pending(now=2.0)) == ["noch", "offen"]
+    assert hb.lag.count == 2
+    assert hb.lag.max == pytest.approx(2.0 - 0.4)
+    assert _localagreement.HypothesisBuffer().lag_summary() == "no commits"
+
+
+def test_word_ids_stay_bounded_and_unique():
+    hb = HypothesisBuffer(agreement=2)
+    t = 0.0
+    for n in range(300):
+        run = words(f"a{n}", f"b{n}", start=t)
+        for _ in range(2):
+            hb.insert(run, 0.0)
+            hb.flush()
+        t += 1.0
+        hb.pop_committed(t - 5.0)      # buffer cut behind the committed words
+    assert len(hb._ids) <= HypothesisBuffer.COMMITTED_KEEP
+    held = {item[2] for item in hb.committed_in_buffer}
+    hb.insert(words("neu", start=t), 0.0)
+    assert hb.new[0][2] not in held    # a fresh id never reuses a held word's id
+
+
+def test_word_ids_pruned_without_cuts(monkeypatch):
+    monkeypatch.setattr(HypothesisBuffer, "IDS_KEEP", 50)
+    hb = HypothesisBuffer(agreement=2)
+    for n in range(200):
+        hb.insert(words(f"w{n}", start=float(n)), 0.0)
+        hb.flush()
+    assert len(hb._ids) <= 51
+
+
+@pytest.fixture
+def cadence_limits(monkeypatch):
+    monkeypatch.setattr(_localagreement, "TARGET_RTF", 0.6)
+    monkeypatch.setattr(_localagreement, "CADENCE_MIN", 0.6)
+    monkeypatch.setattr(_localagreement, "CADENCE_MAX", 4.0)
+
+
+def test_cadence_grows_then_beam_drops_when_too_slow(cadence_limits, caplog):
+    sched = _localagreement.CadenceScheduler(1.0, beam_size=3)
+    assert sched.summary() == "no passes"
+    for _ in range(20):
+        sched.update(3.0, 0.0)
+    assert sched.cadence == 4.0
+    assert sched.beam_size == 1
+    assert sum("can't keep up" in r.message for r in caplog.records) == 1
+    assert sched.summary().startswith("20 passes")
+
+
+def test_cadence_grows_with_backlog(cadence_limits):
+    sched = _localagreement.CadenceScheduler(1.0, beam_size=1)
+    assert sched.update(0.1, 2.0) > 1.0    # fast passes, but audio is piling up
+
+
+def test_cadence_shrinks_after_beam_recovered(cadence_limits):
+    sched = _localagreement.CadenceScheduler(4.0, beam_size=3)
+    sched.beam_size = 1                     # as after an overload
+    sched.update(0.05, 0.0)
+    sched.update(0.05, 0.0)
+    assert (sched.beam_size, sched.cadence) == (3, 4.0)
+    for _ in range(30):
+        sched.update(0.05, 0.0)
+    assert sched.cadence == 0.6
+
+
+def test_cadence_clamped_and_beam_from_module(cadence_limits, monkeypatch):
+    monkeypatch.setattr(_localagreement, "BEAM_SIZE", 4)   # `ctl beam=4`
+    sched = _localagreement.CadenceScheduler(10.0)
+    assert (sched.cadence, sched.beam_size) == (4.0, 4)
+
+
+class EchoModel:
+    """faster-whisper stand-in: one segment saying how much audio it got."""
+
+    def __init__(self):
+        self.decoded = []
+
+    def transcribe(self, audio, **kwargs):
+        self.decoded.append(len(audio))
+        return iter([type('Segment', (), {'text': f" {len(audio)}"})]), None
+
+
+@pytest.fixture
+def no_vocabulary(tmp_path, monkeypatch):
+    import _vocabulary
+    monkeypatch.setattr(_vocabulary, 'VOCAB_PATH', str(tmp_path / "missing.txt"))
+    monkeypatch.setattr(_vocabulary, '_prompt', None)
+    monkeypatch.setattr(_vocabulary, '_loaded', False)
+
+
+def test_cascade_drops_settled_audio_while_idle(no_vocabulary):
+    sr = _localagreement.samplerate
+    confirmer = _localagreement.CascadeConfirmer(EchoModel())
+    for _ in range(60):                     # one minute of silence, 1 s per pass
+        confirmer.insert_audio_chunk(np.zeros(sr, dtype=np.float32))
+        assert confirmer.add([]) is None
+        confirmer.skip_to(confirmer.offset + len(confirmer.audio) / sr - 1.0)
+    assert len(confirmer.audio) <= 1 * sr
+    assert confirmer.offset == pytest.approx(59.0)
+
+
+def test_cascade_keeps_audio_of_pending_words(no_vocabulary):
+    sr = _localagreement.samplerate
+    model = EchoModel()
+    confirmer = _localagreement.CascadeConfirmer(model)
+    confirmer.insert_audio_chunk(np.zeros(3 * sr, dtype=np.float32))
+    confirmer.add([(0.5, 0.9, " Hallo")])
+    confirmer.skip_to(2.0)                  # pending → nothing dropped
+    assert confirmer.offset == 0.0
+    text, n = confirmer.add([(1.0, 1.5, " Welt.")])
+    assert (text, n) == (f" {int(1.5 * sr)}", 2)
+    assert confirmer.offset == 1.5 and not confirmer.pending
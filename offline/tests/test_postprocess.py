@@ -0,0 +1,83 @@
+import pytest
+
+import _postprocess
+
+
+@pytest.fixture
+def trie():
+    # Nur die eingebauten Befehle — ~/.transcription/replacements.txt bleibt außen vor.
+    return _postprocess.compile_rules(dict(_postprocess._COMMANDS))
+
+
+def run(trie, *fragments):
+    pp = _postprocess.PostProcessor(trie)
+    return ''.join(pp.process(f) for f in fragments) + pp.flush()
+
+
+def test_punctuation_commands(trie):
+    assert run(trie, "Hallo Komma Welt Punkt") == "Hallo, Welt."
+
+
+def test_sentence_start_is_capitalized(trie):
+    assert run(trie, "ja Punkt danke Fragezeichen") == "ja. Danke?"
+
+
+def test_whisper_punctuation_is_not_doubled(trie):
+    assert run(trie, "Hallo, Komma Welt.") == "Hallo, Welt."
+
+
+def test_line_break_commands(trie):
+    assert run(trie, "erste neue Zeile zweite neuer Absatz dritte") == "erste\nZweite\n\nDritte"
+
+
+def test_open_and_join(trie):
+    assert run(trie, "Klammer auf E Bindestrich Mail Klammer zu") == "(E-Mail)"
+
+
+def test_fillers_are_dropped(trie):
+    assert run(trie, "also äh ich ähm denke") == "also ich denke"
+
+
+def test_article_keeps_noun(trie):
+    assert run(trie, "Der Punkt ist wichtig") == "Der Punkt ist wichtig"
+    assert run(trie, "die nächste Zeile") == "die nächste Zeile"
+
+
+def test_filler_after_article_is_dropped(trie):
+    assert run(trie, "Das ist der Punkt, an dem äh wir stehen.") == \
+        "Das ist der Punkt, an dem wir stehen."
+    assert run(trie, "der äh Punkt") == "der Punkt"
+
+
+def test_user_rule_after_article():
+    rules = dict(_postprocess._COMMANDS, **{'jay son': ('text', 'JSON')})
+    assert run(_postprocess.compile_rules(rules), "das jay son Format") == "das JSON Format"
+
+
+def test_multiword_prefix_is_held_until_decided(trie):
+    pp = _postprocess.PostProcessor(trie)
+    assert pp.process("Hallo neue") == "Hallo"
+    assert pp.process("Zeile Welt") == "\nWelt"
+    assert pp.flush() == ""
+
+
+def test_held_prefix_without_continuation_is_emitted(trie):
+    pp = _postprocess.PostProcessor(trie)
+    assert pp.process("ganz neue") == "ganz"
+    assert pp.process("Idee") == " neue Idee"
+
+
+def test_flush_emits_held_prefix(trie):
+    pp = _postprocess.PostProcessor(trie)
+    assert pp.process("Klammer") == ""
+    assert pp.flush() == "Klammer"
+
+
+def test_load_rules_from_file(tmp_path):
+    path = tmp_path / "replacements.txt"
+    path.write_text("# Kommentar\ncube ctl => kubectl\nAbsatz => \\n\\n\nnaja =>\n",
+                    encoding='utf-8')
+    rules = _postprocess.load_rules(str(path))
+    assert rules['cube ctl'] == ('text', 'kubectl')
+    assert rules['absatz'] == ('break', '\n\n')
+    assert rules['naja'] == ('drop', '')
@@ -0,0 +1,64 @@
+import gc
+
+import pytest
+
+import _vocabulary
+
+
+class FakeTokenizer:
+    def __init__(self, offset):
+        self.offset = offset
+        self.calls = 0
+
+    def encode(self, text, add_special_tokens=False):
+        self.calls += 1
+        return type('Encoding', (), {'ids': [self.offset + len(w) for w in text.split()]})
+
+
+class FakeModel:
+    def __init__(self, offset=0):
+        self.hf_tokenizer = FakeTokenizer(offset)
+
+
+@pytest.fixture
+def vocabulary(tmp_path, monkeypatch):
+    path = tmp_path / "vocabulary.txt"
+    path.write_text("# Kommentar\nKubernetes\nJabra Evolve\nKubernetes\n", encoding='utf-8')
+    monkeypatch.setattr(_vocabulary, 'VOCAB_PATH', str(path))
+    monkeypatch.setattr(_vocabulary, '_prompt', None)
+    monkeypatch.setattr(_vocabulary, '_loaded', False)
+    return path
+
+
+def test_load_terms_skips_comments_and_duplicates(vocabulary):
+    assert _vocabulary.load_terms(str(vocabulary)) == ["Kubernetes", "Jabra Evolve"]
+
+
+def test_missing_file_gives_no_prompt(tmp_path, monkeypatch):
+    monkeypatch.setattr(_vocabulary, 'VOCAB_PATH', str(tmp_path / "fehlt.txt"))
+    monkeypatch.setattr(_vocabulary, '_prompt', None)
+    monkeypatch.setattr(_vocabulary, '_loaded', False)
+    assert _vocabulary.get_prompt() is None
+    assert _vocabulary.get_prompt_tokens(FakeModel()) is None
+
+
+def test_prompt_sentence(vocabulary):
+    assert _vocabulary.get_prompt() == "Begriffe: Kubernetes, Jabra Evolve."
+
+
+def test_tokens_are_cached_per_model_instance(vocabulary):
+    a, b = FakeModel(0), FakeModel(100)
+    first = _vocabulary.get_prompt_tokens(a)
+    assert _vocabulary.get_prompt_tokens(a) is first
+    assert a.hf_tokenizer.calls == 1
+    assert _vocabulary.get_prompt_tokens(b) == [t + 100 for t in first]
+
+
+def test_token_cache_entry_dies_with_the_model(vocabulary):
+    before = len(_vocabulary._token_cache)
+    model = FakeModel()
+    _vocabulary.get_prompt_tokens(model)
+    assert len(_vocabulary._token_cache) == before + 1
+    del model
+    gc.collect()
+    assert len(_vocabulary._token_cache) == before
@@ -12,8 +12,9 @@ Bedienung (wie bei den anderen Modi):
   Alt+Alt   Aufnahme stoppen → transkribieren → an Claude übergeben
   Ctrl+C / Fenster schließen   Beenden
 
-Aufnahme, Whisper-Transkription, Geräteauswahl und die Alt+Alt-Erkennung werden
-aus transcription_offline.py wiederverwendet; hier wird nur die Ausgabe ersetzt.
+Aufnahme, Whisper-Transkription, Geräteauswahl und die Alt+Alt-Erkennung sind
+die aller Modi (_pipeline, _engines); Claude-Prozess, Latenz und Verlauf liegen
+in _claude. Hier wird nur die Ausgabe ersetzt.
 
 Umgebungsvariablen:
   WHISPER_MODEL          Whisper-Modell (Standard: small)
@@ -22,52 +23,174 @@ Umgebungsvariablen:
   CLAUDE_CWD             Arbeitsverzeichnis für Claude  (Standard: $HOME)
   CLAUDE_MODEL           Modell für Claude (z. B. sonnet, opus)  (optional)
   CLAUDE_PERMISSION_MODE Permission-Mode (z. B. plan, acceptEdits)  (optional)
+  CLAUDE_PERSISTENT      Ein dauerhafter Claude-Prozess statt eines pro Turn (1/0, Standard: 1)
+  CLAUDE_BIN             Claude-CLI (Standard: claude; z. B. ein lokales Fake-Script)
+  CLAUDE_PIPELINE        Schon während der Aufnahme transkribieren (1/0, Standard: 1)
+  STREAM_SILENCE_RMS     Stille-Schwelle für die Phrasen-Erkennung (Standard: 0.010)
+  STREAM_MIN_SILENCE     Pause in s, die eine Phrase abschließt (Standard: 0.7)
+  CLAUDE_AUTOSUBMIT      Pause in s, nach der automatisch gesendet wird; Weitersprechen bricht ab (Standard: 0 = aus)
+  CLAUDE_WINDOW_CHARS    So viele Zeichen hält das Fenster, der Rest lädt beim Scrollen nach (Standard: 200000)
+  CLAUDE_RESUME          Frühere Session fortsetzen: Session-ID oder `last` (Standard: neue Session)
+
+Der Gesprächsverlauf liegt pro Session in ~/.transcription/claude_sessions/<SESSION_ID>.jsonl;
+mit CLAUDE_RESUME geht es in derselben Datei und derselben Claude-Session weiter.
+Latenzen pro Turn (Whisper, Senden/Prozessstart, erstes Byte, letztes Byte)
+stehen in der Statuszeile und in ~/.transcription/claude_latency.jsonl;
+`--latency [N]` gibt Perzentile über die letzten N Turns aus.
+
+Whisper-Modell und Input-Device lassen sich im laufenden Betrieb umstellen:
+  transcription ctl model=medium device=7
 """
 
 import os
 import sys
+import time
 import uuid
 import queue
-import signal
 import threading
 import subprocess
+from collections import deque
 
+import numpy as np
 import tkinter as tk
 from tkinter import scrolledtext, font as tkfont
 
-# Aufnahme/Transkription/Tastatur aus dem Offline-Modus wiederverwenden.
-import transcription_offline as base
+import _hotkeys  # Alt+Alt über alle Tastaturen, Hot-Plug ohne Neustart
+import _vad  # Phrasen an Sprechpausen schneiden (wie der VAD-Modus)
+import _engines  # Whisper laden, vorwärmen, im Betrieb tauschen
+import _pipeline  # Aufnahme, Alt+Alt, Geräte, Beeps, `transcription ctl`
+import _claude  # Claude-CLI-Prozess, Latenz pro Turn, Verlauf auf der Platte
+
+# Locale, ~/.transcription und Logging — dieselbe Logdatei wie der Offline-Modus.
+logger = _pipeline.prepare("transcription_listener.log")
+samplerate = _pipeline.SAMPLERATE
 
 # ── Claude-Konfiguration ─────────────────────────────────────────────────────
 CLAUDE_CWD = os.environ.get("CLAUDE_CWD", os.path.expanduser("~"))
 CLAUDE_MODEL = os.environ.get("CLAUDE_MODEL", "").strip()
 CLAUDE_PERMISSION_MODE = os.environ.get("CLAUDE_PERMISSION_MODE", "").strip()
-SESSION_ID = str(uuid.uuid4())  # eine Session pro Lauf → Gesprächskontext
-_first_turn = True              # 1. Turn legt Session an, danach --resume
+CLAUDE_BIN = os.environ.get("CLAUDE_BIN", "claude").strip() or "claude"
+CLAUDE_PERSISTENT = os.environ.get("CLAUDE_PERSISTENT", "1") != "0"
+CLAUDE_PIPELINE = os.environ.get("CLAUDE_PIPELINE", "1") != "0"
+
+# Phrasen-Erkennung für das Live-Transkript (dieselben Variablen wie im VAD-Modus).
+SILENCE_RMS = float(os.environ.get("STREAM_SILENCE_RMS", "0.010"))
+MIN_SILENCE = float(os.environ.get("STREAM_MIN_SILENCE", "0.7"))
+MIN_PHRASE = float(os.environ.get("STREAM_MIN_PHRASE", "0.4"))
+MAX_PHRASE = float(os.environ.get("STREAM_MAX_PHRASE", "15.0"))
+# Auto-Submit: nach so langer Pause wird der Prompt schon vor Alt+Alt gesendet.
+AUTOSUBMIT = float(os.environ.get("CLAUDE_AUTOSUBMIT", "0"))
+# Verlauf pro Session als JSONL (_claude.TranscriptStore); `last` merkt sich die
+# Session des letzten Laufs, sobald Claude sie kennt (erster erfolgreicher Turn).
+HISTORY_DIR = os.path.join(_pipeline.TRANSCRIPTION_DIR, "claude_sessions")
+LAST_SESSION = os.path.join(HISTORY_DIR, "last")
+
+
+def _session_id():
+    """(id, resumed): CLAUDE_RESUME=<id>|last setzt eine frühere Session fort."""
+    wanted = os.environ.get("CLAUDE_RESUME", "").strip()
+    if wanted == "last":
+        try:
+            with open(LAST_SESSION) as f:
+                wanted = f.read().strip()
+        except FileNotFoundError:
+            logger.warning(f"CLAUDE_RESUME=last: noch keine Session in {LAST_SESSION}, starte neue")
+            wanted = ""
+    if wanted:
+        try:
+            return str(uuid.UUID(wanted)), True
+        except ValueError:
+            logger.warning(f"CLAUDE_RESUME={wanted!r} ist keine Session-ID, starte neue")
+    return str(uuid.uuid4()), False
+
+
+SESSION_ID, RESUMED = _session_id()  # eine Session pro Lauf → Gesprächskontext
+_first_turn = not RESUMED            # 1. Turn legt Session an, danach --resume
+_last_saved = RESUMED                # SESSION_ID steht schon in LAST_SESSION
 
 # Thread-sichere Brücke Worker → GUI.
 gui_queue: "queue.Queue[tuple]" = queue.Queue()
 
 
+# ── Latenz pro Turn, dauerhafter Claude-Prozess (_claude) ──────────────────
+LATENCY_LOG = os.path.join(_pipeline.TRANSCRIPTION_DIR, "claude_latency.jsonl")
+
+_session = (_claude.ClaudeSession(SESSION_ID, CLAUDE_CWD, CLAUDE_BIN, CLAUDE_MODEL,
+                                  CLAUDE_PERMISSION_MODE, resume=RESUMED)
+            if CLAUDE_PERSISTENT else None)
+
+
+def _save_latency(timing, prompt, answer_chars, ok):
+    global _last_saved
+    timing.save(LATENCY_LOG, len(prompt), answer_chars, ok,
+                session=SESSION_ID, persistent=_session is not None)
+    if ok and not _last_saved:
+        try:
+            os.makedirs(HISTORY_DIR, exist_ok=True)
+            with open(LAST_SESSION, "w") as f:
+                f.write(SESSION_ID + "\n")
+            _last_saved = True
+        except OSError as e:
+            logger.warning(f"could not record last session: {e}")
+
+
 # ── Claude aufrufen (streamt Antwort ins Fenster) ────────────────────────────
-def ask_claude(prompt: str):
-    """Übergibt den Prompt an `claude -p` und schiebt die Antwort live in die GUI."""
+def ask_claude(prompt: str, timing: "_claude.TurnLatency | None" = None) -> bool:
+    """Übergibt den Prompt an Claude und schiebt die Antwort live in die GUI.
+
+    Gibt False zurück, wenn der Turn abgebrochen wurde oder fehlschlug.
+    Die Zeitpunkte landen in `timing` und in LATENCY_LOG.
+    """
+    timing = timing or _claude.TurnLatency()
+    answer_chars = 0
+
+    def on_text(chunk):
+        nonlocal answer_chars
+        timing.mark("first_text")
+        answer_chars += len(chunk)
+        gui_queue.put(("claude_chunk", chunk))
+
+    if _session is None:
+        ok = _ask_claude_oneshot(prompt, on_text, timing)
+        _save_latency(timing, prompt, answer_chars, ok)
+        return ok
+    gui_queue.put(("claude_start", None))
+    ok = False
+    try:
+        answer = _session.ask(prompt, on_text, timing)
+        if not answer:
+            gui_queue.put(("claude_chunk", "[keine Antwort]"))
+        ok = True
+    except _claude.TurnCancelled:
+        gui_queue.put(("claude_chunk", " [abgebrochen — du sprichst weiter]"))
+    except FileNotFoundError:
+        gui_queue.put(("claude_chunk", f"[Fehler: `{CLAUDE_BIN}` nicht im PATH gefunden]"))
+    except Exception as e:
+        logger.error(f"claude session turn failed: {e}")
+        gui_queue.put(("claude_chunk", f"[Fehler] {e}"))
+    gui_queue.put(("claude_end", None))
+    _save_latency(timing, prompt, answer_chars, ok)
+    return ok
+
+
+def _ask_claude_oneshot(prompt: str, on_text, timing) -> bool:
+    """CLAUDE_PERSISTENT=0: ein `claude -p`-Prozess pro Turn (altes Verhalten)."""
     global _first_turn
     # --session-id legt die Session an; Folge-Turns setzen sie mit --resume fort
     # (gleiche ID erneut mit --session-id → "already in use"). So bleibt der
     # Gesprächskontext über mehrere Sprach-Eingaben erhalten.
     if _first_turn:
-        cmd = ["claude", "-p", "--session-id", SESSION_ID]
+        cmd = [CLAUDE_BIN, "-p", "--session-id", SESSION_ID]
         _first_turn = False
     else:
-        cmd = ["claude", "-p", "--resume", SESSION_ID]
+        cmd = [CLAUDE_BIN, "-p", "--resume", SESSION_ID]
     if CLAUDE_MODEL:
         cmd += ["--model", CLAUDE_MODEL]
     if CLAUDE_PERMISSION_MODE:
         cmd += ["--permission-mode", CLAUDE_PERMISSION_MODE]
     cmd += [prompt]
 
-    base.logger.info(f"claude cmd: {' '.join(cmd[:-1])} <prompt {len(prompt)} chars>")
+    logger.info(f"claude cmd: {' '.join(cmd[:-1])} <prompt {len(prompt)} chars>")
     gui_queue.put(("claude_start", None))
     try:
         proc = subprocess.Popen(
@@ -79,56 +202,285 @@ def ask_claude(prompt: str):
             bufsize=1,
         )
     except FileNotFoundError:
-        gui_queue.put(("claude_chunk", "[Fehler: `claude` nicht im PATH gefunden]"))
+        gui_queue.put(("claude_chunk", f"[Fehler: `{CLAUDE_BIN}` nicht im PATH gefunden]"))
         gui_queue.put(("claude_end", None))
-        return
+        return False
+    timing.respawned = True
+    timing.mark("sent")
 
     got_output = False
-    # stdout zeichenweise lesen → Antwort erscheint, während sie entsteht.
-    for chunk in iter(lambda: proc.stdout.read(64), ""):
-        if chunk:
-            got_output = True
-            gui_queue.put(("claude_chunk", chunk))
+    # Zeilenweise lesen (bufsize=1): ein Queue-Eintrag pro Zeile statt pro 64 Zeichen.
+    for line in proc.stdout:
+        timing.mark("first_byte")
+        got_output = True
+        on_text(line)
     proc.wait()
+    timing.mark("last_byte")
 
     if not got_output:
         err = (proc.stderr.read() or "").strip()
         gui_queue.put(("claude_chunk", f"[keine Antwort] {err}" if err else "[keine Antwort]"))
     gui_queue.put(("claude_end", None))
+    return got_output
+
+
+# ── Live-Transkript während der Aufnahme ────────────────────────────────────
+#
+# Ohne Pipeline beginnt Whisper erst nach dem Stopp mit der ganzen Aufnahme —
+# bei 30 s Sprache wartet man so viele Sekunden auf den Prompt. Mit Pipeline
+# bekommt LiveTranscript die 16-kHz-Stücke schon während der Aufnahme (über
+# on_audio aus dem Capture-Collector), schneidet an Sprechpausen wie der
+# VAD-Modus und transkribiert jede Phrase sofort. Das Fenster zeigt den Text
+# live; beim Stopp ist nur noch die letzte Phrase offen.
+
+class LiveTranscript:
+    """Segments the recording at pauses and transcribes phrases in a worker thread."""
+
+    BLOCK = 1600   # 0.1 s @ 16 kHz
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.texts = []
+        self.sent_upto = 0      # texts[:sent_upto] were answered by an auto-submitted turn
+        self.thread = None
+        self.on_pause = None    # callback(text, upto) after AUTOSUBMIT s of silence
+        self.on_resume = None   # callback() when speech follows such a pause
+
+    def begin(self):
+        if self.thread is not None:
+            self.finish()               # previous recording never reached stop
+        self.queue = queue.Queue()
+        self.texts = []
+        self.sent_upto = 0
+        self.thread = threading.Thread(target=self._run, args=(self.queue,), daemon=True)
+        self.thread.start()
+
+    def feed(self, audio):
+        """Called from the capture collector thread — only enqueues."""
+        self.queue.put(audio)
+
+    def finish(self):
+        """Flush the last phrase and wait until everything is transcribed."""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
 
+    def unsent(self):
+        """Transcript not yet covered by a completed auto-submitted turn."""
+        return " ".join(self.texts[self.sent_upto:]).strip()
 
-# ── Ausgabe-Hooks: Offline-Verhalten ersetzen ───────────────────────────────
-def transcribe_and_output():
-    """Ersetzt base.transcribe_and_output: statt Clipboard → Claude → Fenster."""
-    try:
-        gui_queue.put(("status", "🧠 Transkribiere…"))
-        text = base.transcribe_with_whisper(base.file_path)
-        if not text or not text.strip():
-            gui_queue.put(("status", "⚠️  Nichts erkannt — Alt+Alt zum erneut Sprechen."))
+    def commit(self, upto):
+        self.sent_upto = max(self.sent_upto, upto)
+        gui_queue.put(("live", self.unsent()))
+
+    def _flush(self, seg):
+        audio = np.concatenate(seg) if seg else np.zeros(0, dtype=np.float32)
+        if len(audio) < MIN_PHRASE * samplerate:
+            return
+        t0 = time.perf_counter()
+        try:
+            text = _engine.transcribe(audio).strip()
+        except Exception as e:
+            logger.error(f"live transcript: phrase failed: {e}")
             return
-        text = text.strip()
+        logger.info(f"Live phrase ({len(audio) / samplerate:.1f}s, "
+                         f"{(time.perf_counter() - t0) * 1000:.0f} ms) → {text!r}")
+        if text:
+            self.texts.append(text)
+            gui_queue.put(("live", self.unsent()))
+
+    def _run(self, q):
+        pending = np.zeros(0, dtype=np.float32)
+        segmenter = _vad.PhraseSegmenter(SILENCE_RMS, MIN_SILENCE, MAX_PHRASE, samplerate)
+        paused = False
+        while True:
+            audio = q.get()
+            if audio is None:
+                break
+            pending = np.concatenate((pending, audio)) if len(pending) else audio
+            n = len(pending) // self.BLOCK
+            if n == 0:
+                continue
+            blocks = pending[:n * self.BLOCK].reshape(n, self.BLOCK)
+            pending = pending[n * self.BLOCK:]
+            for block, rms in zip(blocks, _vad.block_rms(blocks)):
+                phrase = segmenter.push(block, rms)
+                if phrase:
+                    self._flush(phrase)
+                if segmenter.voiced:
+                    if paused and self.on_resume is not None:
+                        self.on_resume()
+                    paused = False
+                # The phrase was flushed at MIN_SILENCE, so the transcript is
+                # complete by the time the longer pause is reached.
+                elif (AUTOSUBMIT > 0 and not paused and segmenter.quiet >= AUTOSUBMIT
+                        and self.on_pause is not None and self.unsent()):
+                    paused = True
+                    self.on_pause(self.unsent(), len(self.texts))
+        phrase = segmenter.finish(pending)
+        if phrase:
+            self._flush(phrase)
+
+
+_live = LiveTranscript() if CLAUDE_PIPELINE else None
+
+
+# ── Auto-Submit: bei langer Pause spekulativ senden ─────────────────────────
+#
+# Mit CLAUDE_AUTOSUBMIT=1.2 wartet der Prompt nicht auf Alt+Alt: nach 1,2 s
+# Stille geht das bisherige Transkript an Claude, während die Aufnahme
+# weiterläuft. Spricht man weiter, bevor die Antwort fertig ist, wird der Turn
+# abgebrochen (Claude-Prozess beenden, nächster Turn mit --resume) und das
+# längere Transkript bei der nächsten Pause bzw. beim Stopp gesendet. Ist die
+# Antwort fertig, gilt der Text als beantwortet — Weitersprechen beginnt den
+# nächsten Turn. Braucht den dauerhaften Prozess (CLAUDE_PERSISTENT=1); der
+# abgebrochene Prompt bleibt im Session-Verlauf stehen.
+
+class AutoSubmit:
+    """Speculative turn on a long pause, cancelled when speech resumes."""
+
+    def __init__(self, live):
+        self.live = live
+        self.thread = None
+        live.on_pause = self.dispatch
+        live.on_resume = self.cancel
+
+    def active(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def dispatch(self, text, upto):
+        """Live thread: pause reached — send `text` (= texts[:upto], unsent part)."""
+        if self.active():
+            return
+        logger.info(f"Auto-submit after {AUTOSUBMIT:.1f}s pause: {len(text)} chars")
+        self.thread = threading.Thread(target=self._run, args=(text, upto), daemon=True)
+        self.thread.start()
+
+    def _run(self, text, upto):
+        # The pause began AUTOSUBMIT s ago; that is when the user stopped talking.
+        timing = _claude.TurnLatency("pause", time.perf_counter() - AUTOSUBMIT)
+        timing.mark("transcribed")
         gui_queue.put(("user", text))
-        gui_queue.put(("status", "🤔 Claude denkt…"))
-        base.play_stop_recording_sound()
-        ask_claude(text)
-        gui_queue.put(("status", "✅ Bereit — Alt+Alt zum Sprechen."))
-    except Exception as e:
-        base.logger.error(f"transcribe_and_output (claude) failed: {e}")
-        gui_queue.put(("status", f"✗ Fehler: {e}"))
-
-
-def _start_recording_hook():
-    gui_queue.put(("status", "🔴 Aufnahme läuft — Alt+Alt zum Stoppen."))
-    _orig_start_recording()
+        gui_queue.put(("status", "🤔 Claude denkt… (automatisch gesendet — Weitersprechen bricht ab)"))
+        if ask_claude(text, timing):
+            self.live.commit(upto)
+            gui_queue.put(("status", "🔴 Aufnahme läuft — weitersprechen oder Alt+Alt zum Stoppen. "
+                                     + timing.summary()))
+
+    def cancel(self):
+        """Live thread: speech resumed — abort a turn that is still running."""
+        if self.active():
+            logger.info("Auto-submit cancelled: speech resumed")
+            _session.cancel()
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+_auto = None
+if AUTOSUBMIT > 0:
+    if _live is None or _session is None:
+        logger.warning("CLAUDE_AUTOSUBMIT needs CLAUDE_PIPELINE=1 and CLAUDE_PERSISTENT=1 — disabled")
+    else:
+        AUTOSUBMIT = max(AUTOSUBMIT, MIN_SILENCE)
+        _auto = AutoSubmit(_live)
+
+
+# ── Modus: Aufnahme wie offline, Ausgabe an Claude ──────────────────────────
+class ClaudeMode(_pipeline.Pipeline):
+    """Record like the offline mode; the transcript goes to Claude, not the cursor."""
+
+    name = "claude"
+    collect = True
+    require_model = False   # the model is loaded again on the first recording
+    types = False           # the answer goes to the window
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.stop_timing = None     # TurnLatency of the turn that the last Alt+Alt stopped
+        if _live is not None:
+            self.on_audio = _live.feed
+
+    def begin(self):
+        gui_queue.put(("status", "🔴 Aufnahme läuft — Alt+Alt zum Stoppen."))
+        if _live is not None:
+            _live.begin()
+
+    def stop(self):
+        if self.active:
+            self.stop_timing = _claude.TurnLatency("stop")   # t0 = Alt+Alt, before capture.stop()
+        super().stop()
+
+    def finish(self, audio):
+        """Statt am Cursor tippen: Transkript → Claude → Fenster."""
+        timing = self.stop_timing or _claude.TurnLatency()
+        try:
+            text = ""
+            if _live is not None:
+                t0 = time.perf_counter()
+                _live.finish()
+                if _auto is not None:
+                    _auto.wait()    # a speculative turn that was not cancelled covers the text
+                text = _live.unsent()
+                logger.info(f"Live transcript ready {(time.perf_counter() - t0) * 1000:.0f} ms "
+                            f"after stop: {len(text)} chars")
+                if not text and _live.sent_upto:
+                    gui_queue.put(("status", "✅ Bereit — Alt+Alt zum Sprechen."))
+                    return          # everything was already answered via auto-submit
+            if not text and audio is not None and len(audio):
+                # Keine Phrase über der Stille-Schwelle (leises Mikro) → ganze Aufnahme.
+                gui_queue.put(("status", "🧠 Transkribiere…"))
+                text = self.engine.transcribe(audio)
+            if not text or not text.strip():
+                gui_queue.put(("live", ""))
+                gui_queue.put(("status", "⚠️  Nichts erkannt — Alt+Alt zum erneut Sprechen."))
+                return
+            text = text.strip()
+            timing.mark("transcribed")
+            gui_queue.put(("user", text))
+            gui_queue.put(("status", "🤔 Claude denkt…"))
+            self.play_stop()
+            ask_claude(text, timing)
+            gui_queue.put(("status", f"✅ Bereit (Alt+Alt) — {timing.summary()}"))
+        except Exception as e:
+            logger.error(f"Claude turn after recording failed: {e}")
+            gui_queue.put(("status", f"✗ Fehler: {e}"))
+
+    def describe(self):
+        return [f"Claude-Session: {SESSION_ID}  (cwd: {CLAUDE_CWD})",
+                f"Whisper-Modell: {self.engine.name}"]
+
+
+_engine = _engines.WhisperEngine()
+_mode = ClaudeMode(_engine)
+
+
+# ── Verlauf auf der Platte, im Fenster nur das Ende ─────────────────────────
+#
+# Nach einem Arbeitstag voller Turns hielt das ScrolledText Megabytes an
+# getaggtem Text; jedes insert/see('end') wurde merklich langsamer. Jetzt geht
+# jedes Widget-Update als eine JSONL-Zeile in einen Session-Store auf der
+# Platte. Das Fenster hält höchstens ~CLAUDE_WINDOW_CHARS Zeichen: am Ende die
+# neuesten; beim Zurückscrollen an den Anfang wird die vorige Seite aus dem
+# Store nachgeladen und unten abgeschnitten, beim Scrollen nach unten umgekehrt.
+WINDOW_CHARS = int(os.environ.get("CLAUDE_WINDOW_CHARS", "200000"))
+PAGE_RECORDS = 200      # Einträge pro Nachlade-Schritt beim Zurückscrollen
 
 
-# Monkeypatch: die Alt+Alt-Logik in base ruft diese Namen als Modul-Globals auf.
-_orig_start_recording = base.start_recording
-base.start_recording = _start_recording_hook
-base.transcribe_and_output = transcribe_and_output
+# ── GUI ──────────────────────────────────────────────────────────────────────
+# Die GUI holt pro Poll-Tick ALLE wartenden Einträge ab und schreibt sie mit
+# einem einzigen Text.insert (mehrere Text/Tag-Paare) ins Widget — statt
+# Widget entsperren, einfügen, scrollen, sperren pro 64-Zeichen-Chunk. Während
+# eine Antwort streamt, wird schnell gepollt, im Leerlauf langsam.
+POLL_FAST_MS = 16       # während Claude antwortet (~1 Frame)
+POLL_IDLE_MS = 100      # Leerlauf: nur Status-Updates zu erwarten
+MAX_ITEMS_PER_TICK = 5000   # Obergrenze, damit die Tk-Schleife nie verhungert
 
 
-# ── GUI ──────────────────────────────────────────────────────────────────────
 class ChatWindow:
     BG = "#1e1e2e"
     FG = "#cdd6f4"
@@ -136,8 +488,15 @@ class ChatWindow:
     CLAUDE = "#a6e3a1"
     SYS = "#6c7086"
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, store: "_claude.TranscriptStore | None" = None):
         self.root = root
+        self.store = store if store is not None else _claude.TranscriptStore(SESSION_ID, HISTORY_DIR)
+        self._first = len(self.store)   # index of the first record shown
+        self._sizes = deque()           # chars per shown record (from _first on)
+        self._chars = 0
+        self._streaming = False     # between claude_start and claude_end
+        self.inserts = 0            # widget updates (for --bench-gui)
+        self.ticks = 0
         root.title("🎙️  Sprich mit Claude Code")
         root.geometry("760x560")
         root.configure(bg=self.BG)
@@ -162,43 +521,201 @@ class ChatWindow:
         )
         self.status.pack(fill="x", side="bottom")
 
+        # Live-Transkript der laufenden Aufnahme; nur sichtbar, solange es Text gibt.
+        self.live = tk.Label(
+            root, text="", bg=self.BG, fg=self.USER, anchor="w", justify="left",
+            padx=14, pady=4, wraplength=720, font=(mono.actual("family"), 11, "italic"),
+        )
+
         self._append(
             "Sprich mit Claude Code — Alt+Alt startet die Aufnahme, Alt+Alt "
             "stoppt sie. Dein gesprochener Text geht an Claude, die Antwort "
             "erscheint hier.\n\n", "sys",
         )
-        self.root.after(80, self._poll)
+        self.root.after(POLL_IDLE_MS, self._poll)
 
     def _append(self, s: str, tag: str):
+        self._insert([s, tag])
+
+    @property
+    def _last(self):
+        """Index after the newest record shown."""
+        return self._first + len(self._sizes)
+
+    def _insert(self, runs):
+        """One widget update for a flat [text, tag, text, tag, …] list.
+
+        The record goes to the store; a mark r<index> remembers where it
+        starts, so shown records can be cut off at either end without counting
+        Tk characters. Auto-scroll (and trimming) only while the view is at
+        the end — reading further up is not disturbed. If the window is full
+        while the user reads older text, the record stays on disk until the
+        view reaches the bottom again (_load_newer).
+        """
+        idx = self.store.append(runs)
+        at_end = self.text.yview()[1] >= 0.999
+        size = sum(len(t) for t in runs[0::2])
+        if idx != self._last or (not at_end and self._chars + size > WINDOW_CHARS):
+            return
+        self.text.configure(state="normal")
+        self._put_end(idx, runs)
+        if at_end:
+            self._trim_top()
+            self.text.see("end")
+        self.text.configure(state="disabled")
+        self.inserts += 1
+
+    def _put_end(self, idx, runs):
+        start = self.text.index("end-1c")
+        self.text.insert("end", *runs)
+        self.text.mark_set(f"r{idx}", start)
+        size = sum(len(t) for t in runs[0::2])
+        self._sizes.append(size)
+        self._chars += size
+
+    def _trim_top(self):
+        while self._chars > WINDOW_CHARS and len(self._sizes) > 1:
+            self.text.delete("1.0", f"r{self._first + 1}")
+            self.text.mark_unset(f"r{self._first}")
+            self._chars -= self._sizes.popleft()
+            self._first += 1
+
+    def _trim_bottom(self):
+        while self._chars > WINDOW_CHARS and len(self._sizes) > 1:
+            last = self._last - 1
+            self.text.delete(f"r{last}", "end")
+            self.text.mark_unset(f"r{last}")
+            self._chars -= self._sizes.pop()
+
+    def _load_older(self):
+        """Scrolled to the top: prepend the previous page of records from disk."""
+        start = max(0, self._first - PAGE_RECORDS)
+        records = self.store.read(start, self._first)
+        self.text.configure(state="normal")
+        self.text.mark_set("view", "@0,0")
+        for idx in range(self._first - 1, start - 1, -1):
+            runs = records[idx - start]
+            self.text.insert("1.0", *runs)
+            self.text.mark_set(f"r{idx}", "1.0")
+            size = sum(len(t) for t in runs[0::2])
+            self._sizes.appendleft(size)
+            self._chars += size
+        self._first = start
+        self._trim_bottom()
+        self.text.configure(state="disabled")
+        self.text.yview("view")          # keep what the user was looking at in place
+
+    def _load_newer(self):
+        """Scrolled to the bottom of a window cut off there: append the next page."""
+        start = self._last
+        stop = min(len(self.store), start + PAGE_RECORDS)
         self.text.configure(state="normal")
-        self.text.insert("end", s, tag)
-        self.text.see("end")
+        self.text.mark_set("view", "@0,0")
+        for idx, runs in enumerate(self.store.read(start, stop), start):
+            self._put_end(idx, runs)
+        self._trim_top()
         self.text.configure(state="disabled")
+        self.text.yview("view")
 
     def _poll(self):
+        runs = []        # flat text/tag list; consecutive chunks of one tag are merged
+        status = None
+        live = None
+        items = 0
+
+        def add(s, tag):
+            if runs and runs[-1] == tag:
+                runs[-2] += s
+            else:
+                runs.extend((s, tag))
+
         try:
-            while True:
+            while items < MAX_ITEMS_PER_TICK:
                 kind, payload = gui_queue.get_nowait()
+                items += 1
                 if kind == "status":
-                    self.status.configure(text=payload)
+                    status = payload          # only the newest one is visible anyway
+                elif kind == "live":
+                    live = payload
                 elif kind == "user":
-                    self._append(f"🗣  Du:  {payload}\n", "user")
+                    live = ""
+                    add(f"🗣  Du:  {payload}\n", "user")
                 elif kind == "claude_start":
-                    self._append("🤖 Claude:\n", "sys")
+                    self._streaming = True
+                    add("🤖 Claude:\n", "sys")
                 elif kind == "claude_chunk":
-                    self._append(payload, "claude")
+                    add(payload, "claude")
                 elif kind == "claude_end":
-                    self._append("\n\n", "claude")
+                    self._streaming = False
+                    add("\n\n", "claude")
         except queue.Empty:
             pass
-        self.root.after(80, self._poll)
+        if runs:
+            self._insert(runs)
+        if status is not None:
+            self.status.configure(text=status)
+        if live is not None:
+            self._show_live(live)
+        if self._first > 0 and self.text.yview()[0] <= 0.0:
+            self._load_older()
+        elif self._last < len(self.store) and self.text.yview()[1] >= 1.0:
+            self._load_newer()
+        self.ticks += 1
+        busy = items or self._streaming
+        self.root.after(POLL_FAST_MS if busy else POLL_IDLE_MS, self._poll)
+
+    def _show_live(self, text: str):
+        if text:
+            self.live.configure(text=f"🗣  {text} …")
+            if not self.live.winfo_ismapped():
+                self.live.pack(fill="x", side="bottom")
+        else:
+            self.live.pack_forget()
 
     def on_close(self):
-        base._shutdown_requested = True
+        _mode.shutdown_requested = True
         self.root.destroy()
         os._exit(0)
 
 
+# ── GUI-Benchmark (--bench-gui) ─────────────────────────────────────────────
+def bench_gui(chunks: int = 20000, size: int = 4):
+    """Synthetic producer floods gui_queue like a fast answer; reports throughput.
+
+    Measures the time from the first chunk until the window has rendered the
+    last one, plus how many widget updates and poll ticks that took.
+    """
+    import tempfile
+    root = tk.Tk()
+    tmp = tempfile.TemporaryDirectory()     # keep benchmark text out of the history
+    win = ChatWindow(root, _claude.TranscriptStore("bench", tmp.name))
+    state = {}
+
+    def producer():
+        state["t0"] = time.perf_counter()
+        gui_queue.put(("claude_start", None))
+        for i in range(chunks):
+            gui_queue.put(("claude_chunk", "x" * (size - 1) + ("\n" if i % 16 == 15 else " ")))
+        gui_queue.put(("claude_end", None))
+        state["produced"] = time.perf_counter() - state["t0"]
+
+    def check():
+        if "produced" in state and gui_queue.empty() and not win._streaming:
+            root.update_idletasks()
+            dt = time.perf_counter() - state["t0"]
+            print(f"GUI-Benchmark: {chunks} Chunks à {size} Zeichen in {dt:.2f}s "
+                  f"({chunks / dt:.0f} Chunks/s, Producer fertig nach {state['produced']:.2f}s)")
+            print(f"  {win.inserts - 1} Text-Inserts in {win.ticks} Poll-Ticks "
+                  f"(vorher: 1 Insert pro Chunk = {chunks + 2})")
+            root.destroy()
+            return
+        root.after(10, check)
+
+    root.after(200, lambda: threading.Thread(target=producer, daemon=True).start())
+    root.after(200, check)
+    root.mainloop()
+
+
 # ── Start ────────────────────────────────────────────────────────────────────
 def main():
     import argparse
@@ -211,56 +728,41 @@ def main():
                         help="Schnellstart: Default-Geräte ohne Auswahl-Menü")
     parser.add_argument("-a", "--auto", action="store_true",
                         help="Ein Gerät für Input UND Output auswählen")
+    parser.add_argument("--bench-gui", type=int, metavar="N", nargs="?", const=20000,
+                        help="GUI-Durchsatz mit N synthetischen Chunks messen und beenden")
+    parser.add_argument("--latency", type=int, metavar="N", nargs="?", const=50,
+                        help="Latenz-Perzentile der letzten N Turns ausgeben und beenden")
     args = parser.parse_args()
 
-    # Nur EINE Transcription-Instanz darf laufen (teilt Tastatur + Mikro).
-    import _singleinstance
-    _singleinstance.acquire_or_exit()
-
-    if not subprocess_which("claude"):
-        print("✗ `claude` (Claude Code CLI) nicht im PATH gefunden.")
-        sys.exit(1)
-
-    signal.signal(signal.SIGINT, base._signal_handler)
-    signal.signal(signal.SIGTERM, base._signal_handler)
-
-    interactive = not args.default
-    try:
-        base.get_whisper_model()
-    except Exception as e:
-        print(f"Error loading Whisper model: {e}")
+    if args.bench_gui:
+        bench_gui(args.bench_gui)
+        return
+    if args.latency:
+        _claude.latency_summary(LATENCY_LOG, args.latency)
+        return
 
-    try:
-        if args.auto:
-            base.select_auto_device()
-        else:
-            base.select_audio_device(interactive=interactive)
-            try:
-                base.select_output_device(interactive=interactive)
-            except Exception as e:
-                print(f"Error selecting output device: {e}")
-    except Exception as e:
-        print(f"Error selecting audio device: {e}")
+    if not subprocess_which(CLAUDE_BIN):
+        print(f"✗ `{CLAUDE_BIN}` (Claude Code CLI) nicht im PATH gefunden.")
         sys.exit(1)
 
-    import sounddevice as sd
-    if base.device_index is not None and base.output_device_index is not None:
-        sd.default.device = [base.device_index, base.output_device_index]
+    # Single-Instance, Signale, Whisper, Geräte, Beeps, Pre-roll, `transcription ctl`.
+    _mode.startup(args.auto, interactive=not args.default)
 
     print("\nDetecting keyboard devices...")
-    keyboard_devices = base.find_keyboard_devices()
+    keyboard_devices = _hotkeys.find_keyboards()
     print(f"Found {len(keyboard_devices)} keyboard device(s).")
-    print(f"Claude-Session: {SESSION_ID}  (cwd: {CLAUDE_CWD})")
+    if _session is not None:
+        # CLI jetzt starten (Node-Init, Session anlegen), nicht erst beim 1. Turn.
+        try:
+            _session.start()
+        except Exception as e:
+            print(f"⚠️  Claude-Prozess konnte nicht vorgestartet werden: {e}")
 
     # Tastatur-Überwachung im Hintergrund; Tk-Mainloop auf dem Hauptthread.
-    threading.Thread(
-        target=base.process_keyboard_events,
-        args=(keyboard_devices,),
-        daemon=True,
-    ).start()
+    threading.Thread(target=_mode.listen, args=(keyboard_devices,), daemon=True).start()
 
     root = tk.Tk()
-    win = ChatWindow(root)
+    ChatWindow(root)
     gui_queue.put(("status", "✅ Bereit — Alt+Alt zum Sprechen."))
     root.mainloop()
 
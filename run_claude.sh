@@ -14,6 +14,8 @@
 #   (kein Flag)   Interaktive Geräteauswahl beim Start
 #   -a, --auto    Ein Gerät für Input UND Output wählen (z.B. Jabra Headset)
 #   -d, --default Schnellstart mit System-Default-Geräten, kein Menü
+#   --bench-gui [N]  GUI-Durchsatz mit N synthetischen Antwort-Chunks messen
+#   --latency [N] Latenz-Perzentile (p50/p90/p99) der letzten N Turns (Standard: 50)
 #   -h, --help    Diese Hilfe anzeigen
 #
 # UMGEBUNGSVARIABLEN
@@ -23,6 +25,15 @@
 #   CLAUDE_CWD            Arbeitsverzeichnis für Claude          (Standard: $HOME)
 #   CLAUDE_MODEL          Modell für Claude (z. B. sonnet, opus) (optional)
 #   CLAUDE_PERMISSION_MODE  z. B. plan, acceptEdits              (optional)
+#   CLAUDE_PERSISTENT     1 = ein dauerhafter Claude-Prozess, 0 = einer pro Turn  (Standard: 1)
+#   CLAUDE_BIN            Claude-CLI (Standard: claude), z. B. ein lokales Fake-Script
+#   CLAUDE_PIPELINE       1 = schon während der Aufnahme transkribieren (Live-Text im Fenster)  (Standard: 1)
+#   CLAUDE_WINDOW_CHARS   Zeichen im Fenster; Älteres lädt beim Zurückscrollen  (Standard: 200000)
+#   CLAUDE_AUTOSUBMIT     Pause in s → Prompt ohne Alt+Alt senden, Weitersprechen bricht ab  (Standard: 0 = aus)
+#
+# VERLAUF
+#   ~/.transcription/claude_sessions/<SESSION_ID>.jsonl  (ein Eintrag pro Fenster-Update)
+#   ~/.transcription/claude_latency.jsonl  (Zeitpunkte pro Turn, für --latency)
 #
 # BEDIENUNG
 #   Alt+Alt   Aufnahme starten / stoppen → an Claude übergeben
@@ -36,6 +47,7 @@
 #   ./run_claude.sh -a                   Jabra-Modus: ein Gerät für alles
 #   CLAUDE_CWD=~/projects ./run_claude.sh   Claude im Projektordner laufen lassen
 #   CLAUDE_MODEL=opus ./run_claude.sh    Opus-Modell verwenden
+#   CLAUDE_AUTOSUBMIT=1.2 ./run_claude.sh   Senden nach 1,2 s Pause (freihändig)
 
 if [[ "$1" == "-h" || "$1" == "--help" ]]; then
     sed -n '/^#$/,/^[^#]/p' "$0" | grep '^#' | sed 's/^# \?//'
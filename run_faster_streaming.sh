@@ -24,6 +24,18 @@
 #   STREAM_MIN_CHUNK      Update-Takt in s (~2s ≈ 3-5 Wörter pro Schub)  (Standard: 2.0)
 #   STREAM_MAX_BUFFER     Puffer-Obergrenze in s vor Beschnitt         (Standard: 18.0)
 #   STREAM_BEAM           Beam-Size (1 = geringste Latenz)             (Standard: 1)
+#   STREAM_AGREEMENT      Läufe, über die ein Wort stabil sein muss     (Standard: 2)
+#   STREAM_COMMIT_PROB    Sofort festschreiben ab Wort-Wahrscheinlichkeit (0 = aus)
+#   STREAM_CASCADE        Schnelles Vorschau-Modell (z.B. tiny); WHISPER_MODEL bestätigt
+#   STREAM_CASCADE_PREVIEW  Vorschau sofort tippen, nach Bestätigung ersetzen (Standard: 0)
+#   STREAM_CASCADE_SPAN   Spätestens nach so vielen s bestätigen       (Standard: 8.0)
+#   STREAM_SPECULATIVE    Unbestätigte Wörter sofort tippen + korrigieren (Standard: 0)
+#   STREAM_ADAPTIVE       Takt an gemessene Decode-Zeit anpassen (1/0)  (Standard: 0)
+#   STREAM_TARGET_RTF     Ziel: Decode-Zeit / Takt                      (Standard: 0.6)
+#   STREAM_TRIM           Puffer kürzen an: sentence | segment | off    (Standard: sentence)
+#   STREAM_TRIM_SEC       Ab dieser Pufferlänge in s kürzen             (Standard: 5.0)
+#   WHISPER_VOCABULARY    Eigene Begriffe  (Standard: ~/.transcription/vocabulary.txt)
+#   POSTPROCESS           Sprachbefehle ("neue Zeile", "Komma") lokal   (Standard: 1)
 #   STREAM_KBLAYOUT       Tastaturlayout für ydotool (de|us, sonst Auto-Erkennung)
 #
 # BEDIENUNG
@@ -201,6 +201,7 @@ cat > "$HOME/.local/bin/transcription" << 'LAUNCHER'
 #   stream     Wortweise live beim Sprechen (faster-whisper)
 #   vad        Streaming an jeder Sprechpause (Voice Activity Detection)  [Standard]
 #   claude     Sprache → Claude Code → Antwort im Fenster
+#   ctl        Laufende Instanz umstellen, ohne Neustart (siehe unten)
 #
 # OPTIONEN (werden an das run_*.sh durchgereicht)
 #   (kein Flag)   -a: ein Gerät für Input+Output (z.B. Jabra)
@@ -212,6 +213,12 @@ cat > "$HOME/.local/bin/transcription" << 'LAUNCHER'
 #   transcription            vad-Modus (Standard)
 #   transcription offline    Offline-Modus
 #   transcription stream     Wortweises Live-Streaming
+#
+# LIVE-EINSTELLUNGEN (laufender Service oder Terminal-Instanz)
+#   transcription ctl                    aktuelle Werte anzeigen
+#   transcription ctl list               was sich ändern lässt
+#   transcription ctl model=medium       Modell im Hintergrund laden, dann umschalten
+#   transcription ctl device=7 beam=3    Gerät, Tipp-Backend, STREAM_*-Parameter
 
 if [[ "$1" == "-h" || "$1" == "--help" ]]; then
     sed -n '/^#$/,/^[^#]/p' "$0" | grep '^#' | sed 's/^# \?//'
@@ -220,6 +227,14 @@ fi
 
 REPO="__REPO__"
 
+# ctl spricht nur mit der laufenden Instanz — nichts stoppen, nichts starten.
+if [[ "$1" == "ctl" ]]; then
+    shift
+    PY="$REPO/offline/.venv/bin/python"
+    [[ -x "$PY" ]] || PY="python3"
+    exec "$PY" "$REPO/offline/_control.py" "$@"
+fi
+
 MODE="vad"
 case "$1" in
     offline|stream|vad|claude) MODE="$1"; shift ;;
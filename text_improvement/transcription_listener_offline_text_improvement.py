@@ -5,13 +5,23 @@ import soundfile as sf
 import numpy as np
 from pynput import keyboard
 import os
+import sys
 import subprocess
 import time
 import logging
 import whisper
 import torch
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Gemeinsame Hilfsmodule liegen in offline/ (gleiches Vokabular wie die Modi).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'offline'))
+import _vocabulary  # Fachbegriffe/Namen als Whisper-Prompt
+import _typer  # gemeinsames Tipp-Backend (ydotool/wtype/Clipboard)
 
 # Ensure the environment is correctly configured
 os.environ["LC_ALL"] = "de_DE.UTF-8"
@@ -23,7 +33,23 @@ audio_data = []
 input_stream = None
 
 samplerate = 16000
-GEMINI_API_KEY = "DEIN_GEMINI_API_KEY"  # Ersetze dies mit deinem echten API-Schlüssel
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "DEIN_GEMINI_API_KEY")  # oder hier eintragen
+GEMINI_LLM = os.environ.get("GEMINI_LLM", "gemini-1.5-flash")
+
+# --- LLM-Endpoint (overridable via env) ---
+# LLM_ENDPOINT ersetzt die Gemini-URL, z. B. durch einen lokalen Server, der
+# dasselbe generateContent-Format spricht (http://127.0.0.1:8080/generate).
+LLM_ENDPOINT = os.environ.get("LLM_ENDPOINT", "").strip()
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "3.0"))  # s
+LLM_READ_TIMEOUT = float(os.environ.get("LLM_READ_TIMEOUT", "30.0"))       # s
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", "2"))
+# Streaming-Modus: nach Whisper satzweise ans LLM, gestreamte Antwort, jeder
+# verbesserte Satz wird sofort getippt (_typer). LLM_STREAM_ENDPOINT =
+# SSE-Endpoint eines lokalen Servers.
+LLM_STREAM = os.environ.get("LLM_STREAM", "0") == "1"
+LLM_STREAM_ENDPOINT = os.environ.get("LLM_STREAM_ENDPOINT", "").strip()
+LLM_STREAM_WORKERS = int(os.environ.get("LLM_STREAM_WORKERS", "3"))    # parallele Sätze
+LLM_STREAM_MIN_CHARS = int(os.environ.get("LLM_STREAM_MIN_CHARS", "40"))  # kürzere Sätze zusammenfassen
 
 # Logger erstellen
 logger = logging.getLogger()
@@ -105,13 +131,52 @@ def on_release(key):
         stop_recording()
 
 
+_whisper_model = None
+_whisper_load_seconds = 0.0
+
+
+def get_whisper_model():
+    """Load, quantize, warm up and cache the Whisper model on first call.
+
+    Früher lief load_model + quantize_dynamic bei JEDEM Loslassen der Tasten;
+    jetzt einmal beim Start. Ein Decode von 1 s Stille (wie _engines.Engine._warm)
+    zahlt die Lazy-Initialisierung von torch vorab, nicht das erste Diktat.
+    """
+    global _whisper_model, _whisper_load_seconds
+    if _whisper_model is None:
+        model_name = os.environ.get('WHISPER_MODEL', 'base')
+        print(f"📥 Loading Whisper {model_name} model (one-time)...")
+        logging.info(f"Loading Whisper {model_name} model...")
+        t0 = time.perf_counter()
+        model = whisper.load_model(model_name)
+        # Dynamische int8-Quantisierung der Linear-Layer — nur auf CPU sinnvoll.
+        if not torch.cuda.is_available():
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        _whisper_load_seconds = time.perf_counter() - t0
+        logging.info(f"Whisper {model_name} model loaded + quantized in {_whisper_load_seconds:.2f}s")
+        t1 = time.perf_counter()
+        model.transcribe(np.zeros(samplerate, dtype=np.float32), language="de",
+                         fp16=torch.cuda.is_available(), initial_prompt=_vocabulary.get_prompt())
+        logging.info(f"Whisper warm-up decode {(time.perf_counter() - t1) * 1000:.0f} ms "
+                     f"(not paid by the first dictation)")
+        _whisper_model = model
+        print(f"✓ Whisper {model_name} ready")
+    return _whisper_model
+
+
 def transcribe_with_whisper(audio_file_path):
     try:
-        model = whisper.load_model("base")
-        model = torch.quantization.quantize_dynamic(
-            model, {torch.nn.Linear}, dtype=torch.qint8
-        )
-        result = model.transcribe(audio_file_path, fp16=True, language="de", task="transcribe")
+        model = get_whisper_model()
+        t0 = time.perf_counter()
+        result = model.transcribe(audio_file_path, fp16=torch.cuda.is_available(),
+                                  language="de", task="transcribe",
+                                  initial_prompt=_vocabulary.get_prompt())
+        elapsed = time.perf_counter() - t0
+        # Vergleich: so viel hätte jedes Diktat mit dem alten Laden-pro-Aufruf gekostet.
+        logging.info(f"Whisper decode {elapsed * 1000:.0f} ms (warm); "
+                     f"reload per dictation would add {_whisper_load_seconds * 1000:.0f} ms")
 
         transcription = result["text"]
         logging.info(f"Transcription result: {transcription}")
@@ -122,24 +187,80 @@ def transcribe_with_whisper(audio_file_path):
         raise
 
 
+_llm_session = None
+
+
+def get_llm_session():
+    """Create and cache one pooled HTTP session for all LLM calls.
+
+    Keep-alive: die TCP/TLS-Verbindung zum Endpoint bleibt zwischen zwei
+    Diktaten offen, nur das erste Diktat zahlt den Verbindungsaufbau.
+    Transiente Fehler (Verbindungsabbruch, 429, 5xx) werden wiederholt.
+    """
+    global _llm_session
+    if _llm_session is None:
+        retry = Retry(
+            total=LLM_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(2, LLM_STREAM_WORKERS),
+                              max_retries=retry)
+        _llm_session = requests.Session()
+        _llm_session.mount("https://", adapter)
+        _llm_session.mount("http://", adapter)
+        _llm_session.headers.update({
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        })
+        logging.info(f"LLM session ready ({get_llm_url(redact=True)})")
+    return _llm_session
+
+
+def get_llm_url(redact=False):
+    """Endpoint for generateContent — LLM_ENDPOINT or the Gemini API."""
+    if LLM_ENDPOINT:
+        return LLM_ENDPOINT
+    key = "***" if redact else GEMINI_API_KEY
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_LLM}:generateContent?key={key}"
+
+
+def get_llm_stream_url():
+    """SSE endpoint for streamGenerateContent — LLM_STREAM_ENDPOINT or Gemini."""
+    if LLM_STREAM_ENDPOINT:
+        return LLM_STREAM_ENDPOINT
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_LLM}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+
+
+def _llm_payload(text):
+    return json.dumps({
+        "contents": [{
+            "parts": [{"text": f"Verbessere diesen Text in der gleichen Sprache: {text}"}]
+        }]
+    })
+
+
+def _candidate_text(response_data):
+    """First candidate's text from a (partial) generateContent response."""
+    return response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+
+
 def enhance_text_with_llm(text):
     """Sendet den transkribierten Text an die Gemini API zur Verbesserung."""
+    t0 = time.perf_counter()
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
-        headers = {
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "contents": [{
-                "parts": [{"text": f"Verbessere diesen Text in der gleichen Sprache: {text}"}]
-            }]
-        }
-
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = get_llm_session().post(
+            get_llm_url(),
+            data=_llm_payload(text),
+            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT),
+        )
+        logging.info(f"LLM round trip: {(time.perf_counter() - t0) * 1000:.0f} ms "
+                     f"(HTTP {response.status_code})")
 
         if response.status_code == 200:
             response_data = response.json()
-            improved_text = response_data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+            improved_text = _candidate_text(response_data)
             if improved_text:
                 logging.info(f"LLM-verbesserter Text: {improved_text}")
                 return improved_text
@@ -147,11 +268,95 @@ def enhance_text_with_llm(text):
             logging.error(f"Fehler beim Abruf der API: {response.status_code} - {response.text}")
 
     except Exception as e:
-        logging.error(f"Fehler bei der Kommunikation mit der Gemini API: {e}")
+        logging.error(f"Fehler bei der Kommunikation mit der Gemini API "
+                      f"({(time.perf_counter() - t0) * 1000:.0f} ms): {e}")
 
     return text  # Falls Verbesserung fehlschlägt, Originaltext zurückgeben
 
 
+def split_sentences(text):
+    """Split a transcription into sentence-sized pieces for the LLM.
+
+    Pieces shorter than LLM_STREAM_MIN_CHARS are merged with the next one, so
+    the LLM still sees enough context and we don't pay a request per "Ja."
+    """
+    parts = [p for p in re.split(r'(?<=[.!?…])\s+', text.strip()) if p]
+    pieces, cur = [], ""
+    for p in parts:
+        cur = f"{cur} {p}" if cur else p
+        if len(cur) >= LLM_STREAM_MIN_CHARS:
+            pieces.append(cur)
+            cur = ""
+    if cur:
+        if pieces and len(cur) < LLM_STREAM_MIN_CHARS:
+            pieces[-1] = f"{pieces[-1]} {cur}"
+        else:
+            pieces.append(cur)
+    return pieces
+
+
+def stream_enhance_sentence(sentence):
+    """Improve one sentence via the streaming endpoint; return the full text.
+
+    Liest die SSE-Antwort (`data: {...}`-Zeilen) Stück für Stück. Eine
+    kaputte Zeile wird geloggt und übersprungen; bei Verbindungs-/HTTP-Fehlern
+    kommt der Originalsatz zurück, damit die Ausgabe nie ein Loch hat.
+    """
+    t0 = time.perf_counter()
+    chunks = []
+    try:
+        with get_llm_session().post(
+            get_llm_stream_url(),
+            data=_llm_payload(sentence),
+            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT),
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                logging.error(f"Fehler beim Stream-Abruf: {response.status_code} - {response.text}")
+                return sentence
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    piece = _candidate_text(json.loads(data))
+                except (ValueError, AttributeError, IndexError, TypeError) as e:
+                    logging.warning(f"LLM-Stream: ungültige Zeile übersprungen ({e}): {data[:80]!r}")
+                    continue
+                if piece:
+                    if not chunks:
+                        logging.debug(f"LLM first token after {(time.perf_counter() - t0) * 1000:.0f} ms")
+                    chunks.append(piece)
+    except Exception as e:
+        logging.error(f"Fehler beim LLM-Streaming ({(time.perf_counter() - t0) * 1000:.0f} ms): {e}")
+        return sentence
+
+    improved = "".join(chunks).strip()
+    logging.info(f"LLM sentence in {(time.perf_counter() - t0) * 1000:.0f} ms: {improved!r}")
+    return improved or sentence
+
+
+def enhance_text_streaming(text, on_sentence):
+    """Improve `text` sentence by sentence, calling on_sentence() in order as
+    soon as each improved sentence is ready.
+
+    Die Sätze laufen parallel (LLM_STREAM_WORKERS) über die gemeinsame Session;
+    ausgegeben wird in Originalreihenfolge — Satz 1 erscheint, sobald SEINE
+    Antwort fertig ist, während die folgenden noch generiert werden.
+    """
+    sentences = split_sentences(text)
+    improved = []
+    with ThreadPoolExecutor(max_workers=max(1, LLM_STREAM_WORKERS)) as pool:
+        futures = [pool.submit(stream_enhance_sentence, s) for s in sentences]
+        for fut in futures:
+            sentence = fut.result()
+            improved.append(sentence)
+            on_sentence(sentence)
+    return " ".join(improved)
+
+
 def type_text_in_active_window(text):
     """Kopiert den Text in die Zwischenablage (Wayland)."""
     try:
@@ -163,13 +368,29 @@ def type_text_in_active_window(text):
         print(f"   Text: {text}")
 
 
+def output_sentence(sentence, emitted):
+    """Deliver one improved sentence as soon as it is ready (streaming mode).
+
+    Tippt über das gemeinsame Tipp-Backend an der Cursor-Position. Ohne
+    ydotool/wtype bekommt die Zwischenablage den bisherigen Text, der mit jedem
+    Satz wächst — Ctrl+V fügt immer alles bis hierher ein.
+    """
+    emitted.append(sentence)
+    if _typer.TYPER == 'clipboard':
+        type_text_in_active_window(" ".join(emitted))
+    else:
+        _typer.type_at_cursor(sentence if len(emitted) == 1 else f" {sentence}")
+
+
 def transcribe_and_output():
     """Führt die Transkription durch, schickt den Text an das LLM und gibt ihn aus."""
     try:
         print("Starting transcription...")
         logging.info("Starting transcription...")
 
+        t0 = time.perf_counter()
         transcription = transcribe_with_whisper(file_path)
+        t_asr = time.perf_counter() - t0
 
         if not transcription or transcription.strip() == "":
             print("No valid transcription found.")
@@ -180,7 +401,29 @@ def transcribe_and_output():
         logging.info(f"Raw transcription: {transcription}")
 
         # Text durch das LLM verbessern
+        t1 = time.perf_counter()
+        if LLM_STREAM:
+            # Whisper ist hier schon fertig (openai-whisper liefert keine
+            # Teilergebnisse); überlappt werden LLM und Ausgabe: Satz 1 wird
+            # getippt, während die folgenden noch generiert werden.
+            emitted = []
+
+            def _on_sentence(sentence):
+                output_sentence(sentence, emitted)
+                if len(emitted) == 1:
+                    now = time.perf_counter()
+                    logging.info(f"First sentence output after {(now - t1) * 1000:.0f} ms LLM "
+                                 f"({(now - t0) * 1000:.0f} ms since transcription start)")
+                print(f"📝 {sentence}")
+
+            improved_text = enhance_text_streaming(transcription, _on_sentence)
+            t_llm = time.perf_counter() - t1
+            logging.info(f"Latenz pro Diktat: Whisper {t_asr * 1000:.0f} ms + LLM {t_llm * 1000:.0f} ms (streaming)")
+            logging.info(f"Enhanced Transcription: {improved_text}")
+            return
         improved_text = enhance_text_with_llm(transcription)
+        t_llm = time.perf_counter() - t1
+        logging.info(f"Latenz pro Diktat: Whisper {t_asr * 1000:.0f} ms + LLM {t_llm * 1000:.0f} ms")
 
         # Verbesserter Text ausgeben und in aktives Fenster schreiben
         print(f"Enhanced Transcription: {improved_text}")
@@ -193,6 +436,17 @@ def transcribe_and_output():
 
 
 if __name__ == "__main__":
+    # Verbindung zum LLM-Endpoint vorab aufbauen: Session + Pool stehen, bevor
+    # das erste Diktat kommt.
+    get_llm_session()
+    if LLM_STREAM:
+        _typer.detect_typer()  # Sätze werden direkt getippt
+    # Modell vorab laden + quantisieren: das erste Diktat wartet nicht darauf.
+    try:
+        get_whisper_model()
+    except Exception as e:
+        print(f"Error loading Whisper model: {e}")
+        logging.error(f"Error loading Whisper model: {e}")
     print("Hold Ctrl + Alt + Einfg to start recording. Release to stop recording and transcribe.")
     with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
         listener.join()